@@ -0,0 +1,99 @@
+"""Startup benchmark for poly_cli.py.
+
+Measures the import-time breakdown of poly_cli (python -X importtime) and the
+wall time from launching `python3 poly_cli.py` until the main menu is printed.
+Exits non-zero when a budget is exceeded or a provider dependency is imported
+at startup, so it can be used to catch cold-start regressions.
+
+Usage:
+    python3 bench_startup.py [--runs 5] [--top 15] [--max-ms 500]
+"""
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+MENU_MARKER = "=== Multi-Service CLI Tool ==="
+
+# Modules that should only load when their menu is first used
+LAZY_MODULES = ['requests', 'numpy', 'halo', 'gnews', 'simple_salesforce', 'dateutil']
+
+def import_breakdown():
+    """Run `python -X importtime -c 'import poly_cli'` and return poly_cli's import tree.
+
+    Returns [(module, self_us, cumulative_us)] for poly_cli and everything it
+    imported, excluding interpreter startup imports such as site.
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import poly_cli'],
+                            cwd=HERE, capture_output=True, text=True, check=True)
+    subtree = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        subtree.append((name.rstrip(), int(self_us), int(cumulative_us)))
+        if not name.startswith('  '):  # A top-level import finished; its children precede it
+            if name.strip() == 'poly_cli':
+                return subtree
+            subtree = []
+    raise RuntimeError("poly_cli did not appear in the -X importtime output")
+
+def time_to_first_menu(workdir):
+    """Launch the CLI and return the seconds until the main menu appears on stdout"""
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, os.path.join(HERE, 'poly_cli.py')], cwd=workdir,
+                               stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+    try:
+        for line in process.stdout:
+            if MENU_MARKER in line:
+                return time.perf_counter() - start
+        raise RuntimeError("poly_cli.py exited before printing the main menu")
+    finally:
+        process.kill()
+        process.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure poly_cli.py cold-start time')
+    parser.add_argument('--runs', type=int, default=5, help='Number of launches to time (default 5)')
+    parser.add_argument('--top', type=int, default=15, help='Number of slowest imports to list (default 15)')
+    parser.add_argument('--max-ms', type=float, help='Fail if the median time to first menu exceeds this')
+    args = parser.parse_args()
+
+    failed = False
+
+    modules = import_breakdown()
+    poly_cli_us = next(cumulative for name, _, cumulative in modules if name.strip() == 'poly_cli')
+    print(f"Import time of poly_cli: {poly_cli_us / 1000:.1f} ms")
+    print("\nSlowest imports (cumulative):")
+    print(f"{'Module':<50} {'Self ms':>9} {'Cumul. ms':>10}")
+    for name, self_us, cumulative_us in sorted(modules, key=lambda m: m[2], reverse=True)[:args.top]:
+        print(f"{name[:50]:<50} {self_us / 1000:>9.1f} {cumulative_us / 1000:>10.1f}")
+
+    top_level = {name.strip().split('.')[0] for name, _, _ in modules}
+    eager = [module for module in LAZY_MODULES if module in top_level]
+    if eager:
+        failed = True
+        print(f"\nFAIL: imported at startup but should be lazy: {', '.join(eager)}")
+
+    # Launch from a scratch directory so the benchmark does not touch the user's databases
+    workdir = tempfile.mkdtemp(prefix='poly_cli_bench_')
+    try:
+        timings = [time_to_first_menu(workdir) * 1000 for _ in range(args.runs)]
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    median = statistics.median(timings)
+    print(f"\nTime to first menu over {args.runs} runs: median {median:.1f} ms "
+          f"(min {min(timings):.1f}, max {max(timings):.1f})")
+    if args.max_ms is not None and median > args.max_ms:
+        failed = True
+        print(f"FAIL: median exceeds the {args.max_ms:.0f} ms budget")
+
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
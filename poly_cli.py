@@ -1,32 +1,353 @@
-import requests
 import sys
 import urllib.parse
 import argparse
-from halo import Halo
+import atexit
+import collections
+import concurrent.futures
+import contextlib
+import csv
+import functools
 from datetime import datetime
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+import importlib
+import itertools
 import sqlite3
-from dateutil import parser as dateutil_parser  # Renamed to avoid naming conflict
 import sqlite3 # Ensure sqlite3 is imported to use its constants
 import os
-from gnews import GNews
+import hashlib
+import heapq
+import io
 import json
 import math
-from simple_salesforce import Salesforce, SalesforceAuthenticationFailed, SalesforceExpiredSession
+import random
+import re
+import threading
+import time
+import zlib
 
-# Parse command-line arguments
-parser = argparse.ArgumentParser(description='Poly CLI - A multi-function command-line interface')
-parser.add_argument('--debug', action='store_true', help='Enable debug mode with additional information')
-args = parser.parse_args()
+class _LazyModule:
+    """Stand-in for a module that is only imported when one of its attributes is first used"""
+    def __init__(self, name):
+        self._name = name
 
-# Global debug flag
-DEBUG_MODE = args.debug
+    def __getattr__(self, attr):
+        return getattr(importlib.import_module(self._name), attr)
+
+requests = _LazyModule('requests')
+np = _LazyModule('numpy')
+
+# Global debug flag (set from --debug in main())
+DEBUG_MODE = False
+
+# Set for headless subcommands and batch runs: no spinners, no prompts, JSON on stdout
+HEADLESS = False
 
 # Global variables to store Salesforce credentials
 sf_username = None
 sf_password = None
 sf_token = None
 sf_instance = None
+_sf_login_lock = threading.Lock()
+
+# Shared HTTP client: one keep-alive session per host, per-provider timeouts and retries
+HTTP_TIMEOUTS = {
+    # host: (connect timeout, read timeout) in seconds
+    'geocoding.geo.census.gov': (5, 30),
+    'api.weather.gov': (5, 15),
+    'site.api.espn.com': (5, 15),
+    'api.bls.gov': (5, 30),
+    'api.tidesandcurrents.noaa.gov': (5, 30),
+    'api.stlouisfed.org': (5, 20),
+    'earthquake.usgs.gov': (5, 20),
+}
+DEFAULT_HTTP_TIMEOUT = (5, 30)
+HTTP_MAX_RETRIES = 3
+HTTP_BACKOFF_BASE = 0.5  # Seconds; doubled on every attempt before jitter is applied
+HTTP_BACKOFF_MAX = 8.0
+HTTP_RETRY_AFTER_MAX = 60.0  # Longer Retry-After waits are not made; the 429/503 is returned instead
+HTTP_POOL_SIZE = 10
+HTTP_RATE_LIMITS = {
+    # host: (max requests, per window in seconds)
+    'api.stlouisfed.org': (120, 60),
+}
+
+_http_sessions = {}
+_http_sessions_lock = threading.Lock()
+_http_recent_requests = {}  # host: deque of monotonic send times inside the rate-limit window
+_http_rate_lock = threading.Lock()
+
+def get_http_session(host):
+    """Return the shared keep-alive session for a host, creating it on first use"""
+    with _http_sessions_lock:
+        session = _http_sessions.get(host)
+        if session is None:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_SIZE)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _http_sessions[host] = session
+        return session
+
+def _wait_for_rate_limit(host):
+    """Block until a request to host fits its HTTP_RATE_LIMITS sliding window (shared by all threads)"""
+    limit = HTTP_RATE_LIMITS.get(host)
+    if not limit:
+        return
+    max_requests, window = limit
+    while True:
+        with _http_rate_lock:
+            now = time.monotonic()
+            recent = _http_recent_requests.setdefault(host, collections.deque())
+            while recent and recent[0] <= now - window:
+                recent.popleft()
+            if len(recent) < max_requests:
+                recent.append(now)
+                return
+            wait = recent[0] + window - now
+        time.sleep(wait)
+
+def _retry_delay(attempt):
+    """Exponential backoff with full jitter for the given (zero-based) retry attempt"""
+    return random.uniform(0, min(HTTP_BACKOFF_MAX, HTTP_BACKOFF_BASE * (2 ** attempt)))
+
+def _retry_after(response):
+    """Seconds requested by a Retry-After header (delay or HTTP date), or None if absent or unparseable"""
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    import email.utils
+    try:
+        return max(0.0, (email.utils.parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+def _send_with_retries(method, url, retries=HTTP_MAX_RETRIES, **kwargs):
+    """Send a request through the shared session for the URL's host.
+
+    Applies the host's connect/read timeouts unless one is given, and retries
+    429 and 5xx responses and connection errors up to `retries` times with
+    jittered exponential backoff, or after the server's Retry-After delay
+    when it sends one (pass 0 for requests that must not be repeated).
+    """
+    host = urllib.parse.urlsplit(url).hostname
+    kwargs.setdefault('timeout', HTTP_TIMEOUTS.get(host, DEFAULT_HTTP_TIMEOUT))
+    session = get_http_session(host)
+
+    for attempt in range(retries + 1):
+        _wait_for_rate_limit(host)
+        delay = _retry_delay(attempt)
+        try:
+            response = session.request(method, url, **kwargs)
+        except (requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError):
+            if attempt == retries:
+                raise
+        else:
+            if (response.status_code != 429 and response.status_code < 500) or attempt == retries:
+                return response
+            retry_after = _retry_after(response)
+            if retry_after is not None:
+                if retry_after > HTTP_RETRY_AFTER_MAX:
+                    return response
+                delay = retry_after
+            response.close()
+        if DEBUG_MODE:
+            print(f"\n[debug] Retrying {method} {host} (attempt {attempt + 2} of {retries + 1})")
+        time.sleep(delay)
+
+# Persistent HTTP response cache (cache.db, next to history.db)
+CACHE_DB_PATH = 'cache.db'
+CACHE_MAX_BYTES = 50 * 1024 * 1024  # Cap on the total compressed size of cached bodies
+
+def _cache_until_end_of_day(now):
+    """Expire at local midnight, when the predicted day rolls over"""
+    return datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+
+def _cache_until_next_release(now):
+    """Expire at the next weekday 8:30 AM Eastern (EST or EDT), when BLS publishes"""
+    import zoneinfo
+    eastern_now = datetime.now(zoneinfo.ZoneInfo('America/New_York'))
+    release = eastern_now.replace(hour=8, minute=30, second=0, microsecond=0)
+    if release <= eastern_now:
+        release += timedelta(days=1)
+    while release.weekday() >= 5:  # Saturday/Sunday
+        release += timedelta(days=1)
+    # Wall-clock arithmetic above keeps 8:30 across DST changes; the difference must be taken in UTC
+    return now + (release.astimezone(timezone.utc) - eastern_now.astimezone(timezone.utc))
+
+# Freshness policy per provider: maps the local time of the fetch to an expiry time
+CACHE_POLICIES = {
+    'nws_forecast': lambda now: now + timedelta(minutes=10),
+    'noaa_tides': _cache_until_end_of_day,
+    'bls': _cache_until_next_release,
+    'gnews': lambda now: now + timedelta(minutes=10),
+}
+
+_cache_conn = None
+_cache_lock = threading.Lock()
+
+def _get_cache_conn():
+    """Open (once) the response cache database; callers must hold _cache_lock"""
+    global _cache_conn
+    if _cache_conn is None:
+        _cache_conn = sqlite3.connect(CACHE_DB_PATH, check_same_thread=False)
+        _cache_conn.execute('''CREATE TABLE IF NOT EXISTS responses
+                               (key TEXT PRIMARY KEY,
+                                status INTEGER,
+                                headers TEXT,
+                                body BLOB,
+                                size INTEGER,
+                                etag TEXT,
+                                last_modified TEXT,
+                                expires REAL,
+                                last_access REAL)''')
+        _cache_conn.execute('CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses (last_access)')
+        _cache_conn.commit()
+    return _cache_conn
+
+def _cache_key(method, url, kwargs):
+    """Hash the parts of a request that determine its response (keeps API keys out of the cache)"""
+    parts = [method, url,
+             json.dumps(kwargs.get('params') or {}, sort_keys=True, default=str),
+             json.dumps(kwargs.get('json'), sort_keys=True, default=str),
+             str(kwargs.get('data') or '')]
+    return hashlib.sha256('\n'.join(parts).encode()).hexdigest()
+
+def _cached_response(url, row):
+    """Build a requests.Response from a cache row so callers can't tell the difference"""
+    status, headers, body = row
+    response = requests.models.Response()
+    response.status_code = status
+    response.headers = requests.structures.CaseInsensitiveDict(json.loads(headers))
+    response._content = zlib.decompress(body)
+    response._content_consumed = True  # iter_content serves the cached body
+    response.raw = io.BytesIO()  # So close() and `with response:` work as on a network response
+    response.url = url
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+    return response
+
+def _store_cache_entry(key, status, headers, content, expires):
+    """Save a body compressed under key, then evict least recently used entries over the cap"""
+    body = zlib.compress(content)
+    now = time.time()
+    with _cache_lock:
+        conn = _get_cache_conn()
+        conn.execute('''INSERT OR REPLACE INTO responses
+                        (key, status, headers, body, size, etag, last_modified, expires, last_access)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+                     (key, status, json.dumps(headers), body, len(body),
+                      headers.get('ETag'), headers.get('Last-Modified'), expires, now))
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        if total > CACHE_MAX_BYTES:
+            for old_key, size in conn.execute('SELECT key, size FROM responses ORDER BY last_access').fetchall():
+                if total <= CACHE_MAX_BYTES:
+                    break
+                conn.execute('DELETE FROM responses WHERE key = ?', (old_key,))
+                total -= size
+        conn.commit()
+
+def _store_response(key, response, expires):
+    """Save a 200 response with the headers needed to serve and revalidate it"""
+    headers = {name: response.headers[name]
+               for name in ('Content-Type', 'ETag', 'Last-Modified') if name in response.headers}
+    _store_cache_entry(key, response.status_code, headers, response.content, expires)
+
+def _fresh_cache_body(key):
+    """Return the decompressed body stored under key if it has not expired, else None"""
+    now = time.time()
+    with _cache_lock:
+        conn = _get_cache_conn()
+        row = conn.execute('SELECT body FROM responses WHERE key = ? AND expires > ?', (key, now)).fetchone()
+        if row is not None:
+            conn.execute('UPDATE responses SET last_access = ? WHERE key = ?', (now, key))
+            conn.commit()
+    return zlib.decompress(row[0]) if row is not None else None
+
+def http_request(method, url, cache=None, validate=None, **kwargs):
+    """Send a request through the shared HTTP client.
+
+    When cache names an entry in CACHE_POLICIES, fresh responses are served from
+    cache.db and stale ones are revalidated with If-None-Match/If-Modified-Since
+    when the server supplied an ETag or Last-Modified. Only 200 responses are
+    cached, and when validate is given only those for which validate(response)
+    is true (for APIs that report errors with a 200). The response is returned
+    as-is; callers still call raise_for_status().
+    """
+    if cache is None:
+        return _send_with_retries(method, url, **kwargs)
+
+    key = _cache_key(method, url, kwargs)
+    now = time.time()
+    with _cache_lock:
+        conn = _get_cache_conn()
+        row = conn.execute('''SELECT status, headers, body, etag, last_modified, expires
+                              FROM responses WHERE key = ?''', (key,)).fetchone()
+        if row is not None:
+            conn.execute('UPDATE responses SET last_access = ? WHERE key = ?', (now, key))
+            conn.commit()
+
+    if row is not None and row[5] > now:
+        return _cached_response(url, row[:3])
+
+    if row is not None and (row[3] or row[4]):
+        headers = dict(kwargs.get('headers') or {})
+        if row[3]:
+            headers['If-None-Match'] = row[3]
+        if row[4]:
+            headers['If-Modified-Since'] = row[4]
+        kwargs['headers'] = headers
+
+    response = _send_with_retries(method, url, **kwargs)
+    expires = CACHE_POLICIES[cache](datetime.now()).timestamp()
+
+    if response.status_code == 304 and row is not None:
+        with _cache_lock:
+            conn = _get_cache_conn()
+            conn.execute('UPDATE responses SET expires = ? WHERE key = ?', (expires, key))
+            conn.commit()
+        return _cached_response(url, row[:3])
+
+    if response.status_code == 200 and (validate is None or validate(response)):
+        _store_response(key, response, expires)
+    return response
+
+def http_get(url, **kwargs):
+    """GET through the shared HTTP client"""
+    return http_request('GET', url, **kwargs)
+
+def http_post(url, **kwargs):
+    """POST through the shared HTTP client"""
+    return http_request('POST', url, **kwargs)
+
+class _QuietSpinner:
+    """Spinner stand-in used in headless mode; accepts the Halo calls and draws nothing"""
+    def __init__(self, text='', **kwargs):
+        self.text = text
+
+    def start(self, text=None):
+        return self
+
+    def stop(self):
+        return self
+
+    def succeed(self, text=None):
+        return self
+
+    def fail(self, text=None):
+        return self
+
+    def warn(self, text=None):
+        return self
+
+def make_spinner(*args, **kwargs):
+    """Create a halo spinner (halo is imported on first use); a silent one in headless mode"""
+    if HEADLESS:
+        return _QuietSpinner(*args, **kwargs)
+    from halo import Halo
+    return Halo(*args, **kwargs)
 
 # Adapters for storing and retrieving datetime objects with SQLite
 def adapt_datetime_iso(val):
@@ -37,12 +358,15 @@ def convert_datetime_iso(val):
     """Convert ISO 8601 string to datetime.datetime object."""
     return datetime.fromisoformat(val.decode())
 
-sqlite3.register_adapter(datetime, adapt_datetime_iso)
-sqlite3.register_converter("DATETIME", convert_datetime_iso)
+# history.db: one long-lived connection (WAL mode) shared by all threads, with versioned migrations
+HISTORY_DB_PATH = 'history.db'
+SEARCH_HISTORY_RETENTION = timedelta(days=365)  # Older raw searches are compacted away; saved_locations keeps the places
 
-def init_db():
-    conn = sqlite3.connect('history.db', detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES)
-    c = conn.cursor()
+_history_conn = None
+_history_lock = threading.RLock()
+
+def _migrate_base_schema(c):
+    """Version 1: the original tables (already present in databases created before migrations)"""
     c.execute('''CREATE TABLE IF NOT EXISTS searches
                  (id INTEGER PRIMARY KEY AUTOINCREMENT,
                   address TEXT,
@@ -54,53 +378,338 @@ def init_db():
                  (id INTEGER PRIMARY KEY AUTOINCREMENT,
                   url TEXT UNIQUE,
                   timestamp DATETIME)''')
-    conn.commit()
-    conn.close()
+    c.execute('''CREATE TABLE IF NOT EXISTS nws_gridpoints
+                 (lat_key REAL,
+                  lon_key REAL,
+                  office TEXT,
+                  grid_x INTEGER,
+                  grid_y INTEGER,
+                  forecast_url TEXT,
+                  timestamp DATETIME,
+                  PRIMARY KEY (lat_key, lon_key))''')
+    c.execute('''CREATE TABLE IF NOT EXISTS observations
+                 (source TEXT,
+                  series_id TEXT,
+                  date TEXT,
+                  value REAL,
+                  PRIMARY KEY (source, series_id, date)) WITHOUT ROWID''')
+    c.execute('''CREATE TABLE IF NOT EXISTS series_meta
+                 (source TEXT,
+                  series_id TEXT,
+                  frequency TEXT,
+                  last_updated TEXT,
+                  last_checked DATETIME,
+                  PRIMARY KEY (source, series_id))''')
+    c.execute('''CREATE TABLE IF NOT EXISTS geocode_index
+                 (norm_key TEXT PRIMARY KEY,
+                  matched_address TEXT,
+                  lat REAL,
+                  lon REAL)''')
+    c.execute('''CREATE TABLE IF NOT EXISTS geocode_trigrams
+                 (trigram TEXT,
+                  norm_key TEXT,
+                  PRIMARY KEY (trigram, norm_key)) WITHOUT ROWID''')
+    # Build the geocode index from history recorded before the index existed
+    if c.execute('SELECT COUNT(*) FROM geocode_index').fetchone()[0] == 0:
+        for address, matched_address, lat, lon in c.execute('''SELECT address, matched_address, lat, lon
+                                                               FROM searches ORDER BY timestamp''').fetchall():
+            index_geocode(c, address, {'matched_address': matched_address, 'lat': lat, 'lon': lon})
 
-def save_search(address, location_data):
-    conn = sqlite3.connect('history.db', detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES)
+def _migrate_saved_locations(c):
+    """Version 2: search indexes and the deduplicated saved_locations table, filled from existing history"""
+    c.execute('CREATE INDEX IF NOT EXISTS idx_searches_matched_address ON searches (matched_address)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_searches_timestamp ON searches (timestamp)')
+    c.execute('''CREATE TABLE IF NOT EXISTS saved_locations
+                 (matched_address TEXT PRIMARY KEY,
+                  address TEXT,
+                  lat REAL,
+                  lon REAL,
+                  last_used DATETIME,
+                  use_count INTEGER)''')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_saved_locations_last_used ON saved_locations (last_used)')
+    # SQLite takes the bare columns from the row holding MAX(timestamp)
+    c.execute('''INSERT OR REPLACE INTO saved_locations (matched_address, address, lat, lon, last_used, use_count)
+                 SELECT matched_address, address, lat, lon, MAX(timestamp), COUNT(*)
+                 FROM searches WHERE matched_address IS NOT NULL
+                 GROUP BY matched_address''')
+
+def _migrate_contact_mirror(c):
+    """Version 3: local mirror of Salesforce contacts with an FTS5 index kept in step by triggers"""
+    c.execute('''CREATE TABLE IF NOT EXISTS sf_contacts
+                 (id TEXT PRIMARY KEY,
+                  account_name TEXT,
+                  first_name TEXT,
+                  last_name TEXT,
+                  title TEXT,
+                  email TEXT,
+                  phone TEXT,
+                  description TEXT,
+                  system_modstamp TEXT,
+                  synced_at DATETIME)''')
+    c.execute('''CREATE TABLE IF NOT EXISTS sf_sync_state
+                 (object TEXT PRIMARY KEY,
+                  last_modstamp TEXT,
+                  last_sync DATETIME)''')
+    columns = 'account_name, first_name, last_name, title, email, phone, description'
+    new_values = ', '.join(f'new.{column}' for column in columns.split(', '))
+    old_values = ', '.join(f'old.{column}' for column in columns.split(', '))
+    try:
+        c.execute(f"CREATE VIRTUAL TABLE sf_contacts_fts USING fts5({columns}, content='sf_contacts')")
+    except sqlite3.OperationalError:
+        return  # SQLite built without FTS5; mirror searches fall back to LIKE
+    c.execute(f'''CREATE TRIGGER sf_contacts_ai AFTER INSERT ON sf_contacts BEGIN
+                     INSERT INTO sf_contacts_fts (rowid, {columns}) VALUES (new.rowid, {new_values});
+                 END''')
+    c.execute(f'''CREATE TRIGGER sf_contacts_ad AFTER DELETE ON sf_contacts BEGIN
+                     INSERT INTO sf_contacts_fts (sf_contacts_fts, rowid, {columns})
+                     VALUES ('delete', old.rowid, {old_values});
+                 END''')
+    c.execute(f'''CREATE TRIGGER sf_contacts_au AFTER UPDATE ON sf_contacts BEGIN
+                     INSERT INTO sf_contacts_fts (sf_contacts_fts, rowid, {columns})
+                     VALUES ('delete', old.rowid, {old_values});
+                     INSERT INTO sf_contacts_fts (rowid, {columns}) VALUES (new.rowid, {new_values});
+                 END''')
+
+def _migrate_news_seen(c):
+    """Version 4: articles already shown by the news digest, with MinHash band keys for near-duplicate lookup"""
+    c.execute('''CREATE TABLE IF NOT EXISTS news_seen
+                 (id INTEGER PRIMARY KEY,
+                  tokens TEXT,
+                  title TEXT,
+                  url TEXT,
+                  first_seen DATETIME)''')
+    c.execute('CREATE INDEX IF NOT EXISTS news_seen_first_seen ON news_seen (first_seen)')
+    c.execute('''CREATE TABLE IF NOT EXISTS news_seen_bands
+                 (band_key INTEGER,
+                  seen_id INTEGER)''')
+    c.execute('CREATE INDEX IF NOT EXISTS news_seen_bands_key ON news_seen_bands (band_key)')
+    c.execute('CREATE INDEX IF NOT EXISTS news_seen_bands_seen_id ON news_seen_bands (seen_id)')
+
+def _migrate_quake_events(c):
+    """Version 5: USGS earthquake events keyed by event id, and the magnitude/time range the store covers"""
+    c.execute('''CREATE TABLE IF NOT EXISTS quake_events
+                 (id TEXT PRIMARY KEY,
+                  time INTEGER,
+                  updated INTEGER,
+                  magnitude REAL,
+                  place TEXT,
+                  lat REAL,
+                  lon REAL,
+                  depth_km REAL,
+                  status TEXT,
+                  url TEXT)''')
+    c.execute('CREATE INDEX IF NOT EXISTS quake_events_time ON quake_events (time)')
+    c.execute('''CREATE TABLE IF NOT EXISTS quake_sync_state
+                 (id INTEGER PRIMARY KEY CHECK (id = 1),
+                  min_magnitude REAL,
+                  covered_from INTEGER,
+                  last_updated INTEGER,
+                  last_refresh DATETIME)''')
+
+# Applied in order; a database's PRAGMA user_version is the number of migrations it has had
+HISTORY_MIGRATIONS = [
+    _migrate_base_schema,
+    _migrate_saved_locations,
+    _migrate_contact_mirror,
+    _migrate_news_seen,
+    _migrate_quake_events,
+]
+
+def _apply_migrations(conn):
+    """Bring the schema up to date, one transaction per migration"""
+    version = conn.execute('PRAGMA user_version').fetchone()[0]
+    for number, migration in enumerate(HISTORY_MIGRATIONS, 1):
+        if number <= version:
+            continue
+        c = conn.cursor()
+        c.execute('BEGIN')
+        try:
+            migration(c)
+            c.execute(f'PRAGMA user_version = {number}')
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+
+def _get_history_conn():
+    """Open (once) history.db and migrate it; callers must hold _history_lock"""
+    global _history_conn
+    if _history_conn is None:
+        sqlite3.register_adapter(datetime, adapt_datetime_iso)
+        sqlite3.register_converter("DATETIME", convert_datetime_iso)
+        conn = sqlite3.connect(HISTORY_DB_PATH, check_same_thread=False,
+                               detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES)
+        conn.execute('PRAGMA journal_mode = WAL')
+        conn.execute('PRAGMA synchronous = NORMAL')  # Safe with WAL; commits no longer wait for an fsync
+        _apply_migrations(conn)
+        _history_conn = conn
+        atexit.register(close_history_db)
+    return _history_conn
+
+@contextlib.contextmanager
+def history_db():
+    """Use the shared history.db connection; committed when the block succeeds, rolled back if it raises"""
+    with _history_lock:
+        conn = _get_history_conn()
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+
+def close_history_db():
+    """Close the shared connection (checkpointing the WAL)"""
+    global _history_conn
+    with _history_lock:
+        if _history_conn is not None:
+            _history_conn.execute('PRAGMA optimize')
+            _history_conn.close()
+            _history_conn = None
+
+def compact_search_history(retention=SEARCH_HISTORY_RETENTION):
+    """Delete raw searches older than the retention period; returns the number removed.
+
+    Saved locations and the geocode index are kept, so compacted addresses
+    still resolve locally and still appear in the saved address lists.
+    """
+    with history_db() as conn:
+        return conn.execute('DELETE FROM searches WHERE timestamp < ?',
+                            (datetime.now() - retention,)).rowcount
+
+def init_db():
+    """Open history.db (applying any pending migrations) and compact old search history and seen news"""
+    compact_search_history()
+    prune_seen_news()
+
+# Local geocode index: normalized address keys plus a trigram index for near-identical input
+ADDRESS_ABBREVIATIONS = {
+    'street': 'st', 'avenue': 'ave', 'av': 'ave', 'road': 'rd', 'boulevard': 'blvd', 'drive': 'dr',
+    'lane': 'ln', 'court': 'ct', 'place': 'pl', 'terrace': 'ter', 'parkway': 'pkwy', 'highway': 'hwy',
+    'circle': 'cir', 'square': 'sq', 'trail': 'trl', 'way': 'way', 'suite': 'ste', 'apartment': 'apt',
+    'north': 'n', 'south': 's', 'east': 'e', 'west': 'w',
+    'northeast': 'ne', 'northwest': 'nw', 'southeast': 'se', 'southwest': 'sw',
+}
+GEOCODE_FUZZY_THRESHOLD = 0.8  # Minimum trigram Jaccard similarity for a local fuzzy match
+GEOCODE_FUZZY_CANDIDATES = 10
+
+def normalize_address(address):
+    """Normalize an address for index lookups: lowercase, no punctuation, standard suffix abbreviations"""
+    tokens = re.sub(r'[^a-z0-9]+', ' ', address.lower()).split()
+    return ' '.join(ADDRESS_ABBREVIATIONS.get(token, token) for token in tokens)
+
+def address_trigrams(norm_key):
+    """Return the set of character trigrams of a normalized address"""
+    padded = f"  {norm_key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def index_geocode(c, address, location_data):
+    """Add a geocoded address (and its matched form) to the local geocode index using cursor c"""
+    for text in (address, location_data['matched_address']):
+        norm_key = normalize_address(text or '')
+        if not norm_key:
+            continue
+        c.execute('''INSERT OR REPLACE INTO geocode_index (norm_key, matched_address, lat, lon)
+                     VALUES (?, ?, ?, ?)''',
+                  (norm_key, location_data['matched_address'], location_data['lat'], location_data['lon']))
+        c.executemany('INSERT OR IGNORE INTO geocode_trigrams (trigram, norm_key) VALUES (?, ?)',
+                      [(trigram, norm_key) for trigram in address_trigrams(norm_key)])
+
+def lookup_geocode_index(address):
+    """Resolve an address from the local geocode index, exactly or by trigram similarity.
+
+    Fuzzy matches must share the same numbers (house number, zip code) so a typo
+    in a street name can resolve locally but a different house never does.
+    """
+    norm_key = normalize_address(address)
+    if not norm_key:
+        return None
+    try:
+        with history_db() as conn:
+            row = lookup_geocode_key(conn, norm_key)
+    except sqlite3.Error:
+        row = None  # Fall back to the Census geocoder
+    if row is None:
+        return None
+    return {'matched_address': row[0], 'lat': row[1], 'lon': row[2]}
+
+def lookup_geocode_key(conn, norm_key):
+    """Return (matched_address, lat, lon) for a normalized address, exactly or by trigram similarity"""
     c = conn.cursor()
-    c.execute('''INSERT INTO searches (address, matched_address, lat, lon, timestamp)
-                 VALUES (?, ?, ?, ?, ?)''',
-                 (address, 
-                  location_data['matched_address'],
-                  location_data['lat'],
-                  location_data['lon'],
-                  datetime.now()))
-    conn.commit()
-    conn.close()
+    row = c.execute('SELECT matched_address, lat, lon FROM geocode_index WHERE norm_key = ?',
+                    (norm_key,)).fetchone()
+    if row is None:
+        trigrams = address_trigrams(norm_key)
+        placeholders = ','.join('?' * len(trigrams))
+        candidates = c.execute(f'''SELECT norm_key, COUNT(*) AS shared FROM geocode_trigrams
+                                   WHERE trigram IN ({placeholders})
+                                   GROUP BY norm_key ORDER BY shared DESC LIMIT ?''',
+                               (*trigrams, GEOCODE_FUZZY_CANDIDATES)).fetchall()
+        numbers = re.findall(r'\d+', norm_key)
+        best_key, best_score = None, GEOCODE_FUZZY_THRESHOLD
+        for candidate, shared in candidates:
+            score = shared / (len(trigrams) + len(address_trigrams(candidate)) - shared)
+            if score >= best_score and re.findall(r'\d+', candidate) == numbers:
+                best_key, best_score = candidate, score
+        if best_key is not None:
+            row = c.execute('SELECT matched_address, lat, lon FROM geocode_index WHERE norm_key = ?',
+                            (best_key,)).fetchone()
+    return row
+
+def save_search(address, location_data):
+    """Save one looked-up address"""
+    save_searches([(address, location_data)])
+
+def save_searches(entries):
+    """Save many (address, location_data) pairs in a single transaction.
+
+    Each entry is appended to the search history, upserted into the
+    deduplicated saved_locations table and added to the geocode index.
+    """
+    rows = [(address, location_data['matched_address'], location_data['lat'], location_data['lon'], datetime.now())
+            for address, location_data in entries]
+    with history_db() as conn:
+        c = conn.cursor()
+        c.executemany('''INSERT INTO searches (address, matched_address, lat, lon, timestamp)
+                         VALUES (?, ?, ?, ?, ?)''', rows)
+        c.executemany('''INSERT INTO saved_locations (address, matched_address, lat, lon, last_used, use_count)
+                         VALUES (?, ?, ?, ?, ?, 1)
+                         ON CONFLICT (matched_address) DO UPDATE SET
+                             address = excluded.address, lat = excluded.lat, lon = excluded.lon,
+                             last_used = excluded.last_used, use_count = use_count + 1''',
+                      [row for row in rows if row[1] is not None])
+        for address, location_data in entries:
+            index_geocode(c, address, location_data)
 
 def save_news_site(url):
     """Save a news site URL to the database"""
-    conn = sqlite3.connect('history.db', detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES)
-    c = conn.cursor()
     try:
-        c.execute('''INSERT OR IGNORE INTO news_sites (url, timestamp)
-                    VALUES (?, ?)''', (url, datetime.now()))
-        conn.commit()
+        with history_db() as conn:
+            conn.execute('''INSERT OR IGNORE INTO news_sites (url, timestamp)
+                            VALUES (?, ?)''', (url, datetime.now()))
     except sqlite3.Error as e:
         print(f"Database error: {e}")
-    finally:
-        conn.close()
 
 def get_saved_news_sites():
     """Get all saved news site URLs from the database"""
-    conn = sqlite3.connect('history.db', detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES)
-    c = conn.cursor()
-    c.execute('''SELECT url FROM news_sites ORDER BY timestamp DESC''')
-    sites = [row[0] for row in c.fetchall()]
-    conn.close()
-    return sites
+    with history_db() as conn:
+        return [row[0] for row in conn.execute('''SELECT url FROM news_sites ORDER BY timestamp DESC''')]
 
 def get_coordinates(address):
-    """Convert address to coordinates using Census Geocoding API"""
+    """Convert address to coordinates, checking the local geocode index before the Census Geocoding API"""
+    location_data = lookup_geocode_index(address)
+    if location_data is not None:
+        if DEBUG_MODE:
+            print(f"\n[debug] Resolved '{address}' from the local geocode index")
+        return location_data
+
     encoded_address = urllib.parse.quote(address)
     census_url = f"https://geocoding.geo.census.gov/geocoder/locations/onelineaddress?address={encoded_address}&benchmark=2020&format=json"
     
-    spinner = Halo('Looking up address...')
+    spinner = make_spinner('Looking up address...')
     spinner.start()
     try:
-        response = requests.get(census_url)
+        response = http_get(census_url)
         response.raise_for_status()
         data = response.json()
         
@@ -119,20 +728,63 @@ def get_coordinates(address):
     finally:
         spinner.stop()
 
+# NWS grid-point metadata cache: the /points lookup for a location practically never changes
+NWS_POINT_PRECISION = 4  # api.weather.gov redirects /points requests with more decimals than this
+
+def get_nws_gridpoint(lat, lon, refresh=False):
+    """Return the NWS grid metadata for a location from history.db, resolving it via /points on a miss.
+
+    Locations are keyed on coordinates rounded to NWS_POINT_PRECISION decimals.
+    Pass refresh=True to ignore the stored entry and resolve it again.
+    """
+    lat_key = round(float(lat), NWS_POINT_PRECISION)
+    lon_key = round(float(lon), NWS_POINT_PRECISION)
+    if not refresh:
+        with history_db() as conn:
+            row = conn.execute('''SELECT office, grid_x, grid_y, forecast_url FROM nws_gridpoints
+                                  WHERE lat_key = ? AND lon_key = ?''', (lat_key, lon_key)).fetchone()
+        if row is not None:
+            return {'office': row[0], 'grid_x': row[1], 'grid_y': row[2], 'forecast_url': row[3]}
+
+    response = http_get(f"https://api.weather.gov/points/{lat_key},{lon_key}")
+    response.raise_for_status()
+    properties = response.json()['properties']
+    gridpoint = {
+        'office': properties['gridId'],
+        'grid_x': properties['gridX'],
+        'grid_y': properties['gridY'],
+        'forecast_url': properties['forecast'],
+    }
+    with history_db() as conn:
+        conn.execute('''INSERT OR REPLACE INTO nws_gridpoints
+                        (lat_key, lon_key, office, grid_x, grid_y, forecast_url, timestamp)
+                        VALUES (?, ?, ?, ?, ?, ?, ?)''',
+                     (lat_key, lon_key, gridpoint['office'], gridpoint['grid_x'], gridpoint['grid_y'],
+                      gridpoint['forecast_url'], datetime.now()))
+    return gridpoint
+
+def update_nws_forecast_url(lat, lon, forecast_url):
+    """Point a stored grid entry at the URL NWS permanently redirected its forecast to"""
+    with history_db() as conn:
+        conn.execute('''UPDATE nws_gridpoints SET forecast_url = ?, timestamp = ?
+                        WHERE lat_key = ? AND lon_key = ?''',
+                     (forecast_url, datetime.now(),
+                      round(float(lat), NWS_POINT_PRECISION), round(float(lon), NWS_POINT_PRECISION)))
+
 def get_weather(lat, lon):
     """Get weather data from National Weather Service API"""
-    spinner = Halo('Getting weather data...')
+    spinner = make_spinner('Getting weather data...')
     spinner.start()
     try:
-        # First, get the grid coordinates
-        point_url = f"https://api.weather.gov/points/{lat},{lon}"
-        response = requests.get(point_url)
-        response.raise_for_status()
-        grid_data = response.json()
-        # Then get the forecast data using the grid coordinates
-        forecast_url = grid_data['properties']['forecast']
-
-        response = requests.get(forecast_url)
+        # The grid coordinates come from history.db unless this location is new
+        gridpoint = get_nws_gridpoint(lat, lon)
+        response = http_get(gridpoint['forecast_url'], cache='nws_forecast')
+        if response.status_code == 404:
+            # The stored grid is stale (e.g. NWS reassigned the office); resolve it again
+            gridpoint = get_nws_gridpoint(lat, lon, refresh=True)
+            response = http_get(gridpoint['forecast_url'], cache='nws_forecast')
+        elif any(r.status_code in (301, 308) for r in response.history):
+            update_nws_forecast_url(lat, lon, response.url)
         response.raise_for_status()
         weather_data = response.json()
         
@@ -187,7 +839,7 @@ def lookup_weather():
     address = safe_input("\nEnter address (street, city, state, zip code): ")
     
     # Get coordinates
-    spinner = Halo('Looking up address...')
+    spinner = make_spinner('Looking up address...')
     spinner.start()
     location_data = get_coordinates(address)
     spinner.stop()
@@ -209,15 +861,11 @@ def lookup_weather():
         save_search(address, location_data)
 
 def get_saved_addresses():
-    conn = sqlite3.connect('history.db', detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES)
-    c = conn.cursor()
-    c.execute('''SELECT DISTINCT address, matched_address, lat, lon, MAX(timestamp) as latest
-                 FROM searches 
-                 GROUP BY matched_address
-                 ORDER BY latest DESC''')
-    addresses = c.fetchall()
-    conn.close()
-    return addresses
+    """Return (address, matched_address, lat, lon, last_used) for each saved location, most recent first"""
+    with history_db() as conn:
+        return conn.execute('''SELECT address, matched_address, lat, lon, last_used
+                               FROM saved_locations
+                               ORDER BY last_used DESC''').fetchall()
 
 def select_saved_address():
     addresses = get_saved_addresses()
@@ -250,6 +898,109 @@ def select_saved_address():
     except ValueError:
         print("\nPlease enter a valid number.")
 
+# Census batch geocoder: up to 10,000 records per request
+GEOCODE_BATCH_URL = "https://geocoding.geo.census.gov/geocoder/locations/addressbatch"
+GEOCODE_BATCH_SIZE = 1000
+GEOCODE_BATCH_WORKERS = 3
+GEOCODE_BATCH_TIMEOUT = (10, 600)  # The batch endpoint can take minutes per chunk
+
+def split_address(address):
+    """Split a one-line address into (street, city, state, zip) for the batch geocoder"""
+    parts = [part.strip() for part in address.split(',')]
+    if len(parts) >= 4:
+        return parts[0], parts[1], parts[2], parts[3]
+    if len(parts) == 3:
+        state_zip = parts[2].split()
+        return parts[0], parts[1], state_zip[0] if state_zip else '', ' '.join(state_zip[1:])
+    return address.strip(), '', '', ''
+
+def read_address_file(path):
+    """Read (address, (street, city, state, zip)) pairs from a CSV or a text file with one address per line.
+
+    CSV columns are used as read, so a quoted street containing a comma stays
+    in the street field; a single-column CSV row is treated as a one-line address.
+    """
+    addresses = []
+    with open(path, newline='', encoding='utf-8') as f:
+        if path.lower().endswith('.csv'):
+            for row in csv.reader(f):
+                fields = [field.strip() for field in row]
+                if not any(fields) or fields[0].lower() in ('street', 'address'):  # Skip blank and header rows
+                    continue
+                if len(fields) == 1:
+                    addresses.append((fields[0], split_address(fields[0])))
+                else:
+                    parts = tuple((fields + [''] * 4)[:4])
+                    addresses.append((', '.join(part for part in parts if part), parts))
+        else:
+            addresses = [(line.strip(), split_address(line)) for line in f if line.strip()]
+    return addresses
+
+def geocode_batch_chunk(addresses):
+    """Geocode one chunk of (address, (street, city, state, zip)) pairs through the Census addressbatch endpoint.
+
+    Returns a list of (address, location_data) in input order; location_data is
+    None for addresses the geocoder could not match.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for i, (_, parts) in enumerate(addresses):
+        writer.writerow([i, *parts])
+
+    response = http_post(GEOCODE_BATCH_URL,
+                         data={'benchmark': 'Public_AR_Current'},
+                         files={'addressFile': ('addresses.csv', buffer.getvalue(), 'text/csv')},
+                         timeout=GEOCODE_BATCH_TIMEOUT)
+    response.raise_for_status()
+
+    matches = {}
+    for row in csv.reader(io.StringIO(response.text)):
+        # id, input address, match status, match type, matched address, "lon,lat", tiger id, side
+        if len(row) >= 6 and row[2] == 'Match' and row[5]:
+            lon, lat = row[5].split(',')
+            matches[int(row[0])] = {'matched_address': row[4], 'lat': float(lat), 'lon': float(lon)}
+    return [(address, matches.get(i)) for i, (address, _) in enumerate(addresses)]
+
+def bulk_geocode_addresses(path):
+    """Geocode every address in a file, several chunks at a time, saving each chunk as it completes"""
+    try:
+        addresses = read_address_file(path)
+    except OSError as e:
+        print(f"\nError reading {path}: {e}")
+        return
+    if not addresses:
+        print(f"\nNo addresses found in {path}.")
+        return
+
+    chunks = [addresses[i:i + GEOCODE_BATCH_SIZE] for i in range(0, len(addresses), GEOCODE_BATCH_SIZE)]
+    print(f"\nGeocoding {len(addresses)} addresses in {len(chunks)} chunk(s)...")
+    total_matched = 0
+    unmatched = []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=GEOCODE_BATCH_WORKERS) as executor:
+        futures = {executor.submit(geocode_batch_chunk, chunk): n for n, chunk in enumerate(chunks, 1)}
+        for done, future in enumerate(concurrent.futures.as_completed(futures), 1):
+            chunk_number = futures[future]
+            try:
+                results = future.result()
+            except Exception as e:
+                print(f"  [{done}/{len(chunks)}] Chunk {chunk_number} failed: {e}")
+                continue
+            matched = [(address, location) for address, location in results if location]
+            unmatched.extend(address for address, location in results if not location)
+            if matched:
+                save_searches(matched)
+            total_matched += len(matched)
+            print(f"  [{done}/{len(chunks)}] Chunk {chunk_number}: {len(matched)} matched, "
+                  f"{len(results) - len(matched)} unmatched")
+
+    print(f"\nSaved {total_matched} of {len(addresses)} addresses.")
+    if unmatched:
+        print("\nUnmatched addresses:")
+        for address in unmatched[:20]:
+            print(f"  {address}")
+        if len(unmatched) > 20:
+            print(f"  ... and {len(unmatched) - 20} more")
+
 def weather_menu():
     """Display and handle weather submenu"""
     while True:
@@ -257,32 +1008,189 @@ def weather_menu():
             print("\n=== Weather Lookup Menu ===")
             print("1. Enter new address")
             print("2. Select from saved addresses")
-            print("3. Return to main menu")
+            print("3. Bulk geocode addresses from a file")
+            print("4. Return to main menu")
             
-            choice = safe_input("\nEnter your choice (1-3): ")
+            choice = safe_input("\nEnter your choice (1-4): ")
             
             if choice == "1":
                 lookup_weather()
             elif choice == "2":
                 select_saved_address()
             elif choice == "3":
+                path = safe_input("\nEnter path to a CSV or text file of addresses: ").strip()
+                if path:
+                    bulk_geocode_addresses(path)
+                    safe_input("\nPress Enter to continue...")
+            elif choice == "4":
                 return
             else:
-                print("\nInvalid choice. Please enter 1-3.")
+                print("\nInvalid choice. Please enter 1-4.")
         except KeyboardInterrupt:
             exit_gracefully("\n\nProgram interrupted. Goodbye!")
         except EOFError:
             exit_gracefully("\n\nEnd of input. Goodbye!")
 
+# ESPN scoreboards by short name: (sport, league, display name)
+LEAGUES = {
+    "nfl": ("football", "nfl", "NFL"),
+    "mlb": ("baseball", "mlb", "MLB"),
+    "nhl": ("hockey", "nhl", "NHL"),
+    "nba": ("basketball", "nba", "NBA"),
+    "mls": ("soccer", "usa.1", "MLS"),
+    "ncaaf": ("football", "college-football", "NCAA Football"),
+}
+
+def scoreboard_url(sport, league):
+    """ESPN scoreboard endpoint for a league"""
+    return f"https://site.api.espn.com/apis/site/v2/sports/{sport}/{league}/scoreboard"
+
+def fetch_scoreboard(sport, league):
+    """Fetch the raw ESPN scoreboard JSON for a league"""
+    response = http_get(scoreboard_url(sport, league))
+    response.raise_for_status()
+    return response.json()
+
+def summarize_event(event):
+    """Reduce an ESPN scoreboard event to the fields the score views use"""
+    status = event['status']['type']
+    competition = event['competitions'][0]
+    home_team = competition['competitors'][0]
+    away_team = competition['competitors'][1]
+    venue = competition.get('venue') or {}
+    venue_info = venue.get('fullName', '')
+    if venue_info and (venue.get('address') or {}).get('city'):
+        venue_info = f"{venue_info}, {venue['address']['city']}"
+    return {
+        'id': event.get('id'),
+        'start': event.get('date'),
+        'state': status['state'],
+        'detail': status.get('detail', status.get('shortDetail', 'Scheduled')),
+        'short_detail': status.get('shortDetail'),
+        'away': away_team['team']['displayName'],
+        'home': home_team['team']['displayName'],
+        'away_score': away_team.get('score'),
+        'home_score': home_team.get('score'),
+        'venue': venue_info,
+    }
+
+def fetch_league_games(league):
+    """Fetch and summarize the current games for a LEAGUES key"""
+    sport, espn_league, _ = LEAGUES[league]
+    return [summarize_event(event) for event in fetch_scoreboard(sport, espn_league).get('events', [])]
+
+SCOREBOARD_DEADLINE = 20  # Seconds the all-leagues report waits before giving up on a slow league
+
+def run_with_deadline(calls, deadline):
+    """Run {key: zero-argument callable} concurrently and return {key: result or the exception it raised}.
+
+    Each call runs on a daemon thread. A call still running after `deadline`
+    seconds is reported as a TimeoutError and abandoned; since daemon threads
+    are not joined at interpreter exit, it cannot keep the command running
+    past the deadline.
+    """
+    results = {}
+
+    def run(key, call):
+        try:
+            results[key] = call()
+        except Exception as e:
+            results[key] = e
+
+    threads = [threading.Thread(target=run, args=item, daemon=True) for item in calls.items()]
+    for thread in threads:
+        thread.start()
+    end = time.monotonic() + deadline
+    for thread in threads:
+        thread.join(max(0, end - time.monotonic()))
+    timeout = TimeoutError(f"no response within {deadline} seconds")
+    return {key: results.get(key, timeout) for key in calls}
+
+def fetch_all_league_games(deadline=SCOREBOARD_DEADLINE):
+    """Fetch every league's scoreboard concurrently.
+
+    Returns {league: [games] or the exception it failed with}. A league that
+    has not answered within `deadline` seconds is reported as a TimeoutError
+    instead of holding up the others.
+    """
+    return run_with_deadline({league: functools.partial(fetch_league_games, league) for league in LEAGUES},
+                             deadline)
+
+# Watch mode: poll often while games are live, back off before kickoff, stop once everything is final
+WATCH_LIVE_INTERVAL = 5  # Seconds between polls while any game is in progress
+WATCH_PRE_MIN_INTERVAL = 30  # Floor for polls before kickoff (and for games delayed past it)
+WATCH_PRE_MAX_INTERVAL = 15 * 60
+WATCH_KICKOFF_LEAD = 60  # Poll this many seconds before the earliest scheduled start
+WATCH_ERROR_INTERVAL = 30
+
+def game_signature(game):
+    """The fields whose change makes a game worth redrawing"""
+    return (game['state'], game['away_score'], game['home_score'], game['short_detail'])
+
+def next_poll_interval(games, now=None):
+    """Seconds until the next scoreboard poll, or None when no game can change any more"""
+    if any(game['state'] == 'in' for game in games):
+        return WATCH_LIVE_INTERVAL
+    pre_games = [game for game in games if game['state'] == 'pre']
+    if not pre_games:
+        return None
+    now = now or datetime.now(timezone.utc)
+    starts = []
+    for game in pre_games:
+        try:
+            starts.append(datetime.fromisoformat(game['start'].replace('Z', '+00:00')))
+        except (AttributeError, ValueError):
+            return WATCH_PRE_MAX_INTERVAL  # Unknown kickoff; check back at the slowest rate
+    until_kickoff = (min(starts) - now).total_seconds() - WATCH_KICKOFF_LEAD
+    return max(WATCH_PRE_MIN_INTERVAL, min(WATCH_PRE_MAX_INTERVAL, until_kickoff))
+
+def watch_scoreboard(sport, league):
+    """Poll a scoreboard on an event-state driven schedule.
+
+    After every poll yields (games that changed since the previous poll, seconds
+    until the next poll). The first poll reports every game. A failed poll
+    yields the exception in place of the games. Stops after yielding an
+    interval of None.
+    """
+    last_seen = {}
+    while True:
+        try:
+            games = [summarize_event(event) for event in fetch_scoreboard(sport, league).get('events', [])]
+        except Exception as e:
+            yield e, WATCH_ERROR_INTERVAL
+            time.sleep(WATCH_ERROR_INTERVAL)
+            continue
+        changed = [game for game in games if last_seen.get(game['id']) != game_signature(game)]
+        last_seen = {game['id']: game_signature(game) for game in games}
+        interval = next_poll_interval(games)
+        yield changed, interval
+        if interval is None:
+            return
+        time.sleep(interval)
+
+def print_game(game):
+    """Print one summarized game: the start time before kickoff, otherwise the score"""
+    if game['state'] == 'pre':
+        # The detail field holds the game time in local timezone, e.g. "Sat, May 24th at 3:00 PM EDT"
+        print(f"{game['away']} @ {game['home']}")
+        print(f"Starting: {game['detail']}")
+    elif game['state'] == 'in':
+        print(f"{game['away']} {game['away_score']} @ {game['home']} {game['home_score']}")
+        print(f"Current: {game['short_detail']}")
+    else:  # post-game
+        print(f"Final: {game['away']} {game['away_score']} @ {game['home']} {game['home_score']}")
+
+    # Display venue info for all game states
+    if game['venue'].strip():
+        print(f"Venue: {game['venue'].strip()}")
+
 def get_sports_scores(sport, league, league_name):
     """Fetch sports scores from ESPN API for specified league"""
-    spinner = Halo(f'Getting {league_name} scores...')
+    spinner = make_spinner(f'Getting {league_name} scores...')
     spinner.start()
     try:
-        url = f"https://site.api.espn.com/apis/site/v2/sports/{sport}/{league}/scoreboard"
-        response = requests.get(url)
-        response.raise_for_status()
-        data = response.json()
+        url = scoreboard_url(sport, league)
+        data = fetch_scoreboard(sport, league)
         
         if not data.get('events'):
             print(f"\nNo {league_name} games found.")
@@ -291,7 +1199,8 @@ def get_sports_scores(sport, league, league_name):
             if DEBUG_MODE:
                 print(f"\n--- Debug Info ---")
                 print(f"API URL: {url}")
-                print(f"Data returned: {json.dumps(data, indent=2, default=str)[:500]}...")  # Show truncated data
+                print("Data returned:")
+                print_json_preview(data, max_lines=20)
             
             print("-" * 70)
             return
@@ -300,45 +1209,7 @@ def get_sports_scores(sport, league, league_name):
         print("-" * 50)
         
         for event in data['events']:
-            game_status = event['status']['type']['state']
-            competition = event['competitions'][0]
-            home_team = competition['competitors'][0]
-            away_team = competition['competitors'][1]
-            
-            # Get venue information if available (for all game states)
-            venue_info = ""
-            if competition.get('venue') and competition['venue'].get('fullName'):
-                venue_name = competition['venue']['fullName']
-                # Get city/state if available
-                if competition['venue'].get('address') and competition['venue']['address'].get('city'):
-                    venue_city = competition['venue']['address']['city']
-                    venue_info = f"{venue_name}, {venue_city}"
-                else:
-                    venue_info = venue_name
-            
-            # Format based on game status
-            if game_status == 'pre':
-                # Use the detail field which contains the game time in local timezone
-                # Detail example: "Sat, May 24th at 3:00 PM EDT"
-                game_time = event['status']['type'].get('detail', event['status']['type'].get('shortDetail', 'Scheduled'))
-                
-                print(f"{away_team['team']['displayName']} @ {home_team['team']['displayName']}")
-                print(f"Starting: {game_time}")
-            else:
-                home_score = home_team['score']
-                away_score = away_team['score']
-                
-                if game_status == 'in':
-                    period = event['status']['type']['shortDetail']
-                    print(f"{away_team['team']['displayName']} {away_score} @ {home_team['team']['displayName']} {home_score}")
-                    print(f"Current: {period}")
-                else:  # post-game
-                    print(f"Final: {away_team['team']['displayName']} {away_score} @ {home_team['team']['displayName']} {home_score}")
-            
-            # Display venue info for all game states
-            if venue_info.strip():
-                print(f"Venue: {venue_info.strip()}")
-            
+            print_game(summarize_event(event))
             print("-" * 70)
         
         # Display debug info only in debug mode
@@ -351,8 +1222,10 @@ def get_sports_scores(sport, league, league_name):
                 print("\nMLS Debug: Sample event structure")
                 sample_event = data['events'][0]
                 print(f"Event date format: {sample_event.get('date', 'N/A')}")
-                print(f"Status type: {json.dumps(sample_event.get('status', {}).get('type', {}), indent=2, default=str)}")
-                print(f"League: {json.dumps(data.get('leagues', [{}])[0] if data.get('leagues') else {}, indent=2, default=str)[:200]}...")
+                print("Status type:")
+                print_json_preview(sample_event.get('status', {}).get('type', {}))
+                print("League:")
+                print_json_preview(data.get('leagues', [{}])[0] if data.get('leagues') else {}, max_depth=1, max_lines=10)
                 
     except Exception as e:
         print(f"\nError getting {league_name} scores: {e}")
@@ -368,6 +1241,57 @@ def get_sports_scores(sport, league, league_name):
     
     safe_input("\nPress Enter to continue...")
 
+def watch_sports_scores(sport, league, league_name):
+    """Follow a league's scoreboard, reprinting only the games whose score or status changed"""
+    print(f"\nWatching {league_name} scores (press Ctrl+C to stop)...")
+    first_poll = True
+    try:
+        for changed, interval in watch_scoreboard(sport, league):
+            stamp = datetime.now().strftime("%H:%M:%S")
+            if isinstance(changed, Exception):
+                print(f"\n[{stamp}] Error getting {league_name} scores: {changed} (retrying in {interval} seconds)")
+                continue
+            if first_poll and not changed:
+                print(f"\nNo {league_name} games found.")
+            elif changed:
+                print(f"\n[{stamp}] {'Scoreboard' if first_poll else 'Updated'}:")
+                print("-" * 70)
+                for game in changed:
+                    print_game(game)
+                    print("-" * 70)
+            first_poll = False
+            if interval is None:
+                print(f"\nNo {league_name} games left to follow; stopped watching.")
+            elif DEBUG_MODE:
+                print(f"[debug] Next poll in {interval:.0f} seconds")
+    except KeyboardInterrupt:
+        print("\nStopped watching.")
+
+    safe_input("\nPress Enter to continue...")
+
+def display_all_league_scores():
+    """Fetch all league scoreboards at once and print them as one report"""
+    spinner = make_spinner(f'Getting scores for {len(LEAGUES)} leagues...')
+    spinner.start()
+    try:
+        results = fetch_all_league_games()
+    finally:
+        spinner.stop()
+
+    for league, games in results.items():
+        league_name = LEAGUES[league][2]
+        print(f"\n=== {league_name} ===")
+        if isinstance(games, Exception):
+            print(f"Error getting {league_name} scores: {games}")
+        elif not games:
+            print(f"No {league_name} games found.")
+        else:
+            for game in games:
+                print_game(game)
+                print("-" * 70)
+
+    safe_input("\nPress Enter to continue...")
+
 def get_nfl_scores():
     """Fetch NFL scores from ESPN API (legacy function for compatibility)"""
     get_sports_scores("football", "nfl", "NFL")
@@ -377,39 +1301,38 @@ def scores_menu():
     while True:
         try:
             print("\n=== Sports Scores Menu ===")
-            print("1. NFL")
-            print("2. MLB")
-            print("3. NHL")
-            print("4. NBA")
-            print("5. MLS")
-            print("6. College Football")
+            for number, (_, _, league_name) in enumerate(LEAGUES.values(), 1):
+                print(f"{number}. {league_name}")
+            all_option = len(LEAGUES) + 1
+            print(f"{all_option}. All leagues")
+            print(f"{all_option + 1}. Watch live scores")
             
             # Conditionally add the debug option
             if DEBUG_MODE:
-                print("7. View Raw API Data")
-                print("8. Return to main menu")
-                max_option = 8
+                print(f"{all_option + 2}. View Raw API Data")
+                print(f"{all_option + 3}. Return to main menu")
+                max_option = all_option + 3
             else:
-                print("7. Return to main menu")
-                max_option = 7
+                print(f"{all_option + 2}. Return to main menu")
+                max_option = all_option + 2
             
             choice = safe_input(f"\nEnter your choice (1-{max_option}): ")
             
-            if choice == "1":
-                get_sports_scores("football", "nfl", "NFL")
-            elif choice == "2":
-                get_sports_scores("baseball", "mlb", "MLB")
-            elif choice == "3":
-                get_sports_scores("hockey", "nhl", "NHL")
-            elif choice == "4":
-                get_sports_scores("basketball", "nba", "NBA")
-            elif choice == "5":
-                get_sports_scores("soccer", "usa.1", "MLS")
-            elif choice == "6":
-                get_sports_scores("football", "college-football", "NCAA Football")
-            elif choice == "7" and DEBUG_MODE:
+            if choice.isdigit() and 1 <= int(choice) <= len(LEAGUES):
+                get_sports_scores(*list(LEAGUES.values())[int(choice) - 1])
+            elif choice == str(all_option):
+                display_all_league_scores()
+            elif choice == str(all_option + 1):
+                for number, (_, _, league_name) in enumerate(LEAGUES.values(), 1):
+                    print(f"{number}. {league_name}")
+                league_choice = safe_input(f"\nWhich league? (1-{len(LEAGUES)}): ")
+                if league_choice.isdigit() and 1 <= int(league_choice) <= len(LEAGUES):
+                    watch_sports_scores(*list(LEAGUES.values())[int(league_choice) - 1])
+                else:
+                    print(f"\nInvalid choice. Please enter 1-{len(LEAGUES)}.")
+            elif choice == str(all_option + 2) and DEBUG_MODE:
                 view_raw_sports_data_menu()
-            elif (choice == "7" and not DEBUG_MODE) or (choice == "8" and DEBUG_MODE):
+            elif choice == str(max_option):
                 return
             else:
                 print(f"\nInvalid choice. Please enter 1-{max_option}.")
@@ -418,77 +1341,169 @@ def scores_menu():
         except EOFError:
             exit_gracefully("\n\nEnd of input. Goodbye!")
 
+# Raw payload explorer: path queries and depth-limited previews that only serialize what is shown
+RAW_PREVIEW_DEPTH = 2
+RAW_PREVIEW_ITEMS = 10  # Keys or list items shown per container before the rest are summarized
+RAW_PREVIEW_LINES = 60
+RAW_PREVIEW_STRING = 120  # Longer strings are cut to this many characters
+RAW_MAX_MATCHES = 20
+
+_JSON_PATH_TOKEN = re.compile(r'\[(\*|-?\d+)\]|\.?([^.\[\]]+)')
+
+def parse_json_path(path):
+    """Split a path such as 'events[*].status.type' into steps: keys, list indexes and '*' wildcards"""
+    steps = []
+    position = 0
+    while position < len(path):
+        match = _JSON_PATH_TOKEN.match(path, position)
+        if match is None:
+            raise ValueError(f"Invalid path near '{path[position:]}'")
+        index, key = match.groups()
+        steps.append(key if index is None else ('*' if index == '*' else int(index)))
+        position = match.end()
+    return steps
+
+def select_json_path(data, steps, prefix='$'):
+    """Lazily yield (path, value) for every node the parsed path steps match"""
+    if not steps:
+        yield prefix, data
+        return
+    step, rest = steps[0], steps[1:]
+    if step == '*':
+        if isinstance(data, dict):
+            children = ((f"{prefix}.{key}", child) for key, child in data.items())
+        elif isinstance(data, list):
+            children = ((f"{prefix}[{index}]", child) for index, child in enumerate(data))
+        else:
+            return
+    elif isinstance(step, int):
+        if not isinstance(data, list) or not -len(data) <= step < len(data):
+            return
+        children = [(f"{prefix}[{step}]", data[step])]
+    else:
+        if not isinstance(data, dict) or step not in data:
+            return
+        children = [(f"{prefix}.{step}", data[step])]
+    for child_path, child in children:
+        yield from select_json_path(child, rest, child_path)
+
+def iter_json_lines(value, max_depth=RAW_PREVIEW_DEPTH, max_items=RAW_PREVIEW_ITEMS, indent=0, label=''):
+    """Yield indented preview lines for a JSON value, one at a time.
+
+    Containers deeper than max_depth and items past max_items are summarized
+    rather than serialized, so the cost follows the lines actually consumed.
+    """
+    pad = '  ' * indent
+    if isinstance(value, (dict, list)) and value:
+        opener, closer, noun = ('{', '}', 'keys') if isinstance(value, dict) else ('[', ']', 'items')
+        if max_depth <= 0:
+            yield f"{pad}{label}{opener}...{closer} ({len(value)} {noun})"
+            return
+        yield f"{pad}{label}{opener}"
+        items = value.items() if isinstance(value, dict) else enumerate(value)
+        for position, (key, child) in enumerate(items):
+            if position == max_items:
+                yield f"{pad}  ... {len(value) - position} more {noun}"
+                break
+            child_label = f"{json.dumps(key)}: " if isinstance(value, dict) else ''
+            yield from iter_json_lines(child, max_depth - 1, max_items, indent + 1, child_label)
+        yield f"{pad}{closer}"
+    else:
+        text = json.dumps(value, default=str)
+        if len(text) > RAW_PREVIEW_STRING:
+            text = text[:RAW_PREVIEW_STRING] + '..."'
+        yield f"{pad}{label}{text}"
+
+def print_json_preview(value, max_depth=RAW_PREVIEW_DEPTH, max_lines=RAW_PREVIEW_LINES):
+    """Print the first max_lines lines of a depth-limited preview of a JSON value"""
+    lines = iter_json_lines(value, max_depth)
+    for line in itertools.islice(lines, max_lines):
+        print(line)
+    if next(lines, None) is not None:
+        print(f"... (preview stops at {max_lines} lines)")
+
+def explore_raw_payload(data):
+    """Prompt for path queries against a decoded payload and preview each match"""
+    print("\nQuery the payload by path, e.g. events[*].status.type, events[0].competitions[0].venue or leagues.*")
+    print(f"Add a depth after the path to expand further (default {RAW_PREVIEW_DEPTH}), e.g. 'events[0] 4'.")
+    while True:
+        query = safe_input("\nPath (blank to finish): ").strip()
+        if not query:
+            return
+        path, _, depth_text = query.partition(' ')
+        try:
+            steps = parse_json_path(path)
+            depth = int(depth_text) if depth_text.strip() else RAW_PREVIEW_DEPTH
+        except ValueError as e:
+            print(f"\nInvalid query: {e}")
+            continue
+
+        matches = select_json_path(data, steps)
+        shown = 0
+        for match_path, value in itertools.islice(matches, RAW_MAX_MATCHES):
+            shown += 1
+            print(f"\n{match_path}:")
+            print_json_preview(value, depth)
+        if shown == 0:
+            print("\nNothing matches that path.")
+        elif next(matches, None) is not None:
+            print(f"\n... showing the first {RAW_MAX_MATCHES} matches")
+
 def view_raw_sports_data(sport, league, league_name):
-    """View raw JSON data from the ESPN API for a specific league"""
-    spinner = Halo(f'Fetching raw {league_name} API data...')
+    """Explore the raw ESPN API payload for a specific league"""
+    spinner = make_spinner(f'Fetching raw {league_name} API data...')
     spinner.start()
     try:
-        url = f"https://site.api.espn.com/apis/site/v2/sports/{sport}/{league}/scoreboard"
-        response = requests.get(url)
-        response.raise_for_status()
-        data = response.json()
-        spinner.stop()
-        
-        print(f"\n=== Raw {league_name} API Data ===")
-        print(f"API URL: {url}")
-        print("\nJSON Response (first 1000 characters):")
-        print("-" * 80)
-        print(json.dumps(data, indent=2, default=str)[:1000])
-        print("...")
-        print("-" * 80)
-        
-        # Show important sections of the data structure
-        if data.get('events'):
-            print("\nImportant Data Fields:")
-            print("-" * 80)
-            print(f"Number of events: {len(data['events'])}")
-            
-            if len(data['events']) > 0:
-                sample_event = data['events'][0]
-                print(f"\nSample Event ID: {sample_event.get('id', 'N/A')}")
-                print(f"Event Date: {sample_event.get('date', 'N/A')}")
-                print(f"Status State: {sample_event.get('status', {}).get('type', {}).get('state', 'N/A')}")
-                print(f"Status Detail: {sample_event.get('status', {}).get('type', {}).get('shortDetail', 'N/A')}")
-        else:
-            print("\nNo events found in the API response.")
-        
+        url = scoreboard_url(sport, league)
+        data = fetch_scoreboard(sport, league)
     except Exception as e:
         spinner.fail(f"Error fetching {league_name} data: {e}")
+        print("\n")
+        safe_input("Press Enter to continue...")
+        return
+    spinner.stop()
+    
+    print(f"\n=== Raw {league_name} API Data ===")
+    print(f"API URL: {url}")
+    print("\nTop-level structure:")
+    print("-" * 80)
+    print_json_preview(data, max_depth=1)
+    print("-" * 80)
+    
+    # Show important sections of the data structure
+    if data.get('events'):
+        print("\nImportant Data Fields:")
+        print("-" * 80)
+        print(f"Number of events: {len(data['events'])}")
+        
+        if len(data['events']) > 0:
+            sample_event = data['events'][0]
+            print(f"\nSample Event ID: {sample_event.get('id', 'N/A')}")
+            print(f"Event Date: {sample_event.get('date', 'N/A')}")
+            print(f"Status State: {sample_event.get('status', {}).get('type', {}).get('state', 'N/A')}")
+            print(f"Status Detail: {sample_event.get('status', {}).get('type', {}).get('shortDetail', 'N/A')}")
+    else:
+        print("\nNo events found in the API response.")
     
-    print("\n")
-    safe_input("Press Enter to continue...")
+    explore_raw_payload(data)
 
 def view_raw_sports_data_menu():
     """Display and handle raw sports data menu"""
     while True:
         try:
             print("\n=== View Raw Sports Data Menu ===")
-            print("1. NFL")
-            print("2. MLB")
-            print("3. NHL")
-            print("4. NBA")
-            print("5. MLS")
-            print("6. College Football")
-            print("7. Return to sports scores menu")
+            for number, (_, _, league_name) in enumerate(LEAGUES.values(), 1):
+                print(f"{number}. {league_name}")
+            print(f"{len(LEAGUES) + 1}. Return to sports scores menu")
             
-            choice = safe_input("\nEnter your choice (1-7): ")
+            choice = safe_input(f"\nEnter your choice (1-{len(LEAGUES) + 1}): ")
             
-            if choice == "1":
-                view_raw_sports_data("football", "nfl", "NFL")
-            elif choice == "2":
-                view_raw_sports_data("baseball", "mlb", "MLB")
-            elif choice == "3":
-                view_raw_sports_data("hockey", "nhl", "NHL")
-            elif choice == "4":
-                view_raw_sports_data("basketball", "nba", "NBA")
-            elif choice == "5":
-                view_raw_sports_data("soccer", "usa.1", "MLS")
-            elif choice == "6":
-                view_raw_sports_data("football", "college-football", "NCAA Football")
-            elif choice == "7":
+            if choice.isdigit() and 1 <= int(choice) <= len(LEAGUES):
+                view_raw_sports_data(*list(LEAGUES.values())[int(choice) - 1])
+            elif choice == str(len(LEAGUES) + 1):
                 return
             else:
-                print("\nInvalid choice. Please enter 1-7.")
+                print(f"\nInvalid choice. Please enter 1-{len(LEAGUES) + 1}.")
         except KeyboardInterrupt:
             exit_gracefully("\n\nProgram interrupted. Goodbye!")
         except EOFError:
@@ -499,20 +1514,33 @@ def nfl_menu():
     """Redirects to the scores menu for backward compatibility"""
     scores_menu()
 
+def fetch_news(domain, max_results=5):
+    """Return the latest GNews articles for a site as [{'title', 'published', 'url', 'description', 'publisher'}]"""
+    from gnews import GNews
+    from dateutil import parser as dateutil_parser  # Renamed to avoid naming conflict
+    google_news = GNews(language='en', country='US', period='1d', max_results=max_results)
+    return [{'title': article['title'],
+             'published': dateutil_parser.parse(article['published date']),
+             'url': article['url'],
+             'description': article.get('description') or '',
+             'publisher': _gnews_publisher(article)}
+            for article in google_news.get_news_by_site(domain) or []]
+
+def _gnews_publisher(article):
+    """The publisher name GNews reports for an article ({'title': ...}), or None"""
+    publisher = article.get('publisher')
+    return publisher.get('title') if isinstance(publisher, dict) else None
+
 def get_news(domain=None):
     """Fetch news articles using GNews"""
-    spinner = Halo('Fetching news articles...')
+    spinner = make_spinner('Fetching news articles...')
     spinner.start()
     
     try:
-        # Initialize GNews with default settings
-        google_news = GNews(language='en', country='US', period='1d', max_results=5)
-        
         # Set default domain to wsj.com if none provided
         domain = domain or 'wsj.com'
         
-        # Use the correct method to fetch articles by site
-        articles = google_news.get_news_by_site(domain)
+        articles = fetch_news_cached(domain)
         
         if not articles:
             print(f"\nNo articles found for domain: {domain}")
@@ -522,9 +1550,7 @@ def get_news(domain=None):
         print("-" * 80)
         
         for article in articles:
-            # Parse and format the date
-            pub_date = dateutil_parser.parse(article['published date'])
-            friendly_date = pub_date.strftime("%B %d, %Y at %I:%M %p")
+            friendly_date = article['published'].strftime("%B %d, %Y at %I:%M %p")
             
             print(f"Title: {article['title']}")
             print(f"Published: {friendly_date}")
@@ -532,7 +1558,8 @@ def get_news(domain=None):
             print("-" * 80)
         
         # Save the domain to database if successful
-        save_news_site(domain)
+        if domain not in DEFAULT_NEWS_SITES:
+            save_news_site(domain)
         return True
             
     except Exception as e:
@@ -542,15 +1569,211 @@ def get_news(domain=None):
     
     safe_input("\nPress Enter to continue...")
 
-def news_menu():
-    """Display and handle news menu"""
-    # Default news sites to include
-    default_sites = ['wsj.com', 'washingtonpost.com', 'nytimes.com', 'apnews.com']
-    
-    # Initialize default news sites in the database if they don't exist
-    for site in default_sites:
-        save_news_site(site)
-    
+# Default news sites; always listed, so they are never stored in news_sites
+DEFAULT_NEWS_SITES = ['wsj.com', 'washingtonpost.com', 'nytimes.com', 'apnews.com']
+
+NEWS_DIGEST_DEADLINE = 30  # Seconds the all-sources digest waits before giving up on a slow site
+
+def fetch_news_cached(domain, max_results=5):
+    """fetch_news, reusing a site's articles from cache.db until the 'gnews' policy expires them"""
+    key = _cache_key('GNEWS', domain, {'params': {'max_results': max_results}})
+    body = _fresh_cache_body(key)
+    if body is not None:
+        return [{**article, 'published': datetime.fromisoformat(article['published'])} for article in json.loads(body)]
+    articles = fetch_news(domain, max_results)
+    body = json.dumps([{**article, 'published': article['published'].isoformat()} for article in articles])
+    _store_cache_entry(key, 200, {'Content-Type': 'application/json'}, body.encode(),
+                       CACHE_POLICIES['gnews'](datetime.now()).timestamp())
+    return articles
+
+def news_digest_sites():
+    """Default sites followed by the user's saved sites"""
+    return DEFAULT_NEWS_SITES + [site for site in get_saved_news_sites() if site not in DEFAULT_NEWS_SITES]
+
+def _aware(published):
+    """Sites report naive or aware times; treat naive ones as UTC so they sort together"""
+    return published if published.tzinfo else published.replace(tzinfo=timezone.utc)
+
+def fetch_news_digest(domains, max_results=5, deadline=NEWS_DIGEST_DEADLINE):
+    """Fetch several sites concurrently and merge their articles, newest first.
+
+    Returns (articles with a 'source' key added, {domain: exception} for
+    sites that failed or did not answer within `deadline` seconds).
+    """
+    results = run_with_deadline({domain: functools.partial(fetch_news_cached, domain, max_results)
+                                 for domain in domains}, deadline)
+    articles, errors = [], {}
+    for domain, result in results.items():
+        if isinstance(result, Exception):
+            errors[domain] = result
+        else:
+            articles.extend({**article, 'source': domain} for article in result)
+    articles.sort(key=lambda article: _aware(article['published']), reverse=True)
+    return articles, errors
+
+# Near-duplicate stories: MinHash signatures of each article's words, banded so candidates are found by lookup
+NEWS_DUPLICATE_SIMILARITY = 0.6  # Word-set Jaccard similarity at which two articles are the same story
+NEWS_MINHASH_BANDS = 10
+NEWS_MINHASH_ROWS = 3  # Hashes per band; a pair at the similarity threshold shares a band ~90% of the time
+NEWS_SEEN_RETENTION = timedelta(days=14)
+NEWS_STOP_WORDS = frozenset('a an and are as at be by for from has have in is it its of on or says the to was with'.split())
+
+_MINHASH_PRIME = (1 << 61) - 1
+_minhash_random = random.Random(20240601)  # Fixed seed: band keys are stored, so the hash family must not change
+_MINHASH_COEFFICIENTS = [(_minhash_random.randrange(1, _MINHASH_PRIME), _minhash_random.randrange(_MINHASH_PRIME))
+                         for _ in range(NEWS_MINHASH_BANDS * NEWS_MINHASH_ROWS)]
+
+def article_tokens(article):
+    """The set of words in an article's title and description, without stop words or the publisher's name"""
+    title = article['title']
+    publisher = article.get('publisher') or ''
+    if publisher and title.endswith(f" - {publisher}"):
+        title = title[:-len(publisher) - 3]
+    words = set(re.findall(r'\w+', f"{title} {article.get('description') or ''}".lower()))
+    return frozenset(words - NEWS_STOP_WORDS - set(re.findall(r'\w+', publisher.lower())))
+
+def minhash_band_keys(tokens):
+    """One signed 64-bit key per MinHash band; near-duplicate token sets share at least one key with high probability"""
+    hashed = [int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), 'big') for token in tokens] or [0]
+    signature = [min((a * value + b) % _MINHASH_PRIME for value in hashed) for a, b in _MINHASH_COEFFICIENTS]
+    keys = []
+    for band in range(NEWS_MINHASH_BANDS):
+        rows = signature[band * NEWS_MINHASH_ROWS:(band + 1) * NEWS_MINHASH_ROWS]
+        digest = hashlib.blake2b(repr((band, rows)).encode(), digest_size=8).digest()
+        keys.append(int.from_bytes(digest, 'big', signed=True))  # Signed so it fits an SQLite INTEGER
+    return keys
+
+def jaccard(a, b):
+    """Jaccard similarity of two sets"""
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+def cluster_articles(articles):
+    """Group near-duplicate articles into stories, newest story first.
+
+    Each article is only compared with the articles it shares a MinHash band
+    with, so the work grows with the number of articles rather than the
+    number of pairs. Returns [[article, ...]], newest article first within a
+    story; every article gains 'tokens' and 'band_keys'.
+    """
+    parent = list(range(len(articles)))
+
+    def root(index):
+        while parent[index] != index:
+            parent[index] = parent[parent[index]]
+            index = parent[index]
+        return index
+
+    buckets = collections.defaultdict(list)
+    for index, article in enumerate(articles):
+        article['tokens'] = article_tokens(article)
+        article['band_keys'] = minhash_band_keys(article['tokens'])
+        candidates = {other for key in article['band_keys'] for other in buckets[key]}
+        for other in candidates:
+            if jaccard(article['tokens'], articles[other]['tokens']) >= NEWS_DUPLICATE_SIMILARITY:
+                parent[root(other)] = root(index)
+        for key in article['band_keys']:
+            buckets[key].append(index)
+
+    stories = collections.defaultdict(list)
+    for index, article in enumerate(articles):
+        stories[root(index)].append(article)
+    newest = lambda article: _aware(article['published'])
+    return sorted((sorted(story, key=newest, reverse=True) for story in stories.values()),
+                  key=lambda story: newest(story[0]), reverse=True)
+
+def split_seen_stories(stories):
+    """Separate stories with an article already shown in an earlier digest; returns (new stories, seen stories)"""
+    keys = sorted({key for story in stories for article in story for key in article['band_keys']})
+    candidates = collections.defaultdict(dict)  # band key: {seen id: tokens}
+    with history_db() as conn:
+        for start in range(0, len(keys), 500):  # Stay under SQLite's bound-parameter limit
+            chunk = keys[start:start + 500]
+            for key, seen_id, tokens in conn.execute(f'''
+                    SELECT b.band_key, s.id, s.tokens FROM news_seen_bands b
+                    JOIN news_seen s ON s.id = b.seen_id
+                    WHERE b.band_key IN ({', '.join('?' * len(chunk))})''', chunk):
+                candidates[key][seen_id] = tokens
+
+    new, seen = [], []
+    for story in stories:
+        shown = any(jaccard(article['tokens'], frozenset(tokens.split())) >= NEWS_DUPLICATE_SIMILARITY
+                    for article in story for key in article['band_keys']
+                    for tokens in candidates.get(key, {}).values())
+        (seen if shown else new).append(story)
+    return new, seen
+
+def record_shown_stories(stories):
+    """Remember every article of the given stories so later digests can suppress them"""
+    now = datetime.now()
+    with history_db() as conn:
+        for story in stories:
+            for article in story:
+                seen_id = conn.execute('INSERT INTO news_seen (tokens, title, url, first_seen) VALUES (?, ?, ?, ?)',
+                                       (' '.join(sorted(article['tokens'])), article['title'], article['url'],
+                                        now)).lastrowid
+                conn.executemany('INSERT INTO news_seen_bands (band_key, seen_id) VALUES (?, ?)',
+                                 [(key, seen_id) for key in article['band_keys']])
+
+def prune_seen_news(retention=NEWS_SEEN_RETENTION):
+    """Forget shown articles older than the retention period; returns the number removed"""
+    cutoff = datetime.now() - retention
+    with history_db() as conn:
+        conn.execute('''DELETE FROM news_seen_bands
+                        WHERE seen_id IN (SELECT id FROM news_seen WHERE first_seen < ?)''', (cutoff,))
+        return conn.execute('DELETE FROM news_seen WHERE first_seen < ?', (cutoff,)).rowcount
+
+def news_digest_stories(include_seen=False):
+    """Fetch the digest, collapse near-duplicates into stories and drop stories shown before.
+
+    Returns (new stories, number of stories suppressed as already shown,
+    {domain: exception}). The returned stories are recorded as shown.
+    """
+    articles, errors = fetch_news_digest(news_digest_sites())
+    stories = cluster_articles(articles)
+    new, seen = (stories, []) if include_seen else split_seen_stories(stories)
+    record_shown_stories(new)
+    return new, len(seen), errors
+
+def display_news_digest():
+    """Print one feed of the latest stories from every default and saved site, near-duplicates collapsed"""
+    sites = news_digest_sites()
+    spinner = make_spinner(f'Fetching news from {len(sites)} sites...')
+    spinner.start()
+    start = time.perf_counter()
+    try:
+        stories, seen, errors = news_digest_stories()
+    except Exception as e:
+        spinner.fail(f"Error building the news digest: {e}")
+        safe_input("\nPress Enter to continue...")
+        return
+    finally:
+        spinner.stop()
+
+    print(f"\nLatest news from {len(sites) - len(errors)} of {len(sites)} sites "
+          f"({time.perf_counter() - start:.1f} s):")
+    print("-" * 80)
+    for story in stories:
+        article = story[0]
+        print(f"Title: {article['title']}")
+        print(f"Source: {article['source']}")
+        print(f"Published: {article['published'].strftime('%B %d, %Y at %I:%M %p')}")
+        print(f"URL: {article['url']}")
+        if len(story) > 1:
+            print(f"Also reported by: {', '.join(sorted({other['source'] for other in story[1:]}))}")
+        print("-" * 80)
+    if not stories:
+        print("No new articles found.")
+    if seen:
+        print(f"{seen} {'story' if seen == 1 else 'stories'} already shown in an earlier digest not repeated.")
+    for domain, error in errors.items():
+        print(f"Could not fetch {domain}: {error}")
+
+    safe_input("\nPress Enter to continue...")
+
+def news_menu():
+    """Display and handle news menu"""
+    default_sites = DEFAULT_NEWS_SITES
+    
     while True:
         try:
             # Get saved news sites from database
@@ -578,11 +1801,12 @@ def news_menu():
             
             # Add options at the bottom
             print("\n=== Options ===")
-            print(f"{next_index}. Enter a new domain")
-            print(f"{next_index + 1}. Return to main menu")
+            print(f"{next_index}. All sources digest")
+            print(f"{next_index + 1}. Enter a new domain")
+            print(f"{next_index + 2}. Return to main menu")
             
             # Calculate total options
-            total_options = next_index + 1
+            total_options = next_index + 2
             choice = safe_input(f"\nEnter your choice (1-{total_options}): ")
             
             try:
@@ -595,6 +1819,8 @@ def news_menu():
                     # User selected a saved site
                     selected_site = user_saved_sites[choice_num - (1 + len(default_sites))]
                     get_news(selected_site)
+                elif choice_num == total_options - 2:
+                    display_news_digest()
                 elif choice_num == total_options - 1:
                     # User selected "Enter a new domain"
                     domain = safe_input("\nEnter domain (e.g., wsj.com): ")
@@ -612,84 +1838,212 @@ def news_menu():
         except EOFError:
             exit_gracefully("\n\nEnd of input. Goodbye!")
 
-def get_bls_data(series_id):
-    """Fetch data from BLS API for a given series ID"""
-    url = f"https://api.bls.gov/publicAPI/v2/timeseries/data/{series_id}"
-    headers = {'Content-type': 'application/json'}
-    data = json.dumps({
-        "seriesid": [series_id],
-        "startyear": "2022",
-        "endyear": "2023"
-    })
-    response = requests.post(url, headers=headers, data=data)
-    response.raise_for_status()
-    return response.json()
+# Local time-series store for FRED and BLS observations (history.db)
+BLS_HISTORY_YEARS = 10  # Years of BLS history loaded the first time a series is stored
+
+def store_observations(source, series_id, observations):
+    """Upsert (date, value) pairs for a series; a value of None marks a missing observation"""
+    with history_db() as conn:
+        conn.executemany('''INSERT OR REPLACE INTO observations (source, series_id, date, value)
+                            VALUES (?, ?, ?, ?)''',
+                         [(source, series_id, date, value) for date, value in observations])
+
+def get_stored_observations(source, series_id, limit=None):
+    """Return [(date, value)] for a stored series, newest first"""
+    with history_db() as conn:
+        return conn.execute('''SELECT date, value FROM observations
+                               WHERE source = ? AND series_id = ?
+                               ORDER BY date DESC LIMIT ?''',
+                            (source, series_id, limit if limit is not None else -1)).fetchall()
+
+def get_last_stored_date(source, series_id):
+    """Return the date of the newest stored observation for a series, or None"""
+    with history_db() as conn:
+        return conn.execute('SELECT MAX(date) FROM observations WHERE source = ? AND series_id = ?',
+                            (source, series_id)).fetchone()[0]
+
+def parse_observation_value(value):
+    """Convert an API value to float; FRED uses '.' and BLS uses '-' for missing data"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def display_stored_history(source, series, count=24):
+    """Let the user pick a series and print its most recent stored observations (no network)"""
+    names = list(series)
+    print(f"\nStored {source.upper()} series:")
+    for i, name in enumerate(names, 1):
+        print(f"{i}. {name}")
+    choice = safe_input(f"\nSelect a series (1-{len(names)}, or 0 to go back): ")
+    try:
+        choice = int(choice)
+    except ValueError:
+        print("\nPlease enter a valid number.")
+        return
+    if choice == 0:
+        return
+    if not 1 <= choice <= len(names):
+        print("\nInvalid selection.")
+        return
+
+    name = names[choice - 1]
+    observations = get_stored_observations(source, series[name]['id'], limit=count)
+    if not observations:
+        print(f"\nNo stored data for {name} yet. View the latest indicators first to load it.")
+        return
+    print(f"\n{name} - last {len(observations)} stored observations:")
+    print("-" * 50)
+    for date, value in observations:
+        print(f"  {date}  {value if value is not None else 'N/A'}")
+    safe_input("\nPress Enter to continue...")
+
+# BLS v2 API limits per request: (series, years) without and with a registration key
+BLS_API_URL = "https://api.bls.gov/publicAPI/v2/timeseries/data/"
+BLS_LIMITS_UNREGISTERED = (25, 10)
+BLS_LIMITS_REGISTERED = (50, 20)
+BLS_DEFAULT_YEARS = 2  # Current and previous year, so January still has a prior month to compare
+
+def bls_year_windows(start_year, end_year, max_years):
+    """Split [start_year, end_year] into windows of at most max_years, newest first"""
+    windows = []
+    while end_year >= start_year:
+        windows.append((max(start_year, end_year - max_years + 1), end_year))
+        end_year -= max_years
+    return windows
+
+def bls_request_succeeded(response):
+    """BLS reports quota and other errors as 200 responses; only REQUEST_SUCCEEDED payloads may be cached"""
+    try:
+        return response.json().get('status') == 'REQUEST_SUCCEEDED'
+    except ValueError:
+        return False
+
+def get_bls_data(series_ids, start_year=None, end_year=None):
+    """Fetch several BLS series in as few requests as the API limits allow.
+
+    The year window defaults to the last BLS_DEFAULT_YEARS years. Requests are
+    split when there are more series or years than one request may carry (set
+    BLS_API_KEY for the higher registered limits). Returns {series_id: data},
+    with each series' observations newest first as the API orders them.
+    """
+    api_key = os.getenv("BLS_API_KEY")
+    max_series, max_years = BLS_LIMITS_REGISTERED if api_key else BLS_LIMITS_UNREGISTERED
+    end_year = end_year or datetime.now().year
+    start_year = start_year or end_year - BLS_DEFAULT_YEARS + 1
+
+    results = {series_id: [] for series_id in series_ids}
+    for first, last in bls_year_windows(start_year, end_year, max_years):
+        for i in range(0, len(series_ids), max_series):
+            payload = {
+                "seriesid": series_ids[i:i + max_series],
+                "startyear": str(first),
+                "endyear": str(last)
+            }
+            if api_key:
+                payload["registrationkey"] = api_key
+            response = http_post(BLS_API_URL, json=payload, cache='bls', validate=bls_request_succeeded)
+            response.raise_for_status()
+            data = response.json()
+            if data.get('status') != 'REQUEST_SUCCEEDED':
+                raise ValueError(f"BLS request failed: {', '.join(data.get('message') or [data.get('status', 'unknown status')])}")
+            for series in data.get('Results', {}).get('series', []):
+                results.setdefault(series['seriesID'], []).extend(series.get('data', []))
+    return results
+
+# Indicator metadata: percent_change marks levels/indexes whose changes are shown in percent
+# (rates such as unemployment are compared in points instead)
+BLS_SERIES = {
+    "CPI": {"id": "CUSR0000SA0", "percent_change": True},
+    "CPI Less Food and Energy": {"id": "CUSR0000SA0L1E", "percent_change": True},
+    "PPI": {"id": "PCUOMFG--OMFG--", "percent_change": True},
+    "Nonfarm Payroll": {"id": "CES0000000001", "percent_change": True},
+    "Unemployment Rate": {"id": "LNS14000000", "percent_change": False},
+    "Employment in Residential Construction": {"id": "CES2023610001", "percent_change": True}
+}
+
+def bls_observation_date(item):
+    """Map a BLS data item to an ISO date (first of the month); None for annual averages and other periods"""
+    period = item.get('period', '')
+    if not period.startswith('M') or period == 'M13':
+        return None
+    return f"{item['year']}-{period[1:]}-01"
+
+def refresh_bls_series(series_ids):
+    """Bring stored BLS series up to date, requesting only the years not already stored.
+
+    The newest stored year is requested again because it is usually incomplete.
+    Series that start from the same year share one batched request.
+    """
+    current_year = datetime.now().year
+    by_start_year = {}
+    for series_id in series_ids:
+        last_date = get_last_stored_date('bls', series_id)
+        start_year = int(last_date[:4]) if last_date else current_year - BLS_HISTORY_YEARS + 1
+        by_start_year.setdefault(start_year, []).append(series_id)
+
+    for start_year, ids in by_start_year.items():
+        for series_id, items in get_bls_data(ids, start_year=start_year, end_year=current_year).items():
+            store_observations('bls', series_id,
+                               [(bls_observation_date(item), parse_observation_value(item['value']))
+                                for item in items if bls_observation_date(item)])
 
 def display_bls_data():
-    """Display economic indicators from BLS API"""
-    # Removed global spinner initialization and start
+    """Display economic indicators from the local store after refreshing it from the BLS API"""
+    series_ids = BLS_SERIES
     
-    series_ids = {
-        "CPI": "CUSR0000SA0",
-        "CPI Less Food and Energy": "CUSR0000SA0L1E",
-        "PPI": "PCUOMFG--OMFG--",
-        "Nonfarm Payroll": "CES0000000001",
-        "Unemployment Rate": "LNS14000000",
-        "Employment in Residential Construction": "CES2023610001"
-    }
+    spinner = make_spinner(text=f'Updating {len(series_ids)} BLS indicators...', spinner='dots')
+    spinner.start()
+    try:
+        refresh_bls_series([info['id'] for info in series_ids.values()]) # This function calls response.raise_for_status()
+        spinner.succeed(f'Successfully updated {len(series_ids)} BLS indicators')
+    except requests.exceptions.HTTPError as e:
+        spinner.fail('Failed to update BLS indicators; showing stored data')
+        error_message = f"HTTP {e.response.status_code} - {e.response.reason}"
+        try: # Try to get more specific error from BLS response
+            error_details = e.response.json().get('message')
+            if error_details:
+                error_message += f": {', '.join(error_details)}"
+        except ValueError: # If response is not JSON or no 'message' field
+            pass
+        print(f"\nError fetching BLS indicators: {error_message}")
+    except Exception as e:
+        spinner.fail('Failed to update BLS indicators; showing stored data')
+        print(f"\nError fetching BLS indicators: {e}")
     
-    for name, series_id in series_ids.items():
-        spinner = Halo(text=f'Fetching {name}...', spinner='dots')
-        spinner.start()
+    for name, info in series_ids.items():
         try:
-            data = get_bls_data(series_id) # This function calls response.raise_for_status()
-            
-            if 'Results' not in data or not data['Results'] or \
-               'series' not in data['Results'] or not data['Results']['series'] or \
-               'data' not in data['Results']['series'][0] or not data['Results']['series'][0]['data']:
-                spinner.fail(f"Failed to fetch {name}: Unexpected data structure or empty series data.")
-                print(f"\n{name}: Unexpected data structure or empty series data received.")
-                continue
-
-            series_data = data['Results']['series'][0]['data']
+            series_data = get_stored_observations('bls', info['id'], limit=13)
             
             if len(series_data) < 2:
-                spinner.warn(f"Insufficient data for {name}")
                 print(f"\n{name}: No sufficient data available (requires at least 2 data points for comparison).")
                 continue
             
-            latest_data = series_data[0]
-            previous_data = series_data[1]
-            
-            latest_value = float(latest_data['value'])
-            previous_value = float(previous_data['value'])
-            year = latest_data['year']
-            period = latest_data['periodName']
-            
-            percentage_change = ((latest_value - previous_value) / previous_value) * 100
-            
-            spinner.succeed(f'Successfully fetched {name}')
+            (latest_date, latest_value), (previous_date, previous_value) = series_data[0], series_data[1]
+            if latest_value is None or previous_value is None:
+                print(f"\n{name}: Data point missing for latest ({latest_date}) or previous ({previous_date}) period.")
+                continue
             
             print(f"\n{name}:")
             print(f"  Value: {latest_value}")
-            print(f"  Date: {period} {year}")
-            print(f"  Month-over-Month Change: {percentage_change:.2f}%")
+            print(f"  Date: {datetime.strptime(latest_date, '%Y-%m-%d').strftime('%B %Y')}")
+            if info['percent_change']:
+                percentage_change = ((latest_value - previous_value) / previous_value) * 100
+                print(f"  Month-over-Month Change: {percentage_change:.2f}%")
+            else:
+                print(f"  Month-over-Month Change: {latest_value - previous_value:+.2f} points")
+            
+            # A year-ago value is available once more than 12 months are stored
+            if len(series_data) == 13:
+                year_ago_date, year_ago_value = series_data[12]
+                if year_ago_value and year_ago_date == f"{int(latest_date[:4]) - 1}{latest_date[4:]}":
+                    if info['percent_change']:
+                        print(f"  Year-over-Year Change: {((latest_value - year_ago_value) / year_ago_value) * 100:.2f}%")
+                    else:
+                        print(f"  Year-over-Year Change: {latest_value - year_ago_value:+.2f} points")
         
-        except requests.exceptions.HTTPError as e:
-            spinner.fail(f'Failed to fetch {name}')
-            error_message = f"HTTP {e.response.status_code} - {e.response.reason}"
-            try: # Try to get more specific error from BLS response
-                error_details = e.response.json().get('message')
-                if error_details:
-                    error_message += f": {', '.join(error_details)}"
-            except ValueError: # If response is not JSON or no 'message' field
-                pass
-            print(f"\nError fetching {name}: {error_message}")
         except Exception as e:
-            spinner.fail(f'Failed to process {name}')
             print(f"\nError processing {name}: {e}")
-            
-    # Removed global spinner stop from a finally block
     
     safe_input("\nPress Enter to continue...")
 
@@ -699,64 +2053,160 @@ def bls_menu():
         try:
             print("\n=== BLS Economic Indicators Menu ===")
             print("1. View latest economic indicators")
-            print("2. Return to main menu")
+            print("2. View stored history for an indicator")
+            print("3. Analytics (from stored history)")
+            print("4. Return to main menu")
             
-            choice = safe_input("\nEnter your choice (1-2): ")
+            choice = safe_input("\nEnter your choice (1-4): ")
             
             if choice == "1":
                 display_bls_data()
             elif choice == "2":
+                display_stored_history('bls', BLS_SERIES)
+            elif choice == "3":
+                display_indicator_analytics('bls', BLS_SERIES)
+            elif choice == "4":
                 return
             else:
-                print("\nInvalid choice. Please enter 1-2.")
+                print("\nInvalid choice. Please enter 1-4.")
         except KeyboardInterrupt:
             exit_gracefully("\n\nProgram interrupted. Goodbye!")
         except EOFError:
             exit_gracefully("\n\nEnd of input. Goodbye!")
 
-def extract_state(matched_address):
-    """Extract the state from the matched address"""
-    address_parts = matched_address.split(',')
-    state = address_parts[-2].strip()  # Assuming state is the second-to-last part
-    return state
+# Local NOAA tide station catalog, stored as arrays laid out as an implicit KD-tree
+TIDE_CATALOG_PATH = 'tide_stations.npz'
+TIDE_CATALOG_MAX_AGE = timedelta(days=30)
+TIDE_STATION_MAX_DISTANCE_KM = 150  # Beyond this an address is treated as having no nearby station
+TIDE_FETCH_WORKERS = 4
+EARTH_RADIUS_KM = 6371
 
+_tide_catalog = None
+_tide_catalog_lock = threading.Lock()  # Concurrent headless jobs must not download the catalog twice
 
-def haversine_distance(lat1, lon1, lat2, lon2):
-    """Calculate the distance between two points on a sphere using the Haversine formula"""
-    R = 6371  # Radius of the Earth in kilometers
-    lat1, lon1, lat2, lon2 = map(math.radians, [lat1, lon1, lat2, lon2])
-    dlat = lat2 - lat1
-    dlon = lon2 - lon1
-    a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon/2)**2
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-    distance = R * c
-    return distance
+def _unit_sphere_points(lat, lon):
+    """Convert latitude/longitude arrays in degrees to 3D points on the unit sphere"""
+    lat = np.radians(lat)
+    lon = np.radians(lon)
+    return np.column_stack((np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)))
 
-def get_nearest_station(address_data):
-    """Find the nearest NOAA tide station using metadata API"""
-    url = f"https://api.tidesandcurrents.noaa.gov/mdapi/prod/webapi/stations.json?format=json"
-    response = requests.get(url)
+def _kdtree_order(points):
+    """Return the permutation that lays points out as an implicit, balanced KD-tree.
+
+    After reordering, the node of every [lo, hi) range is its median element at
+    (lo + hi) // 2, split on axis depth % 3; its subtrees are [lo, mid) and [mid + 1, hi).
+    """
+    order = np.arange(len(points))
+    stack = [(0, len(points), 0)]
+    while stack:
+        lo, hi, axis = stack.pop()
+        if hi - lo <= 1:
+            continue
+        mid = (lo + hi) // 2
+        segment = order[lo:hi]
+        order[lo:hi] = segment[np.argpartition(points[segment, axis], mid - lo)]
+        next_axis = (axis + 1) % 3
+        stack.append((lo, mid, next_axis))
+        stack.append((mid + 1, hi, next_axis))
+    return order
+
+def _kdtree_nearest(points, target, k):
+    """Find the k points nearest to target in a tree built by _kdtree_order.
+
+    Returns (index, squared chord distance) pairs sorted nearest first.
+    """
+    best = []  # Max-heap of (-squared distance, index)
+
+    def search(lo, hi, axis):
+        if lo >= hi:
+            return
+        mid = (lo + hi) // 2
+        point = points[mid]
+        dist2 = (point[0] - target[0]) ** 2 + (point[1] - target[1]) ** 2 + (point[2] - target[2]) ** 2
+        if len(best) < k:
+            heapq.heappush(best, (-dist2, mid))
+        elif dist2 < -best[0][0]:
+            heapq.heapreplace(best, (-dist2, mid))
+        diff = target[axis] - point[axis]
+        near, far = ((lo, mid), (mid + 1, hi)) if diff < 0 else ((mid + 1, hi), (lo, mid))
+        next_axis = (axis + 1) % 3
+        search(near[0], near[1], next_axis)
+        if len(best) < k or diff * diff < -best[0][0]:
+            search(far[0], far[1], next_axis)
+
+    search(0, len(points), 0)
+    return sorted(((index, -neg_dist2) for neg_dist2, index in best), key=lambda item: item[1])
+
+def _download_tide_catalog():
+    """Download the NOAA tide prediction station list and save it as a KD-tree ordered catalog"""
+    url = "https://api.tidesandcurrents.noaa.gov/mdapi/prod/webapi/stations.json?type=tidepredictions"
+    response = http_get(url)
     response.raise_for_status()
-    data = response.json()
-    
-    # Extract the state from the address data
-    state = extract_state(address_data['matched_address'])
-    
-    # Manually filter the results to find the stations in the state
-    state_stations = [station for station in data['stations'] if station['state'] == state]
-    
-    # Calculate the distance between each station and the street address
-    nearest_station = None
-    min_distance = float('inf')
-    for station in state_stations:
-        station_lat = float(station['lat'])
-        station_lon = float(station.get('lon', station.get('lng')))  # Handle both 'lon' and 'lng' keys
-        distance = haversine_distance(address_data['lat'], address_data['lon'], station_lat, station_lon)
-        if distance < min_distance:
-            min_distance = distance
-            nearest_station = station['id']
-    
-    return nearest_station
+    stations = response.json()['stations']
+
+    lat = np.array([float(station['lat']) for station in stations])
+    lon = np.array([float(station.get('lng', station.get('lon'))) for station in stations])
+    points = _unit_sphere_points(lat, lon)
+    order = _kdtree_order(points)
+    catalog = {
+        'ids': np.array([str(station['id']) for station in stations])[order],
+        'names': np.array([station.get('name') or '' for station in stations])[order],
+        'states': np.array([station.get('state') or '' for station in stations])[order],
+        'lat': lat[order],
+        'lon': lon[order],
+        'points': points[order],
+        'fetched': np.array(time.time()),
+    }
+    np.savez_compressed(TIDE_CATALOG_PATH, **catalog)
+    return catalog
+
+def load_tide_catalog():
+    """Return the local tide station catalog, downloading it when missing or older than TIDE_CATALOG_MAX_AGE"""
+    global _tide_catalog
+    if _tide_catalog is not None:
+        return _tide_catalog
+
+    with _tide_catalog_lock:
+        if _tide_catalog is None:
+            _tide_catalog = _read_tide_catalog()
+    return _tide_catalog
+
+def _read_tide_catalog():
+    """Load the catalog from TIDE_CATALOG_PATH, downloading a fresh copy when it is missing or stale"""
+    catalog = None
+    if os.path.exists(TIDE_CATALOG_PATH):
+        with np.load(TIDE_CATALOG_PATH) as stored:
+            if time.time() - float(stored['fetched']) < TIDE_CATALOG_MAX_AGE.total_seconds():
+                catalog = {name: stored[name] for name in stored.files}
+    if catalog is None:
+        spinner = make_spinner('Downloading NOAA tide station catalog...')
+        spinner.start()
+        try:
+            catalog = _download_tide_catalog()
+        finally:
+            spinner.stop()
+
+    catalog['point_list'] = catalog['points'].tolist()  # Plain floats are faster for tree walks
+    catalog['index_by_id'] = {station_id: i for i, station_id in enumerate(catalog['ids'].tolist())}
+    return catalog
+
+def chord_to_km(dist2):
+    """Convert a squared chord distance on the unit sphere to a great-circle distance in km"""
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(dist2) / 2))
+
+def nearest_tide_stations(lat, lon, k=1):
+    """Return [(station_id, distance_km)] for the k tide stations nearest to a point"""
+    catalog = load_tide_catalog()
+    target = _unit_sphere_points(np.array([lat]), np.array([lon]))[0].tolist()
+    return [(str(catalog['ids'][index]), chord_to_km(dist2))
+            for index, dist2 in _kdtree_nearest(catalog['point_list'], target, k)]
+
+def get_nearest_station(address_data):
+    """Find the nearest NOAA tide station using the local station catalog"""
+    nearest = nearest_tide_stations(float(address_data['lat']), float(address_data['lon']))
+    if not nearest or nearest[0][1] > TIDE_STATION_MAX_DISTANCE_KM:
+        return None
+    return nearest[0][0]
 
 def get_tide_data(station_id):
     """Fetch tide data from NOAA API for a given station ID"""
@@ -776,7 +2226,7 @@ def get_tide_data(station_id):
         "interval": "hilo",
         "format": "json"
     }
-    response = requests.get(url, params=params)
+    response = http_get(url, params=params, cache='noaa_tides')
     response.raise_for_status()
     return response.json()
 
@@ -804,11 +2254,20 @@ def display_station_info(station_info):
     print(google_maps_url)
 
 def get_station_info(station_id):
-    """Fetch station information from NOAA API"""
-    url = f"https://api.tidesandcurrents.noaa.gov/mdapi/prod/webapi/stations/{station_id}.json"
-    response = requests.get(url)
-    response.raise_for_status()
-    return response.json()
+    """Look up station information in the local catalog (same shape as the NOAA metadata API)"""
+    catalog = load_tide_catalog()
+    index = catalog['index_by_id'].get(station_id)
+    if index is None:
+        return None
+    return {
+        'stations': [{
+            'id': station_id,
+            'name': str(catalog['names'][index]),
+            'state': str(catalog['states'][index]),
+            'lat': float(catalog['lat'][index]),
+            'lng': float(catalog['lon'][index]),
+        }]
+    }
 
 def lookup_tides():
     """Handle tide lookup logic"""
@@ -920,6 +2379,78 @@ def select_saved_address_for_tides():
     except ValueError:
         print("\nPlease enter a valid number.")
 
+def haversine_matrix(lat1, lon1, lat2, lon2):
+    """Great-circle distances in km between every point in (lat1, lon1) and every point in (lat2, lon2)"""
+    lat1 = np.radians(np.asarray(lat1, dtype=float))[:, np.newaxis]
+    lon1 = np.radians(np.asarray(lon1, dtype=float))[:, np.newaxis]
+    lat2 = np.radians(np.asarray(lat2, dtype=float))[np.newaxis, :]
+    lon2 = np.radians(np.asarray(lon2, dtype=float))[np.newaxis, :]
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+def format_tide_times(predictions, tide_type):
+    """Format the first day's high ('H') or low ('L') tides as '03:12 AM (5.1 ft)' entries"""
+    if not predictions:
+        return "N/A"
+    first_day = predictions[0]['t'][:10]
+    entries = []
+    for prediction in predictions:
+        if prediction['t'][:10] == first_day and prediction['type'] == tide_type:
+            time_text = datetime.strptime(prediction['t'], "%Y-%m-%d %H:%M").strftime("%I:%M %p")
+            entries.append(f"{time_text} ({float(prediction['v']):.1f} ft)")
+    return ", ".join(entries) or "N/A"
+
+def tides_for_all_saved_addresses():
+    """Print one combined tide table for every saved address, fetching each station's tides once"""
+    addresses = get_saved_addresses()
+    if not addresses:
+        print("\nNo saved addresses found.")
+        return
+
+    catalog = load_tide_catalog()
+    distances = haversine_matrix([row[2] for row in addresses], [row[3] for row in addresses],
+                                 catalog['lat'], catalog['lon'])
+    nearest = distances.argmin(axis=1)
+    nearest_km = distances[np.arange(len(addresses)), nearest]
+
+    # Addresses that share a station only cost one tide request
+    station_ids = sorted({str(catalog['ids'][index])
+                          for index, km in zip(nearest, nearest_km) if km <= TIDE_STATION_MAX_DISTANCE_KM})
+    tides_by_station = {}
+    spinner = make_spinner(f'Getting tide data for {len(station_ids)} stations...')
+    spinner.start()
+    try:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=TIDE_FETCH_WORKERS) as executor:
+            futures = {executor.submit(get_tide_data, station_id): station_id for station_id in station_ids}
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    tides_by_station[futures[future]] = future.result().get('predictions', [])
+                except Exception as e:
+                    tides_by_station[futures[future]] = None
+                    if DEBUG_MODE:
+                        print(f"\n[debug] Tide data failed for station {futures[future]}: {e}")
+    finally:
+        spinner.stop()
+
+    print("\nTides for Saved Addresses (first predicted day, station local time):")
+    print("-" * 158)
+    print(f"{'Address':<40} {'Station':<30} {'km':>6}  {'High Tides':<38} {'Low Tides':<38}")
+    print("-" * 158)
+    for (_, matched_address, _, _, _), index, km in zip(addresses, nearest, nearest_km):
+        if km > TIDE_STATION_MAX_DISTANCE_KM:
+            print(f"{matched_address[:40]:<40} {'No station within ' + str(TIDE_STATION_MAX_DISTANCE_KM) + ' km':<30}")
+            continue
+        station_id = str(catalog['ids'][index])
+        station = f"{str(catalog['names'][index])[:20]} ({station_id})"
+        predictions = tides_by_station.get(station_id)
+        if predictions is None:
+            highs = lows = "Error fetching tides"
+        else:
+            highs = format_tide_times(predictions, 'H')
+            lows = format_tide_times(predictions, 'L')
+        print(f"{matched_address[:40]:<40} {station:<30} {km:>6.1f}  {highs:<38} {lows:<38}")
+    print("-" * 158)
+
 def tides_menu():
     """Display and handle tides menu"""
     while True:
@@ -927,25 +2458,73 @@ def tides_menu():
             print("\n=== Tides Menu ===")
             print("1. Enter new address")
             print("2. Select from saved addresses")
-            print("3. Return to main menu")
+            print("3. Tides for all saved addresses")
+            print("4. Return to main menu")
             
-            choice = safe_input("\nEnter your choice (1-3): ")
+            choice = safe_input("\nEnter your choice (1-4): ")
             
             if choice == "1":
                 lookup_tides()
             elif choice == "2":
                 select_saved_address_for_tides()
             elif choice == "3":
+                tides_for_all_saved_addresses()
+                safe_input("\nPress Enter to continue...")
+            elif choice == "4":
                 return
             else:
-                print("\nInvalid choice. Please enter 1-3.")
+                print("\nInvalid choice. Please enter 1-4.")
         except KeyboardInterrupt:
             exit_gracefully("\n\nProgram interrupted. Goodbye!")
         except EOFError:
             exit_gracefully("\n\nEnd of input. Goodbye!")
 
-def get_salesforce_credentials():
-    """Prompt the user for Salesforce credentials and verify them"""
+SF_SESSION_PATH = 'salesforce_session.json'  # Session id and instance URL, readable only by the owner
+
+def load_salesforce_session(username):
+    """Return the saved (session id, instance URL) for username, or None if there is no usable saved session.
+
+    A session file that other users could read is deleted rather than used.
+    """
+    try:
+        if os.stat(SF_SESSION_PATH).st_mode & 0o077:
+            print(f"\nIgnoring {SF_SESSION_PATH}: it is readable by other users.")
+            forget_salesforce_session()
+            return None
+        with open(SF_SESSION_PATH, encoding='utf-8') as session_file:
+            saved = json.load(session_file)
+    except (OSError, ValueError):
+        return None
+    if saved.get('username') != username or not saved.get('session_id') or not saved.get('instance_url'):
+        return None
+    return saved['session_id'], saved['instance_url']
+
+def save_salesforce_session(username, sf):
+    """Write the session of a fresh login to SF_SESSION_PATH with owner-only (0600) permissions"""
+    temp_path = f"{SF_SESSION_PATH}.tmp"
+    try:
+        fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        os.chmod(temp_path, 0o600)  # The mode above only applies when the file is created
+        with os.fdopen(fd, 'w', encoding='utf-8') as session_file:
+            json.dump({'username': username, 'session_id': sf.session_id,
+                       'instance_url': f"https://{sf.sf_instance}", 'saved': datetime.now().isoformat()},
+                      session_file)
+        os.replace(temp_path, SF_SESSION_PATH)
+    except OSError as e:
+        print(f"\nCould not save the Salesforce session: {e}")
+
+def forget_salesforce_session():
+    """Delete the saved session file"""
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(SF_SESSION_PATH)
+
+def get_salesforce_credentials(use_saved_session=True):
+    """Return a Salesforce connection, reusing this run's or the saved session before logging in.
+
+    A saved session is only checked when it is first used; callers run their
+    requests through call_salesforce so an expired one triggers a fresh login.
+    """
+    from simple_salesforce import Salesforce, SalesforceAuthenticationFailed
     global sf_username, sf_password, sf_token, sf_instance
 
     if sf_instance is not None:
@@ -956,7 +2535,16 @@ def get_salesforce_credentials():
     sf_token_env = os.getenv("SALESFORCE_SECURITY_TOKEN")
 
     if sf_username_env and sf_password_env and sf_token_env:
-        spinner = Halo('Authenticating with Salesforce using environment variables...')
+        saved = load_salesforce_session(sf_username_env) if use_saved_session else None
+        if saved is not None:
+            session_id, instance_url = saved
+            sf_instance = Salesforce(session_id=session_id, instance_url=instance_url)
+            sf_username = sf_username_env
+            if DEBUG_MODE:
+                print(f"\nDebug: reusing the saved Salesforce session for {instance_url}")
+            return sf_instance
+
+        spinner = make_spinner('Authenticating with Salesforce using environment variables...')
         spinner.start()
         try:
             sf_instance = Salesforce(username=sf_username_env, password=sf_password_env, security_token=sf_token_env)
@@ -965,6 +2553,7 @@ def get_salesforce_credentials():
             sf_username = sf_username_env
             sf_password = sf_password_env # Not strictly necessary to store if only instance is used
             sf_token = sf_token_env       # Not strictly necessary to store if only instance is used
+            save_salesforce_session(sf_username_env, sf_instance)
             return sf_instance
         except SalesforceAuthenticationFailed:
             spinner.fail("Salesforce authentication failed using environment variables.")
@@ -981,63 +2570,469 @@ def get_salesforce_credentials():
         print("Please set SALESFORCE_USERNAME, SALESFORCE_PASSWORD, and SALESFORCE_SECURITY_TOKEN.")
         return None
 
-def query_salesforce_contacts(sf, filter_value):
-    query = f"""
-    SELECT Account.Name, FirstName, LastName, Title, Email, Phone, Description
-    FROM Contact
-    WHERE Account.Name LIKE '%{filter_value}%'
-    OR FirstName LIKE '%{filter_value}%'
-    OR LastName LIKE '%{filter_value}%'
-    OR Title LIKE '%{filter_value}%'
-    OR Email LIKE '%{filter_value}%'
+def refresh_salesforce_session(expired):
+    """Replace the expired connection with a fresh login and return it (RuntimeError if the login fails).
+
+    Concurrent callers holding the same expired connection share one login.
     """
-    
+    global sf_instance
+    with _sf_login_lock:
+        if sf_instance is None or sf_instance.session_id == expired.session_id:
+            sf_instance = None
+            forget_salesforce_session()
+            get_salesforce_credentials(use_saved_session=False)
+        sf = sf_instance
+    if sf is None:
+        raise RuntimeError("Salesforce session expired and logging in again failed")
+    return sf
+
+def call_salesforce(operation, *args, **kwargs):
+    """Run operation(sf, *args, **kwargs) with the current connection.
+
+    If the session has expired the operation is run once more with a
+    fresh login, so a stale saved session costs one extra round trip.
+    """
+    from simple_salesforce import SalesforceExpiredSession
+    sf = get_salesforce_credentials()
+    if sf is None:
+        raise RuntimeError("Salesforce authentication failed")
     try:
-        contacts = sf.query(query)['records']
+        return operation(sf, *args, **kwargs)
     except SalesforceExpiredSession:
-        print("\nSalesforce session expired. Please re-enter your credentials.")
-        get_salesforce_credentials()
-        contacts = sf.query(query)['records']
+        print("\nSalesforce session expired; logging in again.")
+        return operation(refresh_salesforce_session(sf), *args, **kwargs)
 
-    if not contacts:
+CONTACTS_PER_SCREEN = 25  # Contacts printed before asking whether to continue
+
+def contact_search_soql(filter_value, fields="Account.Name, FirstName, LastName, Title, Email, Phone, Description"):
+    """SOQL for Contacts whose account, name, title or email contains filter_value (quotes and wildcards escaped)"""
+    from simple_salesforce import format_soql
+    return format_soql("SELECT " + fields + """
+    FROM Contact
+    WHERE Account.Name LIKE '%{0:like}%'
+    OR FirstName LIKE '%{0:like}%'
+    OR LastName LIKE '%{0:like}%'
+    OR Title LIKE '%{0:like}%'
+    OR Email LIKE '%{0:like}%'
+    """, filter_value)
+
+def stream_salesforce_contacts(sf, filter_value):
+    """Start a contact search and return (total matches, lazy iterator over the matching records).
+
+    Only the first result page is fetched up front; later pages are requested
+    with query_more as the iterator reaches them, so at most one page is held
+    in memory and abandoning the iterator skips the remaining requests.
+    """
+    from simple_salesforce import SalesforceExpiredSession
+    first_page = sf.query(contact_search_soql(filter_value))
+
+    def records():
+        connection = sf
+        page = first_page
+        while True:
+            yield from page['records']
+            if page.get('done', True):
+                return
+            try:
+                page = connection.query_more(page['nextRecordsUrl'], identifier_is_url=True)
+            except SalesforceExpiredSession:
+                # The query cursor outlives the session, so continue it with a fresh login
+                connection = refresh_salesforce_session(connection)
+                page = connection.query_more(page['nextRecordsUrl'], identifier_is_url=True)
+
+    return first_page['totalSize'], records()
+
+def print_contact(contact):
+    """Print one Contact record"""
+    print(f"\nAccount Name: {(contact.get('Account') or {}).get('Name')}")
+    print(f"First Name: {contact['FirstName']}")
+    print(f"Last Name: {contact['LastName']}")
+    print(f"Title: {contact['Title']}")
+    print(f"Email: {contact['Email']}")
+    print(f"Phone: {contact['Phone']}")
+    print(f"Description: {contact['Description']}")
+    print("-" * 60)
+
+def query_salesforce_contacts(filter_value, limit=None):
+    """Print matching contacts as their pages arrive, pausing every CONTACTS_PER_SCREEN records"""
+    try:
+        total, contacts = call_salesforce(stream_salesforce_contacts, filter_value)
+    except Exception as e:
+        print(f"\nError querying Salesforce: {e}")
+        return
+
+    if total == 0:
         print("\nNo contacts found.\n")
+        return
+
+    to_show = min(total, limit) if limit is not None else total
+    print(f"\nTotal contacts found: {total}" + (f" (showing the first {to_show})" if to_show < total else ""))
+    shown = 0
+    try:
+        for contact in itertools.islice(contacts, to_show):
+            print_contact(contact)
+            shown += 1
+            if shown % CONTACTS_PER_SCREEN == 0 and shown < to_show:
+                answer = safe_input(f"\nShown {shown} of {to_show}. Press Enter for more or 'q' to stop: ")
+                if answer.strip().lower() == 'q':
+                    break
+    except KeyboardInterrupt:
+        print("\nStopped.")
+    print(f"\nShown {shown} of {total} contacts found.\n")
+
+# Local contact mirror (history.db): full load once, then incremental syncs on SystemModstamp
+SF_MIRROR_FIELDS = "Id, Account.Name, FirstName, LastName, Title, Email, Phone, Description, SystemModstamp"
+SF_MIRROR_FULL_RELOAD_AFTER = timedelta(days=14)  # Deleted records leave the recycle bin (and queryAll) after 15 days
+SF_MIRROR_BATCH_SIZE = 500
+SF_MIRROR_SEARCH_LIMIT = 50
+
+def soql_datetime(modstamp):
+    """Convert an API timestamp such as 2024-05-01T12:34:56.000+0000 to a SOQL datetime literal"""
+    parsed = datetime.strptime(modstamp, '%Y-%m-%dT%H:%M:%S.%f%z')
+    return parsed.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+def _store_mirror_batch(rows, deleted_ids):
+    """Upsert contact rows and drop deleted contacts in one transaction"""
+    with history_db() as conn:
+        conn.executemany('''INSERT INTO sf_contacts (id, account_name, first_name, last_name, title, email,
+                                                    phone, description, system_modstamp, synced_at)
+                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                            ON CONFLICT (id) DO UPDATE SET
+                                account_name = excluded.account_name, first_name = excluded.first_name,
+                                last_name = excluded.last_name, title = excluded.title, email = excluded.email,
+                                phone = excluded.phone, description = excluded.description,
+                                system_modstamp = excluded.system_modstamp, synced_at = excluded.synced_at''', rows)
+        conn.executemany('DELETE FROM sf_contacts WHERE id = ?', [(record_id,) for record_id in deleted_ids])
+
+def sync_salesforce_contacts(sf, full=False):
+    """Bring the local contact mirror up to date and return (contacts upserted, contacts removed).
+
+    The first sync (or one after SF_MIRROR_FULL_RELOAD_AFTER without syncing,
+    or with full=True) loads every contact and then removes rows it did not
+    see. Later syncs fetch only contacts whose SystemModstamp moved,
+    including deleted ones through queryAll, and apply them in order.
+    Records are written in batches as they stream in.
+    """
+    with history_db() as conn:
+        state = conn.execute("SELECT last_modstamp, last_sync FROM sf_sync_state WHERE object = 'Contact'").fetchone()
+    started = datetime.now()
+    full = full or state is None or state[0] is None or started - state[1] > SF_MIRROR_FULL_RELOAD_AFTER
+    if full:
+        soql = f"SELECT {SF_MIRROR_FIELDS} FROM Contact ORDER BY SystemModstamp"
+        last_modstamp = None
     else:
-        print(f"\nTotal contacts found: {len(contacts)}")
-        for contact in contacts:
-            print(f"\nAccount Name: {contact['Account']['Name']}")
-            print(f"First Name: {contact['FirstName']}")
-            print(f"Last Name: {contact['LastName']}")
-            print(f"Title: {contact['Title']}")
-            print(f"Email: {contact['Email']}")
-            print(f"Phone: {contact['Phone']}")
-            print(f"Description: {contact['Description']}")
-            print("-" * 60)
-        print(f"\nTotal contacts found: {len(contacts)}\n")
+        # >= because the literal drops milliseconds; re-applying a boundary record is harmless
+        soql = (f"SELECT {SF_MIRROR_FIELDS}, IsDeleted FROM Contact "
+                f"WHERE SystemModstamp >= {soql_datetime(state[0])} ORDER BY SystemModstamp")
+        last_modstamp = state[0]
+
+    upserted = removed = 0
+    rows, deleted_ids = [], []
+    for record in sf.query_all_iter(soql, include_deleted=not full):
+        if record.get('IsDeleted'):
+            deleted_ids.append(record['Id'])
+        else:
+            rows.append((record['Id'], (record.get('Account') or {}).get('Name'), record['FirstName'],
+                         record['LastName'], record['Title'], record['Email'], record['Phone'],
+                         record['Description'], record['SystemModstamp'], started))
+        last_modstamp = max(last_modstamp or '', record['SystemModstamp'])
+        if len(rows) + len(deleted_ids) >= SF_MIRROR_BATCH_SIZE:
+            _store_mirror_batch(rows, deleted_ids)
+            upserted, removed = upserted + len(rows), removed + len(deleted_ids)
+            rows, deleted_ids = [], []
+    _store_mirror_batch(rows, deleted_ids)
+    upserted, removed = upserted + len(rows), removed + len(deleted_ids)
+
+    with history_db() as conn:
+        if full:
+            removed += conn.execute('DELETE FROM sf_contacts WHERE synced_at < ?', (started,)).rowcount
+        conn.execute('''INSERT OR REPLACE INTO sf_sync_state (object, last_modstamp, last_sync)
+                        VALUES ('Contact', ?, ?)''', (last_modstamp, started))
+    return upserted, removed
+
+def contact_mirror_status():
+    """Return (number of mirrored contacts, time of the last sync or None)"""
+    with history_db() as conn:
+        count = conn.execute('SELECT COUNT(*) FROM sf_contacts').fetchone()[0]
+        state = conn.execute("SELECT last_sync FROM sf_sync_state WHERE object = 'Contact'").fetchone()
+    return count, state[0] if state else None
+
+def search_contact_mirror(text, limit=SF_MIRROR_SEARCH_LIMIT):
+    """Search the local contact mirror, best matches first; records are shaped like Salesforce query results.
+
+    Every word must match the start of a word in some field (so 'jo smi'
+    finds John Smith). Ranking uses FTS5's bm25; without FTS5 the words are
+    matched with LIKE and results are unranked.
+    """
+    words = re.findall(r'\w+', text)
+    if not words:
+        return []
+    columns = 'c.account_name, c.first_name, c.last_name, c.title, c.email, c.phone, c.description'
+    with history_db() as conn:
+        has_fts = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'sf_contacts_fts'").fetchone()
+        if has_fts:
+            rows = conn.execute(f'''SELECT {columns} FROM sf_contacts_fts
+                                   JOIN sf_contacts c ON c.rowid = sf_contacts_fts.rowid
+                                   WHERE sf_contacts_fts MATCH ? ORDER BY rank LIMIT ?''',
+                                (' '.join(f'"{word}"*' for word in words), limit)).fetchall()
+        else:
+            word_clause = '(' + ' OR '.join(f"{column} LIKE ?" for column in columns.split(', ')) + ')'
+            rows = conn.execute(f'''SELECT {columns} FROM sf_contacts c
+                                   WHERE {' AND '.join([word_clause] * len(words))} LIMIT ?''',
+                                [f'%{word}%' for word in words for _ in range(7)] + [limit]).fetchall()
+    return [{'Account': {'Name': row[0]}, 'FirstName': row[1], 'LastName': row[2], 'Title': row[3],
+             'Email': row[4], 'Phone': row[5], 'Description': row[6]} for row in rows]
+
+def sync_contact_mirror_interactive():
+    """Sync the contact mirror behind a spinner"""
+    spinner = make_spinner('Syncing Salesforce contacts to the local mirror...')
+    spinner.start()
+    try:
+        upserted, removed = call_salesforce(sync_salesforce_contacts)
+        spinner.succeed(f"Contact mirror synced: {upserted} updated, {removed} removed")
+    except Exception as e:
+        spinner.fail(f"Contact mirror sync failed: {e}")
+
+def search_contact_mirror_interactive():
+    """Prompt for search text and print matching contacts from the local mirror"""
+    count, last_sync = contact_mirror_status()
+    if count == 0:
+        print("\nThe local contact mirror is empty. Sync it first.")
+        return
+    text = safe_input("\nSearch text: ")
+    start = time.perf_counter()
+    contacts = search_contact_mirror(text)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    if not contacts:
+        print("\nNo contacts found.\n")
+        return
+    for contact in contacts:
+        print_contact(contact)
+    synced = f", last synced {last_sync:%Y-%m-%d %H:%M}" if last_sync else ""
+    print(f"\n{len(contacts)} best matches of {count} mirrored contacts ({elapsed_ms:.1f} ms{synced})\n")
+
+# Bulk API 2.0 exports: the query runs server-side and results are downloaded in CSV chunks
+SF_EXPORT_FIELDS = "Id, Account.Name, FirstName, LastName, Title, Email, Phone, Description"
+SF_EXPORT_CHUNK_RECORDS = 50000  # maxRecords per results request
+SF_EXPORT_POLL_INITIAL = 1.0  # Seconds before the first job status check; doubled on every check
+SF_EXPORT_POLL_MAX = 30.0
+SF_EXPORT_TIMEOUT = 3600  # Seconds to wait for the job before aborting it
+SF_EXPORT_READ_BYTES = 1 << 20
+
+def contact_export_soql(filter_value):
+    """SOQL for every Contact, or only those matching filter_value as in the contact search"""
+    if not filter_value:
+        return f"SELECT {SF_EXPORT_FIELDS} FROM Contact"
+    return contact_search_soql(filter_value, SF_EXPORT_FIELDS)
+
+def _bulk_query_url(sf, job_id=None, suffix=''):
+    """Bulk API 2.0 query endpoint on the session's instance (jobs/query[/id[/suffix]])"""
+    url = f"{sf.base_url}jobs/query"
+    return f"{url}/{job_id}{suffix}" if job_id else url
+
+def _bulk_request(sf, method, url, **kwargs):
+    """Send a Bulk API request with the session's authorization headers and raise on an error response"""
+    from simple_salesforce import SalesforceExpiredSession
+    response = http_request(method, url, headers=sf.headers, **kwargs)
+    if response.status_code == 401:
+        raise SalesforceExpiredSession(url, response.status_code, 'jobs/query', response.content)
+    if response.status_code >= 400:
+        try:
+            message = '; '.join(error.get('message', '') for error in response.json())
+        except (ValueError, TypeError, AttributeError):
+            message = response.text[:200]
+        raise RuntimeError(f"Bulk API {method} {url} returned {response.status_code}: {message}")
+    return response
+
+def wait_for_bulk_query(sf, job_id, timeout=SF_EXPORT_TIMEOUT):
+    """Poll a Bulk API 2.0 query job with exponential backoff until it completes and return its final status.
+
+    Raises RuntimeError if the job fails or is aborted; after `timeout`
+    seconds the job is aborted and TimeoutError is raised.
+    """
+    delay = SF_EXPORT_POLL_INITIAL
+    deadline = time.monotonic() + timeout
+    while True:
+        job = _bulk_request(sf, 'GET', _bulk_query_url(sf, job_id)).json()
+        if job['state'] == 'JobComplete':
+            return job
+        if job['state'] in ('Failed', 'Aborted'):
+            raise RuntimeError(f"Bulk query job {job_id} {job['state'].lower()}: {job.get('errorMessage') or 'no details'}")
+        if time.monotonic() + delay > deadline:
+            abort_bulk_query(sf, job_id)
+            raise TimeoutError(f"Bulk query job {job_id} did not finish within {timeout} seconds")
+        time.sleep(delay)
+        delay = min(delay * 2, SF_EXPORT_POLL_MAX)
+
+def abort_bulk_query(sf, job_id):
+    """Ask Salesforce to stop a query job; failures are ignored since the job may already be finished"""
+    try:
+        _bulk_request(sf, 'PATCH', _bulk_query_url(sf, job_id), json={'state': 'Aborted'})
+    except Exception:
+        pass
+
+def download_bulk_results(sf, job_id, out_file):
+    """Stream every result chunk of a completed query job into out_file as one CSV and return the record count.
+
+    Chunks are requested with the Sforce-Locator of the previous one and
+    copied to disk as they arrive, so memory use does not grow with the
+    export. Each chunk repeats the CSV header, which is kept only once.
+    """
+    records = 0
+    locator = None
+    while True:
+        params = {'maxRecords': SF_EXPORT_CHUNK_RECORDS}
+        if locator:
+            params['locator'] = locator
+        response = _bulk_request(sf, 'GET', _bulk_query_url(sf, job_id, '/results'), params=params, stream=True)
+        with response:
+            chunks = response.iter_content(SF_EXPORT_READ_BYTES)
+            if locator:
+                # Skip the repeated header; field names never contain newlines
+                pending = b''
+                for chunk in chunks:
+                    pending += chunk
+                    if b'\n' in pending:
+                        out_file.write(pending.split(b'\n', 1)[1])
+                        break
+            for chunk in chunks:
+                out_file.write(chunk)
+        records += int(response.headers.get('Sforce-NumberOfRecords', 0))
+        locator = response.headers.get('Sforce-Locator')
+        if not locator or locator == 'null':
+            return records
+
+def _import_pyarrow():
+    """Import the optional pyarrow modules used for Parquet output"""
+    try:
+        import pyarrow
+        import pyarrow.csv
+        import pyarrow.parquet
+    except ImportError:
+        raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow)") from None
+    return pyarrow, pyarrow.csv, pyarrow.parquet
+
+def csv_to_parquet(csv_path, parquet_path):
+    """Convert an exported CSV to Parquet in record batches (all columns as strings, empty values as nulls)"""
+    pa, pa_csv, pq = _import_pyarrow()
+    with open(csv_path, newline='', encoding='utf-8') as csv_file:
+        columns = next(csv.reader(csv_file), [])
+    reader = pa_csv.open_csv(csv_path, convert_options=pa_csv.ConvertOptions(
+        column_types={column: pa.string() for column in columns}, strings_can_be_null=True))
+    with pq.ParquetWriter(parquet_path, reader.schema) as writer:
+        for batch in reader:
+            writer.write_batch(batch)
+
+def export_salesforce_contacts(sf, path, filter_value='', file_format=None):
+    """Export contacts (all, or those matching filter_value) to a CSV or Parquet file with Bulk API 2.0.
+
+    Submits a query job, waits for it, then streams the result chunks to a
+    temporary file next to `path` that replaces it only once the export is
+    complete. An expired session continues the same job after a fresh
+    login, and the job is aborted if the export fails or is interrupted.
+    The format defaults to Parquet for a .parquet path and CSV otherwise.
+    Returns the number of records exported.
+    """
+    file_format = file_format or ('parquet' if path.lower().endswith('.parquet') else 'csv')
+    if file_format not in ('csv', 'parquet'):
+        raise ValueError(f"Unsupported export format: {file_format}")
+    if file_format == 'parquet':
+        _import_pyarrow()  # Fail before the job is submitted rather than after the download
+
+    from simple_salesforce import SalesforceExpiredSession
+    # Not retried: a retry after a 5xx or a dropped connection could create a second job
+    job_id = _bulk_request(sf, 'POST', _bulk_query_url(sf), retries=0, json={
+        'operation': 'query', 'query': contact_export_soql(filter_value),
+        'contentType': 'CSV', 'columnDelimiter': 'COMMA', 'lineEnding': 'LF'}).json()['id']
+    csv_path = f"{path}.csv.part" if file_format == 'parquet' else f"{path}.part"
+
+    def download(connection):
+        with open(csv_path, 'wb') as out_file:
+            return download_bulk_results(connection, job_id, out_file)
+
+    def continue_job(step):
+        # The job outlives the session, so an expired session continues it with a fresh login
+        nonlocal sf
+        try:
+            return step(sf)
+        except SalesforceExpiredSession:
+            sf = refresh_salesforce_session(sf)
+            return step(sf)
+
+    try:
+        continue_job(lambda connection: wait_for_bulk_query(connection, job_id))
+        records = continue_job(download)
+        if file_format == 'parquet':
+            csv_to_parquet(csv_path, f"{path}.part")
+            os.remove(csv_path)
+            csv_path = f"{path}.part"
+        os.replace(csv_path, path)
+    except BaseException:
+        abort_bulk_query(sf, job_id)  # Never leave the job running server-side
+        raise
+    finally:
+        for leftover in {csv_path, f"{path}.part"}:
+            if os.path.exists(leftover):
+                os.remove(leftover)
+    return records
+
+def export_contacts_interactive():
+    """Prompt for a filter and output file, then run a bulk contact export behind a spinner"""
+    filter_value = safe_input("\nFilter value (blank for all contacts): ").strip()
+    path = safe_input("Output file (.csv or .parquet) [contacts.csv]: ").strip() or 'contacts.csv'
+    spinner = make_spinner('Exporting contacts with the Bulk API (large exports can take several minutes)...')
+    spinner.start()
+    start = time.perf_counter()
+    try:
+        records = call_salesforce(export_salesforce_contacts, path, filter_value)
+        spinner.succeed(f"Exported {records} contacts to {path} in {time.perf_counter() - start:.1f} s")
+    except KeyboardInterrupt:
+        spinner.fail("Export cancelled; the bulk job was aborted.")
+    except Exception as e:
+        spinner.fail(f"Export failed: {e}")
 
 def salesforce_menu():
     """Display and handle Salesforce menu"""
     try:
         print("\n=== Salesforce Menu ===\n")
         sf = get_salesforce_credentials()
+        mirrored, _ = contact_mirror_status()
 
         if sf is None:
-            safe_input("\nPress Enter to return to the main menu...")
-            return
+            if not mirrored:
+                safe_input("\nPress Enter to return to the main menu...")
+                return
+            print("\nWorking offline: only the local contact mirror is available.")
 
         while True:
             try:
                 print("\n1. Query contacts")
-                print("2. Return to main menu")
+                print("2. Search local contact mirror")
+                print("3. Sync local contact mirror")
+                print("4. Export contacts to CSV/Parquet (Bulk API)")
+                print("5. Return to main menu")
                 
-                choice = safe_input("\nEnter your choice (1-2): ")
+                choice = safe_input("\nEnter your choice (1-5): ")
                 
-                if choice == "1":
+                if choice in ("1", "3", "4") and sf is None:
+                    print("\nNot connected to Salesforce.")
+                elif choice == "1":
                     filter_value = safe_input("\nEnter filter value: ")
-                    query_salesforce_contacts(sf, filter_value)
+                    limit = safe_input("Maximum results (a number, or 'all'): ").strip().lower()
+                    if limit != 'all' and not (limit.isdigit() and int(limit) >= 1):
+                        print("\nPlease enter a whole number of at least 1, or 'all'.")
+                        continue
+                    query_salesforce_contacts(filter_value, None if limit == 'all' else int(limit))
                 elif choice == "2":
+                    search_contact_mirror_interactive()
+                elif choice == "3":
+                    sync_contact_mirror_interactive()
+                elif choice == "4":
+                    export_contacts_interactive()
+                elif choice == "5":
                     return
                 else:
-                    print("\nInvalid choice. Please enter 1-2.")
+                    print("\nInvalid choice. Please enter 1-5.")
             except KeyboardInterrupt:
                 exit_gracefully("\n\nProgram interrupted. Goodbye!")
             except EOFError:
@@ -1052,72 +3047,461 @@ def get_google_maps_url_for_coordinates(lat, lon):
 
     return f"https://www.google.com/maps/place/{lat},{lon}/@{lat},{lon},7z/data=!3m1!1e3"
 
+# Local USGS event store (history.db): a full load for a magnitude/time range, then updatedafter refreshes
+USGS_EVENT_QUERY_URL = "https://earthquake.usgs.gov/fdsnws/event/1/query"
+QUAKE_DEFAULT_MIN_MAGNITUDE = 5.0
+QUAKE_DEFAULT_DAYS = 2
+QUAKE_UPDATE_OVERLAP = timedelta(minutes=5)  # Re-ask for recent updates in case USGS indexed some late
+QUAKE_WATCH_INTERVAL = 60  # Seconds between polls in watch mode
+QUAKE_WATCH_ERROR_INTERVAL = 120
+
+def _usgs_time(moment):
+    """FDSN time parameter (UTC, no offset) for an aware datetime"""
+    return moment.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S')
+
+def _epoch_ms(moment):
+    """Milliseconds since the epoch, as USGS reports event times"""
+    return int(moment.timestamp() * 1000)
+
+def query_usgs_events(**params):
+    """Run an FDSN event query and return (url, GeoJSON)"""
+    response = http_get(USGS_EVENT_QUERY_URL, params={'format': 'geojson', **params})
+    response.raise_for_status()
+    return response.url, response.json()
+
+def _store_quake_features(conn, features):
+    """Upsert events and drop deleted ones; returns the ids that were new or revised"""
+    changed = []
+    for feature in features:
+        properties = feature['properties']
+        event_id = feature['id']
+        stored = conn.execute('SELECT updated FROM quake_events WHERE id = ?', (event_id,)).fetchone()
+        if properties.get('status') == 'deleted':
+            conn.execute('DELETE FROM quake_events WHERE id = ?', (event_id,))
+            continue
+        if stored is not None and stored[0] >= properties['updated']:
+            continue  # Already have this revision (overlapping refresh window)
+        lon, lat, depth = (feature['geometry']['coordinates'] + [None] * 3)[:3]
+        conn.execute('''INSERT OR REPLACE INTO quake_events
+                        (id, time, updated, magnitude, place, lat, lon, depth_km, status, url)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+                     (event_id, properties['time'], properties['updated'], properties['mag'],
+                      properties['place'], lat, lon, depth, properties.get('status'), properties.get('url')))
+        changed.append(event_id)
+    return changed
+
+def refresh_quake_store(min_magnitude=QUAKE_DEFAULT_MIN_MAGNITUDE, days=QUAKE_DEFAULT_DAYS):
+    """Bring the stored events up to date for this magnitude and window; returns the new or revised event ids.
+
+    When the store already covers the request, only events added, revised
+    or deleted since the last refresh are requested (updatedafter).
+    Otherwise the requested range is reloaded in full. Either way the
+    covered range then starts at the requested window and older events are
+    dropped, so the store stays the size of one window.
+    """
+    now = datetime.now(timezone.utc)
+    start = _epoch_ms(now - timedelta(days=days))
+    with history_db() as conn:
+        state = conn.execute('SELECT min_magnitude, covered_from, last_updated FROM quake_sync_state').fetchone()
+
+    full = state is None or min_magnitude < state[0] or start < state[1]
+    params = {'starttime': _usgs_time(datetime.fromtimestamp(start / 1000, timezone.utc)), 'orderby': 'time-asc'}
+    if full:
+        last_updated = 0
+    else:
+        min_magnitude, _, last_updated = state
+        updated_after = datetime.fromtimestamp(last_updated / 1000, timezone.utc) - QUAKE_UPDATE_OVERLAP
+        params.update(updatedafter=_usgs_time(updated_after), includedeleted='true')
+    params['minmagnitude'] = f"{min_magnitude:g}"
+
+    _, data = query_usgs_events(**params)
+    features = data.get('features', [])
+    with history_db() as conn:
+        if full:
+            conn.execute('DELETE FROM quake_events')
+        else:
+            conn.execute('DELETE FROM quake_events WHERE time < ?', (start,))
+        changed = _store_quake_features(conn, features)
+        last_updated = max([last_updated] + [feature['properties']['updated'] for feature in features])
+        conn.execute('''INSERT OR REPLACE INTO quake_sync_state (id, min_magnitude, covered_from, last_updated, last_refresh)
+                        VALUES (1, ?, ?, ?, ?)''', (min_magnitude, start, last_updated, datetime.now()))
+    return changed
+
+def stored_quakes(min_magnitude=QUAKE_DEFAULT_MIN_MAGNITUDE, days=QUAKE_DEFAULT_DAYS, place=None, ids=None):
+    """Stored events at or above min_magnitude from the last `days` days, newest first (no network).
+
+    place filters on a substring of the location text; ids limits the result
+    to the given event ids.
+    """
+    sql = 'SELECT id, time, magnitude, place, lat, lon, depth_km, url FROM quake_events WHERE magnitude >= ? AND time >= ?'
+    params = [min_magnitude, _epoch_ms(datetime.now(timezone.utc) - timedelta(days=days))]
+    if place:
+        sql += ' AND place LIKE ?'
+        params.append(f'%{place}%')
+    if ids is not None:
+        sql += f" AND id IN ({', '.join('?' * len(ids))})"
+        params.extend(ids)
+    with history_db() as conn:
+        rows = conn.execute(sql + ' ORDER BY time DESC', params).fetchall()
+    return [{'id': row[0], 'time': datetime.fromtimestamp(row[1] / 1000, timezone.utc), 'magnitude': row[2],
+             'place': row[3], 'lat': row[4], 'lon': row[5], 'depth_km': row[6], 'url': row[7]} for row in rows]
+
+def quake_store_status():
+    """Return (minimum magnitude, covered since, last refresh), or None before the first refresh"""
+    with history_db() as conn:
+        state = conn.execute('SELECT min_magnitude, covered_from, last_refresh FROM quake_sync_state').fetchone()
+    if state is None:
+        return None
+    return state[0], datetime.fromtimestamp(state[1] / 1000, timezone.utc), state[2]
+
+def watch_earthquakes(min_magnitude, days):
+    """Refresh the store every QUAKE_WATCH_INTERVAL seconds and yield (new or revised events, seconds to the next poll).
+
+    The first poll reports every stored event in the window; a failed poll
+    yields the exception in place of the events.
+    """
+    first_poll = True
+    while True:
+        try:
+            changed = refresh_quake_store(min_magnitude, days)
+            events = stored_quakes(min_magnitude, days, ids=None if first_poll else changed)
+        except Exception as e:
+            yield e, QUAKE_WATCH_ERROR_INTERVAL
+            time.sleep(QUAKE_WATCH_ERROR_INTERVAL)
+            continue
+        first_poll = False
+        yield events, QUAKE_WATCH_INTERVAL
+        time.sleep(QUAKE_WATCH_INTERVAL)
+
+def print_quake(event):
+    """Print one stored earthquake"""
+    print(f"Magnitude: {event['magnitude']}")
+    print(f"Place: {event['place']}")
+    print(f"Time: {event['time']:%Y-%m-%d %H:%M:%S} UTC")
+    print(f"Google Maps URL: {get_google_maps_url_for_coordinates(event['lat'], event['lon'])}")
+    print("-" * 50)
+
+def display_earthquakes(min_magnitude, days):
+    """Refresh the event store and print the matching earthquakes"""
+    spinner = make_spinner('Getting USGS data...')
+    spinner.start()
+    try:
+        changed = refresh_quake_store(min_magnitude, days)
+        spinner.succeed(f"USGS data updated ({len(changed)} new or revised events)")
+    except Exception as e:
+        spinner.fail(f"Error getting earthquake data: {e}; showing stored events")
+    finally:
+        spinner.stop()
+
+    events = stored_quakes(min_magnitude, days)
+    if not events:
+        print(f"\nNo M{min_magnitude:g}+ earthquakes in the last {days:g} days.")
+        return
+    print(f"\nM{min_magnitude:g}+ earthquakes in the last {days:g} days:")
+    print("-" * 50)
+    for event in events:
+        print_quake(event)
+
+def search_stored_earthquakes(min_magnitude, days):
+    """Filter the stored events by place without contacting USGS"""
+    status = quake_store_status()
+    if status is None:
+        print("\nNo earthquakes stored yet. Show recent earthquakes first.")
+        return
+    place = safe_input("\nPlace contains (blank for any): ").strip()
+    events = stored_quakes(min_magnitude, days, place=place or None)
+    for event in events:
+        print_quake(event)
+    stored_magnitude, covered_from, last_refresh = status
+    print(f"\n{len(events)} stored earthquakes match (the store covers M{stored_magnitude:g}+ since "
+          f"{covered_from:%Y-%m-%d %H:%M} UTC, last refreshed {last_refresh:%Y-%m-%d %H:%M}).")
+
+def watch_earthquakes_interactive(min_magnitude, days):
+    """Print new and revised earthquakes as they are reported until Ctrl+C"""
+    print(f"\nWatching for M{min_magnitude:g}+ earthquakes every {QUAKE_WATCH_INTERVAL} seconds "
+          "(press Ctrl+C to stop)...")
+    first_poll = True
+    try:
+        for events, interval in watch_earthquakes(min_magnitude, days):
+            stamp = datetime.now().strftime("%H:%M:%S")
+            if isinstance(events, Exception):
+                print(f"\n[{stamp}] Error getting earthquake data: {events} (retrying in {interval} seconds)")
+                continue
+            if events:
+                print(f"\n[{stamp}] {'Recent earthquakes' if first_poll else 'New or revised'}:")
+                print("-" * 50)
+                for event in events:
+                    print_quake(event)
+            elif first_poll:
+                print(f"\nNo M{min_magnitude:g}+ earthquakes in the last {days:g} days yet.")
+            first_poll = False
+    except KeyboardInterrupt:
+        print("\nStopped watching.")
+
 def earthquakes_menu():
-    """Display 5.0 and higher magnitude earthquakes today"""
+    """Display and handle the earthquake menu"""
     # https://earthquake.usgs.gov/fdsnws/event/1/
     # https://earthquake.usgs.gov/fdsnws/event/1/#parameters
+    min_magnitude, days = QUAKE_DEFAULT_MIN_MAGNITUDE, QUAKE_DEFAULT_DAYS
 
-    try:
-        spinner = Halo('Getting USGS data...')
-        spinner.start()
+    while True:
         try:
-            # Get the current date one day in the future in YYYY-MM-DD format
-            current_date = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
-            # Get the date one day before today
-            start_date = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
-
-            # Insert the current date into the URL
-            url = f"https://earthquake.usgs.gov/fdsnws/event/1/query?format=geojson&starttime={start_date}&endtime={current_date}&minmagnitude=5"
-            response = requests.get(url)
-            response.raise_for_status()
-            data = response.json()
-            
-            if not data.get('features'):
-                print("\nNo 5.0 earthquakes found today.")
+            print(f"\n=== Earthquake Menu (M{min_magnitude:g}+, last {days:g} days) ===")
+            print("1. Show recent earthquakes")
+            print("2. Search stored earthquakes by place (offline)")
+            print("3. Watch for new earthquakes")
+            print("4. Change magnitude and time window")
+            print("5. Return to main menu")
+
+            choice = safe_input("\nEnter your choice (1-5): ")
+
+            if choice == "1":
+                display_earthquakes(min_magnitude, days)
+                safe_input("\nPress Enter to continue...")
+            elif choice == "2":
+                search_stored_earthquakes(min_magnitude, days)
+                safe_input("\nPress Enter to continue...")
+            elif choice == "3":
+                watch_earthquakes_interactive(min_magnitude, days)
+                safe_input("\nPress Enter to continue...")
+            elif choice == "4":
+                try:
+                    min_magnitude = float(safe_input(f"\nMinimum magnitude [{min_magnitude:g}]: ").strip() or min_magnitude)
+                    new_days = float(safe_input(f"Days to look back [{days:g}]: ").strip() or days)
+                except ValueError:
+                    print("\nPlease enter a number.")
+                    continue
+                if new_days > 0:
+                    days = new_days
+                else:
+                    print("\nThe window must be more than 0 days.")
+            elif choice == "5":
                 return
-            
-            print("\n5.0 earthquakes today:")
-            print("-" * 50)
-            print(f"\nUSGS URL: {url}\n")
-            
-            for feature in data['features']:
-                properties = feature['properties']
-                mag = properties['mag']
-                place = properties['place']
-                time = datetime.fromtimestamp(properties['time'] / 1000).strftime('%Y-%m-%d %H:%M:%S UTC')
-                coordinates = feature['geometry']['coordinates']
-                lon, lat = coordinates[0], coordinates[1]
-                maps_url = get_google_maps_url_for_coordinates(lat, lon)
-
-                print(f"Magnitude: {mag}")
-                print(f"Place: {place}")
-                print(f"Time: {time}")
-                print(f"Google Maps URL: {maps_url}")
-                print("-" * 50)
-            
-        except Exception as e:
-            print(f"\nError getting earthquake data: {e}")
-        finally:
-            spinner.stop()
-        
-        try:
-            safe_input("\nPress Enter to continue...")
-        except (KeyboardInterrupt, EOFError):
+            else:
+                print("\nInvalid choice. Please enter 1-5.")
+        except KeyboardInterrupt:
             exit_gracefully("\n\nProgram interrupted. Goodbye!")
-    
-    except (KeyboardInterrupt, EOFError):
-        exit_gracefully("\n\nProgram interrupted. Goodbye!")
+        except EOFError:
+            exit_gracefully("\n\nEnd of input. Goodbye!")
+
+def get_fred_data(series_id, api_key, observation_start=None):
+    """Fetch observations from FRED API for a given series ID, oldest first.
 
-def get_fred_data(series_id, api_key):
-    """Fetch data from FRED API for a given series ID."""
-    # Request the last 2 observations, sorted in descending order by date
-    url = f"https://api.stlouisfed.org/fred/series/observations?series_id={series_id}&api_key={api_key}&file_type=json&sort_order=desc&limit=2"
-    response = requests.get(url)
+    Without observation_start the full history is returned.
+    """
+    url = f"https://api.stlouisfed.org/fred/series/observations?series_id={series_id}&api_key={api_key}&file_type=json&sort_order=asc"
+    if observation_start:
+        url += f"&observation_start={observation_start}"
+    response = http_get(url)  # Not response-cached: fred_series_due decides when to ask, and force must reach FRED
     response.raise_for_status()
     return response.json()
 
-def display_fred_indicators():
-    """Display economic indicators from FRED API."""
+def refresh_fred_series(series_id, api_key):
+    """Fetch only observations from the newest stored date onward (the full history the first time)"""
+    data = get_fred_data(series_id, api_key, observation_start=get_last_stored_date('fred', series_id))
+    store_observations('fred', series_id,
+                       [(item['date'], parse_observation_value(item['value']))
+                        for item in data.get('observations', [])])
+
+# Release-aware refresh scheduling: FRED frequency codes mapped to one observation period (relativedelta arguments)
+FRED_FREQUENCY_PERIODS = {
+    'D': {'days': 1},
+    'W': {'weeks': 1},
+    'BW': {'weeks': 2},
+    'M': {'months': 1},
+    'Q': {'months': 3},
+    'SA': {'months': 6},
+    'A': {'years': 1},
+}
+# Observations of these frequencies are dated at the end of their period (e.g. week ending Saturday);
+# the others are dated at the start, so they cannot be published until the following period ends
+FRED_END_DATED_FREQUENCIES = ('D', 'W', 'BW')
+FRED_RECHECK_INTERVALS = {
+    'D': timedelta(hours=6),
+    'W': timedelta(hours=12),
+    'BW': timedelta(hours=12),
+}
+FRED_DEFAULT_RECHECK_INTERVAL = timedelta(days=1)
+
+# How long before the expected next release (last_updated plus one period) rechecks start,
+# since release dates drift by a few days from one period to the next
+FRED_RELEASE_LEADS = {
+    'D': timedelta(hours=6),
+    'W': timedelta(days=1),
+    'BW': timedelta(days=2),
+    'M': timedelta(days=5),
+    'Q': timedelta(weeks=2),
+    'SA': timedelta(days=30),
+    'A': timedelta(days=30),
+}
+
+def parse_fred_timestamp(value):
+    """Parse a FRED last_updated value such as '2024-05-01 07:52:03-05' to naive local time"""
+    from dateutil import parser as dateutil_parser
+    return dateutil_parser.parse(value).astimezone().replace(tzinfo=None)
+
+def fetch_fred_series_meta(series_id, api_key):
+    """Fetch a series' current metadata from FRED as {'frequency', 'last_updated'}"""
+    url = f"https://api.stlouisfed.org/fred/series?series_id={series_id}&api_key={api_key}&file_type=json"
+    response = http_get(url)
+    response.raise_for_status()
+    series = response.json()['seriess'][0]
+    last_updated = parse_fred_timestamp(series['last_updated']) if series.get('last_updated') else None
+    return {'frequency': series.get('frequency_short'), 'last_updated': last_updated}
+
+def get_stored_fred_series_meta(series_id):
+    """Return the stored metadata for a series ({'frequency', 'last_updated', 'last_checked'}), or None if it has none"""
+    with history_db() as conn:
+        row = conn.execute('''SELECT frequency, last_updated, last_checked FROM series_meta
+                              WHERE source = 'fred' AND series_id = ?''', (series_id,)).fetchone()
+    if row is None or row[0] is None:
+        return None
+    last_updated = datetime.fromisoformat(row[1]) if row[1] else None
+    return {'frequency': row[0], 'last_updated': last_updated, 'last_checked': row[2]}
+
+def mark_fred_series_checked(series_id, meta=None):
+    """Record that a series was just checked, storing the metadata the check fetched (if any)"""
+    with history_db() as conn:
+        if meta is None:
+            conn.execute('''INSERT INTO series_meta (source, series_id, last_checked) VALUES ('fred', ?, ?)
+                            ON CONFLICT (source, series_id) DO UPDATE SET last_checked = excluded.last_checked''',
+                         (series_id, datetime.now()))
+        else:
+            last_updated = meta['last_updated'].isoformat() if meta['last_updated'] else None
+            conn.execute('''INSERT OR REPLACE INTO series_meta (source, series_id, frequency, last_updated, last_checked)
+                            VALUES ('fred', ?, ?, ?, ?)''', (series_id, meta['frequency'], last_updated, datetime.now()))
+
+def fred_next_release(frequency, last_date, last_updated=None):
+    """Earliest time the observation after last_date (YYYY-MM-DD) could be published, or None if unknown.
+
+    The observation's period gives a lower bound. When FRED's last_updated
+    time is known, the next release is also expected about one period after
+    it, less the frequency's FRED_RELEASE_LEADS margin.
+    """
+    from dateutil.relativedelta import relativedelta
+    if frequency not in FRED_FREQUENCY_PERIODS:
+        return None
+    period = relativedelta(**FRED_FREQUENCY_PERIODS[frequency])
+    next_release = datetime.strptime(last_date, '%Y-%m-%d') + period
+    if frequency not in FRED_END_DATED_FREQUENCIES:
+        next_release += period
+    if last_updated is not None:
+        next_release = max(next_release, last_updated + period - FRED_RELEASE_LEADS[frequency])
+    return next_release
+
+def fred_series_due(series_id, api_key):
+    """Decide whether a series' observations need refreshing; returns (due, metadata fetched by the check or None).
+
+    Nothing is fetched while the stored metadata says the next observation
+    cannot have been released yet, or the series was checked within its
+    recheck interval. Otherwise FRED's current metadata is fetched once: the
+    series is due unless its last_updated time is unchanged since the last
+    refresh. A series with no stored observations is always due.
+    """
+    last_date = get_last_stored_date('fred', series_id)
+    if last_date is None:
+        return True, None
+    stored = get_stored_fred_series_meta(series_id)
+    if stored is not None:
+        next_release = fred_next_release(stored['frequency'], last_date, stored['last_updated'])
+        now = datetime.now()
+        if next_release is not None and now < next_release:
+            return False, None
+        recheck = FRED_RECHECK_INTERVALS.get(stored['frequency'], FRED_DEFAULT_RECHECK_INTERVAL)
+        if stored['last_checked'] is not None and now - stored['last_checked'] < recheck:
+            return False, None
+    meta = fetch_fred_series_meta(series_id, api_key)
+    if stored is not None and stored['last_updated'] is not None and meta['last_updated'] == stored['last_updated']:
+        mark_fred_series_checked(series_id, meta)  # Nothing new since the last refresh
+        return False, meta
+    return True, meta
+
+FRED_SERIES = {
+    "Effective Federal Funds Rate": {"id": "FEDFUNDS", "percent_change": False},
+    "10-Year Treasury Constant Maturity Rate": {"id": "DGS10", "percent_change": False},
+    "M2 Money Stock (Billions of $)": {"id": "M2SL", "percent_change": True},
+    "Industrial Production Index (2017=100)": {"id": "INDPRO", "percent_change": True},
+    "Gross Domestic Product (Billions of $)": {"id": "GDP", "percent_change": True},
+    "CPI All Urban Consumers (Index 1982-84=100)": {"id": "CPIAUCSL", "percent_change": True},
+    "Civilian Unemployment Rate (%)": {"id": "UNRATE", "percent_change": False},
+    "30-Year Fixed Rate Mortgage Average (%)": {"id": "MORTGAGE30US", "percent_change": False},
+    "Housing Starts (Thousands of Units)": {"id": "HOUST", "percent_change": True},
+    "Consumer Sentiment (U. Michigan)": {"id": "UMCSENT", "percent_change": False},
+    "Initial Claims (Weekly)": {"id": "ICSA", "percent_change": False},
+    "S&P/Case-Shiller U.S. Home Price Index": {"id": "CSUSHPINSA", "percent_change": True}
+}
+
+FRED_FETCH_WORKERS = 4
+
+def fetch_fred_indicator(name, series_id, api_key, force=False):
+    """Refresh one FRED series in the local store and summarize its latest change (or the error) as a result dict.
+
+    The network is skipped when the series cannot have a new observation yet,
+    unless force is set; 'refreshed' in the result records whether it was called.
+    """
+    refresh_error = None
+    refreshed = False
+    try:
+        due, meta = (True, None) if force else fred_series_due(series_id, api_key)
+        if due:
+            refreshed = True
+            refresh_fred_series(series_id, api_key) # Network call
+            mark_fred_series_checked(series_id, meta)
+    except requests.exceptions.HTTPError as item_e:
+        error_detail_msg = str(item_e)
+        if item_e.response is not None:
+            error_detail_msg = f"HTTP {item_e.response.status_code} - {item_e.response.reason}"
+            if item_e.response.status_code == 400:
+                try:
+                    error_detail = item_e.response.json()
+                    error_detail_msg += f": {error_detail.get('error_message', 'No additional details.')}"
+                except json.JSONDecodeError:
+                    pass # Keep original error_detail_msg
+        refresh_error = f"Failed to fetch: {error_detail_msg}"
+    except Exception as item_e:
+        refresh_error = f"An unexpected error occurred: {item_e}"
+
+    try:
+        observations = get_stored_observations('fred', series_id, limit=2)
+    except sqlite3.Error as item_e:
+        return {'name': name, 'error': refresh_error or f"Database error: {item_e}"}
+
+    if refresh_error and not observations:
+        return {'name': name, 'error': refresh_error, 'refreshed': refreshed}
+
+    if len(observations) < 2:
+        return {'name': name, 'error': "Not enough data available (requires at least 2 observations).",
+                'refreshed': refreshed}
+    
+    (latest_date, latest_value), (previous_date, previous_value) = observations[0], observations[1]
+    
+    if latest_value is None or previous_value is None:
+        return {
+            'name': name, 
+            'error': "Data point missing for latest or previous period.",
+            'latest_date': latest_date,
+            'latest_value_raw': latest_value if latest_value is not None else '.',
+            'previous_date': previous_date,
+            'previous_value_raw': previous_value if previous_value is not None else '.',
+            'refreshed': refreshed
+        }
+
+    result_item = {
+        'name': name,
+        'latest_date': latest_date,
+        'latest_value': latest_value,
+        'previous_date': previous_date,
+        'previous_value': previous_value,
+        'change': latest_value - previous_value,
+        'is_percentage_change': FRED_SERIES[name]['percent_change'],
+        'refreshed': refreshed
+    }
+    if refresh_error:
+        result_item['stale'] = refresh_error
+    return result_item
+
+def display_fred_indicators(force=False):
+    """Display economic indicators from FRED API (only series that may have new data are re-fetched unless force is set)."""
     api_key = os.getenv("FRED_API_KEY")
     if not api_key:
         print("\nError: FRED_API_KEY environment variable not set.")
@@ -1126,87 +3510,29 @@ def display_fred_indicators():
         safe_input("\nPress Enter to continue...")
         return
 
-    # Removed global spinner initialization
+    series_ids = FRED_SERIES
     
-    series_ids = {
-        "Effective Federal Funds Rate": "FEDFUNDS",
-        "10-Year Treasury Constant Maturity Rate": "DGS10",
-        "M2 Money Stock (Billions of $)": "M2SL",
-        "Industrial Production Index (2017=100)": "INDPRO",
-        "Gross Domestic Product (Billions of $)": "GDP",
-        "CPI All Urban Consumers (Index 1982-84=100)": "CPIAUCSL",
-        "Civilian Unemployment Rate (%)": "UNRATE",
-        "30-Year Fixed Rate Mortgage Average (%)": "MORTGAGE30US",
-        "Housing Starts (Thousands of Units)": "HOUST",
-        "Consumer Sentiment (U. Michigan)": "UMCSENT",
-        "Initial Claims (Weekly)": "ICSA",
-        "S&P/Case-Shiller U.S. Home Price Index": "CSUSHPINSA"
-    }
-    
-    fetched_results = []
-
     print("\n--- Federal Reserve Economic Indicators ---")
 
-    for name, series_id in series_ids.items():
-        spinner = Halo(text=f'Fetching {name}...', spinner='dots')
-        spinner.start()
-        try:
-            data = get_fred_data(series_id, api_key) # Network call
-            observations = data.get('observations', [])
-            
-            if len(observations) < 2:
-                spinner.warn(f"Insufficient data for {name}")
-                fetched_results.append({'name': name, 'error': "Not enough data available (requires at least 2 observations)."})
-                continue
-            
-            latest_data = observations[0]
-            previous_data = observations[1]
-            
-            if latest_data['value'] == '.' or previous_data['value'] == '.':
-                spinner.warn(f"Data point missing for {name}")
-                fetched_results.append({
-                    'name': name, 
-                    'error': "Data point missing for latest or previous period.",
-                    'latest_date': latest_data['date'],
-                    'latest_value_raw': latest_data['value'],
-                    'previous_date': previous_data['date'],
-                    'previous_value_raw': previous_data['value']
-                })
-                continue
+    # Fetch concurrently but keep the configured display order
+    fetched_results = [None] * len(series_ids)
+    spinner = make_spinner(text=f'Updating FRED indicators (0/{len(series_ids)})...', spinner='dots')
+    spinner.start()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=FRED_FETCH_WORKERS) as executor:
+        futures = {executor.submit(fetch_fred_indicator, name, info['id'], api_key, force): position
+                   for position, (name, info) in enumerate(series_ids.items())}
+        for done, future in enumerate(concurrent.futures.as_completed(futures), 1):
+            fetched_results[futures[future]] = future.result()
+            spinner.text = f'Updating FRED indicators ({done}/{len(series_ids)})...'
+    failed = sum(1 for result in fetched_results if 'error' in result)
+    refreshed = sum(1 for result in fetched_results if result.get('refreshed'))
+    summary = f"{refreshed} refreshed, {len(series_ids) - refreshed} up to date"
+    if failed:
+        spinner.warn(f"Loaded {len(series_ids) - failed} of {len(series_ids)} indicators ({summary})")
+    else:
+        spinner.succeed(f"Loaded {len(series_ids)} indicators ({summary})")
 
-            latest_value = float(latest_data['value'])
-            previous_value = float(previous_data['value'])
-            change = latest_value - previous_value
-            
-            spinner.succeed(f"Successfully fetched {name}")
-            result_item = {
-                'name': name,
-                'latest_date': latest_data['date'],
-                'latest_value': latest_value,
-                'previous_date': previous_data['date'],
-                'previous_value': previous_value,
-                'change': change,
-                'is_percentage_change': series_id in ["M2SL", "INDPRO", "GDP", "CPIAUCSL", "HOUST", "CSUSHPINSA"]
-            }
-            fetched_results.append(result_item)
-
-        except requests.exceptions.HTTPError as item_e:
-            error_detail_msg = str(item_e)
-            if item_e.response is not None:
-                error_detail_msg = f"HTTP {item_e.response.status_code} - {item_e.response.reason}"
-                if item_e.response.status_code == 400:
-                    try:
-                        error_detail = item_e.response.json()
-                        error_detail_msg += f": {error_detail.get('error_message', 'No additional details.')}"
-                    except json.JSONDecodeError:
-                        pass # Keep original error_detail_msg
-            spinner.fail(f"Failed to fetch {name}")
-            fetched_results.append({'name': name, 'error': f"Failed to fetch: {error_detail_msg}"})
-        except Exception as item_e:
-            spinner.fail(f"Failed to process {name}")
-            fetched_results.append({'name': name, 'error': f"An unexpected error occurred: {item_e}"})
-
-    # Print results after all spinners are done
+    # Print results after all fetches are done
     if not fetched_results:
         print("No indicators to display or all attempts failed.")
     else:
@@ -1221,6 +3547,8 @@ def display_fred_indicators():
                     print(f"  Error: {result['error']}")
                 continue
 
+            if 'stale' in result:
+                print(f"  (Showing stored data; refresh failed: {result['stale']})")
             print(f"  Latest Value ({result['latest_date']}): {result['latest_value']}")
             
             if result['is_percentage_change']:
@@ -1234,30 +3562,440 @@ def display_fred_indicators():
             
     safe_input("\nPress Enter to continue...")
 
+# Vectorized analytics over stored FRED/BLS history
+ANALYTICS_CORRELATION_PAIRS = [
+    ('fred', 'CPIAUCSL', 'fred', 'FEDFUNDS'),
+    ('fred', 'UNRATE', 'fred', 'FEDFUNDS'),
+    ('fred', 'MORTGAGE30US', 'fred', 'DGS10'),
+    ('fred', 'HOUST', 'fred', 'MORTGAGE30US'),
+    ('bls', 'CUSR0000SA0', 'bls', 'LNS14000000'),
+]
+
+def load_series_array(source, series_id):
+    """Load a stored series as (dates, values) NumPy arrays in ascending date order, skipping missing values"""
+    rows = get_stored_observations(source, series_id)
+    dates = np.array([row[0] for row in rows], dtype='datetime64[D]')[::-1]
+    values = np.array([np.nan if row[1] is None else row[1] for row in rows], dtype=float)[::-1]
+    present = ~np.isnan(values)
+    return dates[present], values[present]
+
+# (largest median spacing in days, observations per year) for the usual release frequencies
+OBSERVATION_FREQUENCIES = [(3, 260), (10, 52), (20, 26), (45, 12), (120, 4), (250, 2)]
+
+def periods_per_year(dates):
+    """Infer observations per year from the median spacing of the dates (business daily, weekly, ..., annual)"""
+    if len(dates) < 2:
+        return None
+    gap = float(np.median(np.diff(dates).astype(float)))
+    for max_gap, per_year in OBSERVATION_FREQUENCIES:
+        if gap <= max_gap:
+            return per_year
+    return 1
+
+def change_over_months(dates, values, months, percent):
+    """Change of every observation versus the one `months` months earlier (NaN where there is none).
+
+    The earlier observation is the last one on or before the same day `months`
+    months back, accepted only if it falls within a week of that day.
+    """
+    month_start = dates.astype('datetime64[M]')
+    target = (month_start - months).astype('datetime64[D]') + (dates - month_start.astype('datetime64[D]'))
+    index = np.searchsorted(dates, target, side='right') - 1
+    valid = index >= 0
+    index = np.clip(index, 0, None)
+    valid &= (target - dates[index]).astype(int) <= 7
+    base = values[index]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        change = (values - base) / np.abs(base) * 100 if percent else values - base
+    return np.where(valid & np.isfinite(change), change, np.nan)
+
+def annualized_rates(values, per_year):
+    """Period-over-period growth compounded to an annual rate, in percent"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (np.power(values[1:] / values[:-1], per_year) - 1) * 100
+
+def rolling_mean(values, window):
+    """Trailing mean over `window` observations (NaN until a full window is available)"""
+    means = np.full(len(values), np.nan)
+    if 0 < window <= len(values):
+        sums = np.cumsum(np.insert(values, 0, 0.0))
+        means[window - 1:] = (sums[window:] - sums[:-window]) / window
+    return means
+
+def z_scores(values):
+    """Standard scores of every observation against the whole history"""
+    std = values.std()
+    return (values - values.mean()) / std if std > 0 else np.zeros(len(values))
+
+def monthly_means(dates, values):
+    """Average observations into calendar months, returning (months, means)"""
+    months = dates.astype('datetime64[M]')
+    unique_months, inverse = np.unique(months, return_inverse=True)
+    return unique_months, np.bincount(inverse, weights=values) / np.bincount(inverse)
+
+def series_correlation(first, second):
+    """Pearson correlation of two (dates, values) series over their common months.
+
+    Returns (correlation, number of months, first month, last month), or None
+    when fewer than three months overlap.
+    """
+    months_a, means_a = monthly_means(*first)
+    months_b, means_b = monthly_means(*second)
+    common, index_a, index_b = np.intersect1d(months_a, months_b, return_indices=True)
+    if len(common) < 3:
+        return None
+    return float(np.corrcoef(means_a[index_a], means_b[index_b])[0, 1]), len(common), common[0], common[-1]
+
+def format_change(value, percent):
+    """Format a change as +1.23% or +1.23 (N/A when undefined)"""
+    if value is None or not np.isfinite(value):
+        return "N/A"
+    return f"{value:+.2f}%" if percent else f"{value:+.2f}"
+
+def display_indicator_analytics(source, series):
+    """Print analytics for every stored series of a source plus cross-series correlations (no network)"""
+    print(f"\n--- {source.upper()} Indicator Analytics (from stored history) ---")
+    print(f"{'Indicator':<44} {'Latest':>12} {'YoY':>9} {'Annual.':>9} {'1y Avg':>12} {'Z-score':>8} {'Since':>8}")
+    print("-" * 108)
+    for name, info in series.items():
+        dates, values = load_series_array(source, info['id'])
+        if len(values) < 2:
+            print(f"{name[:44]:<44} {'No stored data (view the latest indicators first)':>60}")
+            continue
+        per_year = periods_per_year(dates)
+        yoy = change_over_months(dates, values, 12, info['percent_change'])[-1]
+        annualized = annualized_rates(values, per_year)[-1] if info['percent_change'] and per_year else None
+        year_mean = rolling_mean(values, max(1, round(per_year or 1)))[-1]
+        z_score = z_scores(values)[-1]
+        year_mean_text = f"{year_mean:.2f}" if np.isfinite(year_mean) else "N/A"
+        print(f"{name[:44]:<44} {values[-1]:>12.2f} {format_change(yoy, info['percent_change']):>9} "
+              f"{format_change(annualized, True):>9} {year_mean_text:>12} {z_score:>+8.2f} "
+              f"{str(dates[0].astype('datetime64[Y]')):>8}")
+
+    names = {(src, info['id']): name for src, config in (('fred', FRED_SERIES), ('bls', BLS_SERIES))
+             for name, info in config.items()}
+    pairs = [pair for pair in ANALYTICS_CORRELATION_PAIRS if source in (pair[0], pair[2])]
+    if pairs:
+        print("\nCorrelations of monthly averages:")
+        for source_a, id_a, source_b, id_b in pairs:
+            result = series_correlation(load_series_array(source_a, id_a), load_series_array(source_b, id_b))
+            label = f"{names.get((source_a, id_a), id_a)} vs {names.get((source_b, id_b), id_b)}"
+            if result is None:
+                print(f"  {label}: not enough overlapping stored history")
+            else:
+                correlation, months, first, last = result
+                print(f"  {label}: {correlation:+.2f} ({months} months, {first} to {last})")
+    safe_input("\nPress Enter to continue...")
+
 def fred_menu():
     """Display and handle FRED data menu"""
     while True:
         try:
             print("\n=== US Federal Reserve Indicators Menu ===")
             print("1. View latest Federal Reserve indicators")
-            print("2. Return to main menu")
+            print("2. View stored history for an indicator")
+            print("3. Force refresh of all indicators")
+            print("4. Analytics (from stored history)")
+            print("5. Return to main menu")
             
-            choice = safe_input("\nEnter your choice (1-2): ")
+            choice = safe_input("\nEnter your choice (1-5): ")
             
             if choice == "1":
                 display_fred_indicators()
             elif choice == "2":
+                display_stored_history('fred', FRED_SERIES)
+            elif choice == "3":
+                display_fred_indicators(force=True)
+            elif choice == "4":
+                display_indicator_analytics('fred', FRED_SERIES)
+            elif choice == "5":
                 return
             else:
-                print("\nInvalid choice. Please enter 1-2.")
+                print("\nInvalid choice. Please enter 1-5.")
         except KeyboardInterrupt:
             exit_gracefully("\n\nProgram interrupted. Goodbye!")
         except EOFError:
             exit_gracefully("\n\nEnd of input. Goodbye!")
 
+# Headless subcommands and NDJSON batch runs (no spinners or prompts; results as JSON on stdout)
+BATCH_WORKERS = 8
+_headless_output = sys.stdout  # Real stdout while headless; sys.stdout is pointed at stderr so stray prints stay out of the JSON
+_headless_output_lock = threading.Lock()
+
+def write_json_line(record):
+    """Write one JSON document as a line on the headless output stream"""
+    line = json.dumps(record, default=str)
+    with _headless_output_lock:
+        _headless_output.write(line + "\n")
+        _headless_output.flush()
+
+def resolve_location(address=None, lat=None, lon=None):
+    """Return location data for an address (geocoded and saved) or for explicit coordinates"""
+    if lat is not None and lon is not None:
+        return {'lat': float(lat), 'lon': float(lon), 'matched_address': None}
+    if not address:
+        raise ValueError("Provide an address or both lat and lon")
+    location_data = get_coordinates(address)
+    if location_data is None:
+        raise LookupError(f"Could not find the address: {address}")
+    save_search(address, location_data)
+    return location_data
+
+def job_weather(address=None, lat=None, lon=None):
+    """Current conditions and the next three forecast periods for a location"""
+    location_data = resolve_location(address, lat, lon)
+    weather_data = get_weather(location_data['lat'], location_data['lon'])
+    if weather_data is None:
+        raise RuntimeError("Could not retrieve weather data")
+    return {'location': location_data, **weather_data}
+
+def job_tides(address=None, lat=None, lon=None):
+    """Tide predictions from the station nearest to a location"""
+    location_data = resolve_location(address, lat, lon)
+    nearest = nearest_tide_stations(float(location_data['lat']), float(location_data['lon']))
+    if not nearest or nearest[0][1] > TIDE_STATION_MAX_DISTANCE_KM:
+        raise LookupError(f"No tide station within {TIDE_STATION_MAX_DISTANCE_KM} km")
+    station_id, distance_km = nearest[0]
+    station = get_station_info(station_id)['stations'][0]
+    tide_data = get_tide_data(station_id)
+    if 'predictions' not in tide_data:
+        raise RuntimeError(tide_data.get('error', {}).get('message', "No tide predictions returned"))
+    return {
+        'location': location_data,
+        'station': {**station, 'distance_km': round(distance_km, 1)},
+        'predictions': [{'time': p['t'], 'type': 'high' if p['type'] == 'H' else 'low', 'feet': float(p['v'])}
+                        for p in tide_data['predictions']],
+    }
+
+def job_scores(league):
+    """Summarized games on a league's current ESPN scoreboard, or on every league's for 'all'"""
+    if league == 'all':
+        return {league: games if isinstance(games, list) else {'error': str(games)}
+                for league, games in fetch_all_league_games().items()}
+    if league not in LEAGUES:
+        raise ValueError(f"Unknown league '{league}'; choose from {', '.join(LEAGUES)} or all")
+    return fetch_league_games(league)
+
+def job_news(domain='wsj.com', include_seen=False):
+    """Latest articles from a news site, or for 'all' the digest of every default and saved site.
+
+    The digest collapses near-duplicates into stories (each with the other
+    sources' versions under 'duplicates') and leaves out stories shown by an
+    earlier digest unless include_seen is set.
+    """
+    if domain == 'all':
+        stories, seen, errors = news_digest_stories(include_seen)
+        if errors and not stories and not seen:
+            raise RuntimeError('; '.join(f"{site}: {error}" for site, error in errors.items()))
+        fields = ('title', 'published', 'url', 'source', 'description', 'publisher')
+        return {'stories': [{**{field: story[0][field] for field in fields},
+                             'duplicates': [{field: article[field] for field in fields} for article in story[1:]]}
+                            for story in stories],
+                'already_seen': seen,
+                'errors': {site: str(error) for site, error in errors.items()}}
+    articles = fetch_news(domain)
+    if articles and domain not in DEFAULT_NEWS_SITES:
+        save_news_site(domain)
+    return articles
+
+def job_bls():
+    """Refresh the stored BLS indicators and return each one's latest and previous values"""
+    refresh_error = None
+    try:
+        refresh_bls_series([info['id'] for info in BLS_SERIES.values()])
+    except Exception as e:
+        refresh_error = str(e)
+
+    results = []
+    for name, info in BLS_SERIES.items():
+        observations = get_stored_observations('bls', info['id'], limit=2)
+        result = {'name': name, 'series_id': info['id'], 'percent_change': info['percent_change']}
+        if len(observations) == 2:
+            (result['date'], result['value']), (result['previous_date'], result['previous_value']) = observations
+        if refresh_error:
+            result['stale'] = refresh_error
+        results.append(result)
+    if refresh_error and not any('value' in result for result in results):
+        raise RuntimeError(refresh_error)
+    return results
+
+def job_fred(force=False):
+    """Refresh the configured FRED indicators (only those due unless force is set) and summarize them"""
+    api_key = os.getenv("FRED_API_KEY")
+    if not api_key:
+        raise ValueError("FRED_API_KEY environment variable not set")
+    with concurrent.futures.ThreadPoolExecutor(max_workers=FRED_FETCH_WORKERS) as executor:
+        return list(executor.map(lambda item: fetch_fred_indicator(item[0], item[1]['id'], api_key, force),
+                                 FRED_SERIES.items()))
+
+def job_quakes(min_magnitude=QUAKE_DEFAULT_MIN_MAGNITUDE, days=QUAKE_DEFAULT_DAYS, place=None, offline=False):
+    """Earthquakes at or above min_magnitude from the last `days` days, from the local store after refreshing it.
+
+    With offline set the store is queried without contacting USGS.
+    """
+    if not offline:
+        refresh_quake_store(float(min_magnitude), float(days))
+    return [{**event, 'time': event['time'].isoformat()}
+            for event in stored_quakes(float(min_magnitude), float(days), place=place)]
+
+def watch_quakes_headless(min_magnitude, days):
+    """Stream one JSON line per new or revised earthquake until interrupted"""
+    try:
+        for events, interval in watch_earthquakes(min_magnitude, days):
+            if isinstance(events, Exception):
+                print(f"Error: {events} (retrying in {interval} seconds)", file=sys.stderr)
+                continue
+            for event in events:
+                write_json_line({**event, 'time': event['time'].isoformat()})
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+def job_salesforce_contacts(filter_value, limit=None):
+    """Salesforce contacts matching filter_value (the first `limit` of them, if given) with the total match count"""
+    if limit is not None:
+        limit = positive_int(limit)
+    total, contacts = call_salesforce(stream_salesforce_contacts, filter_value)
+    return {'total': total,
+            'records': [{key: value for key, value in contact.items() if key != 'attributes'}
+                        for contact in itertools.islice(contacts, limit)]}
+
+def job_salesforce_sync(full=False):
+    """Sync the local contact mirror; full reloads every contact"""
+    upserted, removed = call_salesforce(sync_salesforce_contacts, full)
+    return {'upserted': upserted, 'removed': removed}
+
+def job_salesforce_search(filter_value, limit=SF_MIRROR_SEARCH_LIMIT):
+    """Ranked matches from the local contact mirror (no network)"""
+    return search_contact_mirror(filter_value, positive_int(limit))
+
+def job_salesforce_export(path, filter_value='', file_format=None):
+    """Export contacts (all, or those matching filter_value) to a CSV or Parquet file with Bulk API 2.0"""
+    records = call_salesforce(export_salesforce_contacts, path, filter_value, file_format)
+    return {'path': os.path.abspath(path), 'records': records}
+
+# Service names accepted by the subcommands and by the "service" field of batch jobs
+HEADLESS_JOBS = {
+    'weather': job_weather,
+    'tides': job_tides,
+    'scores': job_scores,
+    'news': job_news,
+    'bls': job_bls,
+    'fred': job_fred,
+    'quakes': job_quakes,
+    'salesforce_contacts': job_salesforce_contacts,
+    'salesforce_sync': job_salesforce_sync,
+    'salesforce_search': job_salesforce_search,
+    'salesforce_export': job_salesforce_export,
+}
+
+def run_job(job):
+    """Run one batch job dict ({"id", "service", **arguments}) and return its result record"""
+    record = {'id': job.get('id'), 'service': job.get('service')}
+    arguments = {key: value for key, value in job.items() if key not in ('id', 'service')}
+    try:
+        if record['service'] not in HEADLESS_JOBS:
+            raise ValueError(f"Unknown service '{record['service']}'; choose from {', '.join(HEADLESS_JOBS)}")
+        record['result'] = HEADLESS_JOBS[record['service']](**arguments)
+        record['ok'] = True
+    except Exception as e:
+        record['ok'] = False
+        record['error'] = f"{type(e).__name__}: {e}"
+    return record
+
+def run_batch(lines, workers=BATCH_WORKERS):
+    """Run NDJSON jobs with at most `workers` in flight, writing each result line as it completes.
+
+    Input is read lazily, so a large job file is never held in memory. Jobs
+    without an "id" are identified by their line number. Returns the number
+    of failed jobs.
+    """
+    failed = 0
+    pending = set()
+
+    def collect(done):
+        nonlocal failed
+        for future in done:
+            record = future.result()
+            failed += not record['ok']
+            write_json_line(record)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        for line_number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            try:
+                job = json.loads(line)
+                if not isinstance(job, dict):
+                    raise ValueError("a job must be a JSON object")
+            except ValueError as e:
+                failed += 1
+                write_json_line({'id': line_number, 'service': None, 'ok': False, 'error': f"Invalid job: {e}"})
+                continue
+            job.setdefault('id', line_number)
+            if len(pending) >= workers:
+                done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                collect(done)
+            pending.add(executor.submit(run_job, job))
+        collect(concurrent.futures.as_completed(pending))
+    return failed
+
+def watch_scores_headless(league):
+    """Stream one JSON line per changed game until the league's games are all final"""
+    if league not in LEAGUES:
+        print("Error: --watch follows a single league", file=sys.stderr)
+        return 2
+    sport, espn_league, _ = LEAGUES[league]
+    try:
+        for changed, interval in watch_scoreboard(sport, espn_league):
+            if isinstance(changed, Exception):
+                print(f"Error: {changed} (retrying in {interval} seconds)", file=sys.stderr)
+                continue
+            for game in changed:
+                write_json_line({'league': league, **game})
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+def positive_int(value):
+    """argparse type for counts that must be at least 1"""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, not {value}")
+    return number
+
+def run_headless(args):
+    """Run a subcommand or batch without spinners or prompts and return the process exit code"""
+    global HEADLESS, _headless_output
+    HEADLESS = True
+    _headless_output = sys.stdout
+    sys.stdout = sys.stderr
+    try:
+        init_db()
+        if args.command == 'batch':
+            if args.file == '-':
+                return 1 if run_batch(sys.stdin, args.workers) else 0
+            with open(args.file, encoding='utf-8') as job_file:
+                return 1 if run_batch(job_file, args.workers) else 0
+
+        if getattr(args, 'watch', False):
+            if args.command == 'quakes':
+                return watch_quakes_headless(args.min_magnitude, args.days)
+            return watch_scores_headless(args.league)
+
+        arguments = {key: value for key, value in vars(args).items()
+                     if key not in ('command', 'debug', 'service', 'salesforce_command', 'watch') and value is not None}
+        record = run_job({'service': args.service, **arguments})
+        if not record['ok']:
+            print(f"Error: {record['error']}", file=sys.stderr)
+            return 1
+        write_json_line(record['result'])
+        return 0
+    finally:
+        sys.stdout = _headless_output
+
 def main_menu():
     """Display and handle main menu"""
-    init_db()  # Ensure database exists
     while True:
         try:
             print("\n=== Multi-Service CLI Tool ===")
@@ -1305,19 +4043,90 @@ def exit_gracefully(message="\nGoodbye!"):
 
 def safe_input(prompt):
     """Safely handle user input with keyboard interrupt and EOF handling"""
+    if HEADLESS:
+        raise RuntimeError("Interactive input is not available in headless mode")
     try:
         return input(prompt)
     except (KeyboardInterrupt, EOFError):
         exit_gracefully("\n\nProgram interrupted. Goodbye!")
 
-if __name__ == "__main__":
+def main(argv=None):
+    """Parse command-line arguments and run a headless subcommand or the interactive menu"""
+    global DEBUG_MODE
+
+    parser = argparse.ArgumentParser(description='Poly CLI - A multi-function command-line interface')
+    parser.add_argument('--debug', action='store_true', help='Enable debug mode with additional information')
+    commands = parser.add_subparsers(dest='command', metavar='COMMAND',
+                                     help='Run one service without the menus and print JSON (omit for the interactive menu)')
+    for service in ('weather', 'tides'):
+        location_parser = commands.add_parser(service, help=f'{service.capitalize()} for an address or coordinates')
+        location_parser.add_argument('address', nargs='?', help='Street, city, state, zip code')
+        location_parser.add_argument('--lat', type=float, help='Latitude (use with --lon instead of an address)')
+        location_parser.add_argument('--lon', type=float, help='Longitude')
+    scores_parser = commands.add_parser('scores', help='Current ESPN scoreboard')
+    scores_parser.add_argument('league', choices=list(LEAGUES) + ['all'])
+    scores_parser.add_argument('--watch', action='store_true',
+                               help='Keep polling and print a JSON line for each game that changes (one league only)')
+    news_parser = commands.add_parser('news', help='Latest articles from a news site')
+    news_parser.add_argument('domain', nargs='?', default='wsj.com',
+                             help="Site to fetch, or 'all' for every default and saved site")
+    news_parser.add_argument('--include-seen', action='store_true',
+                             help="With 'all', also repeat stories shown by an earlier digest")
+    commands.add_parser('bls', help='Refresh and summarize the BLS indicators')
+    fred_parser = commands.add_parser('fred', help='Refresh and summarize the FRED indicators')
+    fred_parser.add_argument('--force', action='store_true', help='Re-fetch every series, even those not yet due')
+    quakes_parser = commands.add_parser('quakes', help='Recent earthquakes from USGS')
+    quakes_parser.add_argument('--min-magnitude', type=float, default=QUAKE_DEFAULT_MIN_MAGNITUDE,
+                               help=f'Minimum magnitude (default {QUAKE_DEFAULT_MIN_MAGNITUDE})')
+    quakes_parser.add_argument('--days', type=float, default=QUAKE_DEFAULT_DAYS,
+                               help=f'Days to look back (default {QUAKE_DEFAULT_DAYS})')
+    quakes_parser.add_argument('--place', help='Only earthquakes whose location contains this text')
+    quakes_parser.add_argument('--offline', action='store_true', help='Query the stored events without contacting USGS')
+    quakes_parser.add_argument('--watch', action='store_true',
+                               help=f'Poll every {QUAKE_WATCH_INTERVAL} seconds and print a JSON line per new or revised event')
+    salesforce_parser = commands.add_parser('salesforce', help='Salesforce queries')
+    salesforce_commands = salesforce_parser.add_subparsers(dest='salesforce_command', metavar='QUERY', required=True)
+    contacts_parser = salesforce_commands.add_parser('contacts', help='Contacts matching a filter value')
+    contacts_parser.add_argument('filter_value', metavar='FILTER')
+    contacts_parser.add_argument('--limit', type=positive_int, help='Return at most this many contacts')
+    contacts_parser.set_defaults(service='salesforce_contacts')
+    sync_parser = salesforce_commands.add_parser('sync', help='Update the local contact mirror')
+    sync_parser.add_argument('--full', action='store_true', help='Reload every contact instead of only changes')
+    sync_parser.set_defaults(service='salesforce_sync')
+    search_parser = salesforce_commands.add_parser('search', help='Search the local contact mirror (offline)')
+    search_parser.add_argument('filter_value', metavar='TEXT')
+    search_parser.add_argument('--limit', type=positive_int,
+                               help=f'Return at most this many matches (default {SF_MIRROR_SEARCH_LIMIT})')
+    search_parser.set_defaults(service='salesforce_search')
+    export_parser = salesforce_commands.add_parser('export', help='Export contacts to CSV or Parquet with Bulk API 2.0')
+    export_parser.add_argument('path', help='Output file; a .parquet name selects Parquet (needs pyarrow)')
+    export_parser.add_argument('--filter', dest='filter_value', metavar='FILTER', default='', help='Only contacts matching this value')
+    export_parser.add_argument('--format', dest='file_format', choices=['csv', 'parquet'],
+                               help='Output format (default: from the file name)')
+    export_parser.set_defaults(service='salesforce_export')
+    batch_parser = commands.add_parser('batch', help='Run NDJSON jobs from a file or stdin, one JSON result per line')
+    batch_parser.add_argument('file', nargs='?', default='-', help='Job file (default: stdin)')
+    batch_parser.add_argument('--workers', type=positive_int, default=BATCH_WORKERS,
+                              help=f'Jobs run in parallel (default {BATCH_WORKERS})')
+    args = parser.parse_args(argv)
+    DEBUG_MODE = args.debug
+
+    if args.command is not None:
+        if args.command != 'salesforce':
+            args.service = args.command
+        sys.exit(run_headless(args))
+
     try:
         # Notify users if debug mode is active
         if DEBUG_MODE:
             print("\n*** Debug Mode Active - Additional diagnostic information will be displayed ***")
         
+        init_db()  # Migrate history.db and compact old searches once per run
         main_menu()
     except KeyboardInterrupt:  # Handle Ctrl+C
         exit_gracefully("\n\nProgram interrupted. Goodbye!")
     except EOFError:  # Handle Ctrl+D
         exit_gracefully("\n\nEnd of input. Goodbye!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import poly_cli
+
+
+@pytest.fixture(autouse=True)
+def isolated_databases(tmp_path, monkeypatch):
+    """Run each test against fresh history.db and cache.db files in a temporary directory"""
+    monkeypatch.chdir(tmp_path)
+    poly_cli.close_history_db()
+    monkeypatch.setattr(poly_cli, '_cache_conn', None)
+    monkeypatch.setattr(poly_cli, '_tide_catalog', None)
+    yield tmp_path
+    poly_cli.close_history_db()
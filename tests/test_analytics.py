@@ -0,0 +1,41 @@
+import numpy as np
+
+import poly_cli
+
+
+def monthly(start, count):
+    return np.arange(np.datetime64(start, 'M'), np.datetime64(start, 'M') + count).astype('datetime64[D]')
+
+
+def test_change_over_months_on_monthly_series():
+    dates = monthly('2024-01', 15)
+    values = np.arange(100.0, 115.0)
+
+    change = poly_cli.change_over_months(dates, values, 12, percent=False)
+    assert np.isnan(change[:12]).all()
+    assert change[12:].tolist() == [12.0, 12.0, 12.0]
+
+    percent = poly_cli.change_over_months(dates, values, 1, percent=True)
+    assert np.isnan(percent[0])
+    assert np.allclose(percent[1:], (values[1:] - values[:-1]) / values[:-1] * 100)
+
+
+def test_change_over_months_uses_last_observation_within_a_week():
+    # Weekly observations: a year back from 2025-01-11 is 2024-01-11, so the base is 2024-01-06
+    dates = np.arange(np.datetime64('2024-01-06'), np.datetime64('2025-01-12'), 7)
+    values = np.arange(len(dates), dtype=float)
+    change = poly_cli.change_over_months(dates, values, 12, percent=False)
+    assert dates[-1] == np.datetime64('2025-01-11')
+    assert np.isnan(change[:-1]).all()
+    assert change[-1] == values[-1] - values[0]
+
+
+def test_change_over_months_rejects_distant_or_zero_bases():
+    dates = np.array(['2024-01-01', '2024-03-01', '2024-04-01'], dtype='datetime64[D]')
+    values = np.array([0.0, 5.0, 6.0])
+    # 2024-03-01 has no observation within a week of 2024-02-01; 2024-04-01 compares with 2024-03-01
+    assert np.isnan(poly_cli.change_over_months(dates, values, 1, percent=False)[1])
+    assert poly_cli.change_over_months(dates, values, 1, percent=False)[2] == 1.0
+    # A zero base gives no percent change rather than infinity
+    assert np.isnan(poly_cli.change_over_months(dates, values, 2, percent=True)[1])
+    assert poly_cli.change_over_months(dates, values, 2, percent=False)[1] == 5.0
@@ -0,0 +1,93 @@
+import argparse
+import io
+import json
+import threading
+import time
+
+import pytest
+
+import poly_cli
+
+
+@pytest.fixture
+def output(monkeypatch):
+    """Capture the headless JSON output stream"""
+    stream = io.StringIO()
+    monkeypatch.setattr(poly_cli, '_headless_output', stream)
+    return stream
+
+
+def records(stream):
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_run_job_reports_results_and_errors(monkeypatch):
+    monkeypatch.setitem(poly_cli.HEADLESS_JOBS, 'echo', lambda text='': {'text': text})
+
+    assert poly_cli.run_job({'id': 'a', 'service': 'echo', 'text': 'hi'}) == {
+        'id': 'a', 'service': 'echo', 'result': {'text': 'hi'}, 'ok': True}
+    bad_argument = poly_cli.run_job({'id': 'b', 'service': 'echo', 'colour': 'red'})
+    assert bad_argument['ok'] is False and bad_argument['error'].startswith('TypeError:')
+    unknown = poly_cli.run_job({'id': 'c', 'service': 'telex'})
+    assert unknown['ok'] is False and "Unknown service 'telex'" in unknown['error']
+
+
+def test_run_batch_writes_one_record_per_job(monkeypatch, output):
+    def divide(a, b):
+        return a / b
+
+    monkeypatch.setitem(poly_cli.HEADLESS_JOBS, 'divide', divide)
+    lines = [
+        '{"service": "divide", "a": 6, "b": 3}\n',
+        '\n',
+        '{"id": "zero", "service": "divide", "a": 1, "b": 0}\n',
+        'not json\n',
+        '[1, 2]\n',
+    ]
+
+    assert poly_cli.run_batch(lines, workers=2) == 3
+    by_id = {record['id']: record for record in records(output)}
+    assert set(by_id) == {1, 'zero', 4, 5}
+    assert by_id[1]['ok'] is True and by_id[1]['result'] == 2
+    assert by_id['zero']['error'].startswith('ZeroDivisionError')
+    # Lines that are not JSON objects become error records keyed by line number
+    assert by_id[4]['service'] is None and by_id[4]['error'].startswith('Invalid job:')
+    assert by_id[5]['error'] == 'Invalid job: a job must be a JSON object'
+
+
+def test_run_batch_limits_jobs_in_flight(monkeypatch, output):
+    running = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def slow():
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.02)
+        with lock:
+            running -= 1
+        return 'done'
+
+    monkeypatch.setitem(poly_cli.HEADLESS_JOBS, 'slow', slow)
+    lines_read = []
+
+    def job_lines():
+        for i in range(12):
+            lines_read.append(i)
+            yield '{"service": "slow"}'
+
+    assert poly_cli.run_batch(job_lines(), workers=3) == 0
+    assert len(records(output)) == 12
+    assert peak <= 3
+    assert lines_read == list(range(12))
+
+
+def test_workers_must_be_positive():
+    assert poly_cli.positive_int('4') == 4
+    for value in ('0', '-2'):
+        with pytest.raises(argparse.ArgumentTypeError):
+            poly_cli.positive_int(value)
+    with pytest.raises(ValueError):  # argparse reports this as an invalid positive_int value
+        poly_cli.positive_int('many')
@@ -0,0 +1,74 @@
+import json
+
+import pytest
+import requests
+
+import poly_cli
+
+
+def bls_response(payload):
+    response = requests.models.Response()
+    response.status_code = 200
+    response.headers['Content-Type'] = 'application/json'
+    response._content = json.dumps(payload).encode()
+    return response
+
+
+def succeeded(body):
+    series = [{'seriesID': series_id, 'data': [{'year': body['endyear'], 'period': 'M01', 'value': '1.0'}]}
+              for series_id in body['seriesid']]
+    return bls_response({'status': 'REQUEST_SUCCEEDED', 'Results': {'series': series}})
+
+
+@pytest.fixture
+def bls_api(monkeypatch):
+    """Record BLS request bodies and answer them with `responder` (successful payloads by default)"""
+    sent = []
+    api = {'sent': sent, 'responder': succeeded}
+
+    def fake_send(method, url, **kwargs):
+        sent.append(kwargs['json'])
+        return api['responder'](kwargs['json'])
+
+    monkeypatch.setattr(poly_cli, '_send_with_retries', fake_send)
+    monkeypatch.delenv('BLS_API_KEY', raising=False)
+    return api
+
+
+def test_bls_year_windows_newest_first():
+    assert poly_cli.bls_year_windows(2017, 2026, 10) == [(2017, 2026)]
+    assert poly_cli.bls_year_windows(2015, 2026, 10) == [(2017, 2026), (2015, 2016)]
+    assert poly_cli.bls_year_windows(2000, 2026, 10) == [(2017, 2026), (2007, 2016), (2000, 2006)]
+    assert poly_cli.bls_year_windows(2026, 2026, 20) == [(2026, 2026)]
+    assert poly_cli.bls_year_windows(2027, 2026, 10) == []
+
+
+def test_unregistered_requests_split_by_series_and_years(bls_api):
+    series_ids = [f"S{i:02d}" for i in range(30)]
+    results = poly_cli.get_bls_data(series_ids, start_year=2012, end_year=2026)
+
+    assert [(body['startyear'], body['endyear'], len(body['seriesid'])) for body in bls_api['sent']] == [
+        ('2017', '2026', 25), ('2017', '2026', 5), ('2012', '2016', 25), ('2012', '2016', 5)]
+    assert all('registrationkey' not in body for body in bls_api['sent'])
+    assert set(results) == set(series_ids)
+    assert [item['year'] for item in results['S29']] == ['2026', '2016']
+
+
+def test_registered_key_raises_the_limits(bls_api, monkeypatch):
+    monkeypatch.setenv('BLS_API_KEY', 'secret')
+    poly_cli.get_bls_data([f"S{i:02d}" for i in range(30)], start_year=2012, end_year=2026)
+
+    assert [(body['startyear'], len(body['seriesid'])) for body in bls_api['sent']] == [('2012', 30)]
+    assert bls_api['sent'][0]['registrationkey'] == 'secret'
+
+
+def test_quota_errors_are_raised_and_never_cached(bls_api):
+    bls_api['responder'] = lambda body: bls_response({
+        'status': 'REQUEST_NOT_PROCESSED', 'message': ['daily threshold for total number of requests allocated']})
+    with pytest.raises(ValueError, match='daily threshold'):
+        poly_cli.get_bls_data(['CUSR0000SA0'], start_year=2025, end_year=2026)
+
+    bls_api['responder'] = succeeded
+    assert poly_cli.get_bls_data(['CUSR0000SA0'], start_year=2025, end_year=2026)['CUSR0000SA0']
+    assert poly_cli.get_bls_data(['CUSR0000SA0'], start_year=2025, end_year=2026)['CUSR0000SA0']
+    assert len(bls_api['sent']) == 2  # The error was refetched; the success was served from cache.db
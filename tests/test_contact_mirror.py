@@ -0,0 +1,67 @@
+import poly_cli
+
+
+def contact(record_id, first, last, title, modstamp, account='Acme Corp', deleted=False):
+    return {'Id': record_id, 'Account': {'Name': account}, 'FirstName': first, 'LastName': last, 'Title': title,
+            'Email': f"{first.lower()}@example.com", 'Phone': None, 'Description': None,
+            'SystemModstamp': f"2026-10-{modstamp}T10:00:00.000+0000", 'IsDeleted': deleted}
+
+
+class MirrorSalesforce:
+    """Serve query_all_iter from a list of contact records and record the SOQL used"""
+
+    def __init__(self, records):
+        self.records = records
+        self.queries = []
+
+    def query_all_iter(self, soql, include_deleted=False):
+        self.queries.append((soql, include_deleted))
+        records = [record for record in self.records if include_deleted or not record['IsDeleted']]
+        return iter(sorted(records, key=lambda record: record['SystemModstamp']))
+
+
+def names(text):
+    return [(found['FirstName'], found['LastName']) for found in poly_cli.search_contact_mirror(text)]
+
+
+def test_sync_keeps_the_full_text_index_in_step():
+    sf = MirrorSalesforce([
+        contact('003A', 'John', 'Smith', 'VP Sales', '10'),
+        contact('003B', 'Joan', 'Smithers', 'Engineer', '11'),
+        contact('003C', 'Maria', 'Garcia', 'CFO', '12', account='Globex'),
+    ])
+    assert poly_cli.sync_salesforce_contacts(sf) == (3, 0)
+    assert 'WHERE' not in sf.queries[0][0]
+
+    assert sorted(names('jo smi')) == [('Joan', 'Smithers'), ('John', 'Smith')]
+    assert names('globex') == [('Maria', 'Garcia')]
+    assert names('engineer') == [('Joan', 'Smithers')]
+
+    # Incremental sync: a changed title and a deleted contact since the last SystemModstamp
+    sf.records = [
+        contact('003B', 'Joan', 'Smithers', 'Director', '13'),
+        contact('003C', 'Maria', 'Garcia', 'CFO', '14', deleted=True),
+    ]
+    assert poly_cli.sync_salesforce_contacts(sf) == (1, 1)
+    soql, include_deleted = sf.queries[1]
+    assert 'SystemModstamp >= 2026-10-12T10:00:00Z' in soql and include_deleted
+    assert names('engineer') == []
+    assert names('director') == [('Joan', 'Smithers')]
+    assert names('globex') == []
+    assert poly_cli.contact_mirror_status()[0] == 2
+
+
+def test_full_sync_removes_contacts_no_longer_returned():
+    sf = MirrorSalesforce([contact('003A', 'John', 'Smith', 'VP Sales', '10'),
+                           contact('003B', 'Joan', 'Smithers', 'Engineer', '11')])
+    poly_cli.sync_salesforce_contacts(sf)
+
+    sf.records = [contact('003A', 'John', 'Smith', 'VP Sales', '10')]
+    assert poly_cli.sync_salesforce_contacts(sf, full=True) == (1, 1)
+    assert names('smith') == [('John', 'Smith')]
+
+
+def test_search_ignores_punctuation_and_quotes():
+    poly_cli.sync_salesforce_contacts(MirrorSalesforce([contact('003A', 'John', "O'Brien", 'VP Sales', '10')]))
+    assert names('"o brien"') == [('John', "O'Brien")]
+    assert names('*') == []
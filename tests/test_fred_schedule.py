@@ -0,0 +1,125 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+import poly_cli
+
+
+class JsonResponse:
+    def __init__(self, body):
+        self.body = body
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.body
+
+
+@pytest.fixture
+def fred(monkeypatch):
+    """Serve FRED series metadata and observations from a dict and record the endpoints requested"""
+    state = {'frequency': 'M', 'last_updated': '2000-01-15 07:45:02-06', 'requests': [],
+             'observations': [{'date': '2000-01-01', 'value': '4.0'}, {'date': '2000-02-01', 'value': '4.1'}]}
+
+    def fake_http_get(url, **kwargs):
+        if '/fred/series?' in url:
+            state['requests'].append('series')
+            return JsonResponse({'seriess': [{'frequency_short': state['frequency'],
+                                              'last_updated': state['last_updated']}]})
+        assert '/fred/series/observations?' in url
+        state['requests'].append('observations')
+        return JsonResponse({'observations': state['observations']})
+
+    monkeypatch.setattr(poly_cli, 'http_get', fake_http_get)
+    return state
+
+
+def store_meta(series_id, frequency='M', last_updated=None, last_checked=None):
+    poly_cli.mark_fred_series_checked(series_id, {'frequency': frequency, 'last_updated': last_updated})
+    with poly_cli.history_db() as conn:
+        conn.execute("UPDATE series_meta SET last_checked = ? WHERE source = 'fred' AND series_id = ?",
+                     (last_checked, series_id))
+
+
+def test_next_release_uses_period_bound():
+    # Start-dated monthly observations are published after the following month ends
+    assert poly_cli.fred_next_release('M', '2024-09-01') == datetime(2024, 11, 1)
+    assert poly_cli.fred_next_release('Q', '2024-04-01') == datetime(2024, 10, 1)
+    # End-dated weekly observations can be published a week later
+    assert poly_cli.fred_next_release('W', '2024-10-05') == datetime(2024, 10, 12)
+    assert poly_cli.fred_next_release('X', '2024-10-05') is None
+
+
+def test_next_release_follows_last_updated():
+    last_updated = datetime(2024, 10, 15, 8, 0)
+    assert poly_cli.fred_next_release('M', '2024-09-01', last_updated) == datetime(2024, 11, 10, 8, 0)
+    # An early last_updated never moves the release before the period bound
+    assert poly_cli.fred_next_release('M', '2024-09-01', datetime(2024, 9, 1)) == datetime(2024, 11, 1)
+
+
+def test_series_without_observations_is_due(fred):
+    assert poly_cli.fred_series_due('UNRATE', 'key') == (True, None)
+    assert fred['requests'] == []
+
+
+def test_series_is_not_due_before_next_release(fred):
+    poly_cli.store_observations('fred', 'UNRATE', [(datetime.now().strftime('%Y-%m-%d'), 4.1)])
+    store_meta('UNRATE')
+    assert poly_cli.fred_series_due('UNRATE', 'key') == (False, None)
+    assert fred['requests'] == []
+
+
+def test_released_series_is_checked_once_per_recheck_interval(fred):
+    poly_cli.store_observations('fred', 'UNRATE', [('2000-01-01', 4.0)])
+    store_meta('UNRATE', last_updated=datetime(1999, 12, 15), last_checked=datetime.now() - timedelta(hours=1))
+    assert poly_cli.fred_series_due('UNRATE', 'key') == (False, None)
+
+    store_meta('UNRATE', last_updated=datetime(1999, 12, 15),
+               last_checked=datetime.now() - poly_cli.FRED_DEFAULT_RECHECK_INTERVAL - timedelta(minutes=1))
+    due, meta = poly_cli.fred_series_due('UNRATE', 'key')
+    assert due is True
+    assert meta == {'frequency': 'M', 'last_updated': poly_cli.parse_fred_timestamp(fred['last_updated'])}
+    assert fred['requests'] == ['series']
+
+
+def test_unchanged_last_updated_skips_the_observations(fred):
+    poly_cli.store_observations('fred', 'UNRATE', [('2000-01-01', 4.0)])
+    store_meta('UNRATE', last_updated=poly_cli.parse_fred_timestamp(fred['last_updated']))
+
+    due, _ = poly_cli.fred_series_due('UNRATE', 'key')
+    assert due is False
+    assert fred['requests'] == ['series']
+    # The check is recorded, so the metadata is not asked for again within the recheck interval
+    assert poly_cli.fred_series_due('UNRATE', 'key') == (False, None)
+    assert fred['requests'] == ['series']
+
+
+def test_recent_last_updated_defers_the_next_check(fred):
+    poly_cli.store_observations('fred', 'UNRATE', [('2000-01-01', 4.0)])
+    store_meta('UNRATE', last_updated=datetime.now() - timedelta(days=3))
+    assert poly_cli.fred_series_due('UNRATE', 'key') == (False, None)
+
+
+def test_each_refresh_costs_one_metadata_request(fred):
+    name = 'Civilian Unemployment Rate (%)'
+
+    # First load: observations only; the metadata is left for the next check
+    result = poly_cli.fetch_fred_indicator(name, 'UNRATE', 'key')
+    assert result['refreshed'] is True and result['latest_value'] == 4.1
+    assert fred['requests'] == ['observations']
+
+    # Due again: one metadata request, then the observations since the newest stored date
+    store_meta('UNRATE', last_updated=datetime(1999, 12, 15))
+    fred['observations'] = [{'date': '2000-02-01', 'value': '4.1'}, {'date': '2000-03-01', 'value': '4.3'}]
+    result = poly_cli.fetch_fred_indicator(name, 'UNRATE', 'key')
+    assert result['refreshed'] is True and result['latest_value'] == 4.3
+    assert fred['requests'] == ['observations', 'series', 'observations']
+    meta = poly_cli.get_stored_fred_series_meta('UNRATE')
+    assert meta['last_updated'] == poly_cli.parse_fred_timestamp(fred['last_updated'])
+    assert datetime.now() - meta['last_checked'] < timedelta(minutes=1)
+
+    # Checked just now: no requests; force refreshes the observations alone
+    assert poly_cli.fetch_fred_indicator(name, 'UNRATE', 'key')['refreshed'] is False
+    assert poly_cli.fetch_fred_indicator(name, 'UNRATE', 'key', force=True)['refreshed'] is True
+    assert fred['requests'] == ['observations', 'series', 'observations', 'observations']
@@ -0,0 +1,70 @@
+import csv
+import io
+
+import poly_cli
+
+
+def test_read_address_file_keeps_csv_columns(tmp_path):
+    path = tmp_path / 'addresses.csv'
+    path.write_text('street,city,state,zip\n'
+                    '"2 B St, Apt 3",Town,IL,\n'
+                    '1 Main St,Springfield,IL,62701\n'
+                    '\n'
+                    '"350 Fifth Ave, New York, NY 10118"\n', encoding='utf-8')
+
+    assert poly_cli.read_address_file(str(path)) == [
+        ('2 B St, Apt 3, Town, IL', ('2 B St, Apt 3', 'Town', 'IL', '')),
+        ('1 Main St, Springfield, IL, 62701', ('1 Main St', 'Springfield', 'IL', '62701')),
+        ('350 Fifth Ave, New York, NY 10118', ('350 Fifth Ave', 'New York', 'NY', '10118')),
+    ]
+
+
+def test_read_address_file_splits_text_lines(tmp_path):
+    path = tmp_path / 'addresses.txt'
+    path.write_text('1 Main St, Springfield, IL 62701\n\n4 Elm Rd\n', encoding='utf-8')
+
+    assert poly_cli.read_address_file(str(path)) == [
+        ('1 Main St, Springfield, IL 62701', ('1 Main St', 'Springfield', 'IL', '62701')),
+        ('4 Elm Rd', ('4 Elm Rd', '', '', '')),
+    ]
+
+
+def test_geocode_batch_chunk_sends_fields_in_place(tmp_path, monkeypatch):
+    path = tmp_path / 'addresses.csv'
+    path.write_text('"2 B St, Apt 3",Town,IL,\n9 Nowhere Ln,Town,IL,60000\n', encoding='utf-8')
+    sent = []
+
+    class Response:
+        text = '0,"2 B St, Apt 3, Town, IL, ",Match,Exact,"2 B ST, TOWN, IL, 60001","-88.1,41.5",1,L\n' \
+               '1,"9 Nowhere Ln, Town, IL, 60000",No_Match\n'
+
+        def raise_for_status(self):
+            pass
+
+    def fake_post(url, files=None, **kwargs):
+        sent.extend(csv.reader(io.StringIO(files['addressFile'][1])))
+        return Response()
+
+    monkeypatch.setattr(poly_cli, 'http_post', fake_post)
+    results = poly_cli.geocode_batch_chunk(poly_cli.read_address_file(str(path)))
+
+    assert sent == [['0', '2 B St, Apt 3', 'Town', 'IL', ''], ['1', '9 Nowhere Ln', 'Town', 'IL', '60000']]
+    assert results == [
+        ('2 B St, Apt 3, Town, IL', {'matched_address': '2 B ST, TOWN, IL, 60001', 'lat': 41.5, 'lon': -88.1}),
+        ('9 Nowhere Ln, Town, IL, 60000', None),
+    ]
+
+
+def test_lookup_geocode_index_fuzzy_thresholds():
+    poly_cli.save_search('1600 Pennsylvania Avenue NW, Washington, DC 20500',
+                         {'matched_address': '1600 PENNSYLVANIA AVE NW, WASHINGTON, DC, 20500',
+                          'lat': 38.8977, 'lon': -77.0365})
+
+    exact = poly_cli.lookup_geocode_index('1600 pennsylvania ave. nw washington dc 20500')
+    assert exact['matched_address'] == '1600 PENNSYLVANIA AVE NW, WASHINGTON, DC, 20500'
+    assert poly_cli.lookup_geocode_index('1600 Pensylvania Ave NW, Washington, DC 20500') is not None
+    # Different numbers never match, however similar the rest of the address is
+    assert poly_cli.lookup_geocode_index('1601 Pennsylvania Ave NW, Washington, DC 20500') is None
+    assert poly_cli.lookup_geocode_index('1600 Pennsylvania Ave NW, Washington, DC 20501') is None
+    # Same numbers but below GEOCODE_FUZZY_THRESHOLD
+    assert poly_cli.lookup_geocode_index('1600 Constitution Ave NW, Washington, DC 20500') is None
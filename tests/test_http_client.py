@@ -0,0 +1,124 @@
+from datetime import datetime, timedelta, timezone
+import email.utils
+import io
+
+import pytest
+import requests
+
+import poly_cli
+
+URL = 'https://api.stlouisfed.org/fred/series?series_id=UNRATE'
+
+
+def make_response(status, headers=None):
+    response = requests.models.Response()
+    response.status_code = status
+    response.headers.update(headers or {})
+    response._content = b'{}'
+    response.raw = io.BytesIO()
+    return response
+
+
+class FakeSession:
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = []
+
+    def request(self, method, url, **kwargs):
+        self.calls.append(kwargs)
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+class FakeClock:
+    """Stands in for time.monotonic and time.sleep; sleeping advances the clock"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(poly_cli.time, 'monotonic', fake.monotonic)
+    monkeypatch.setattr(poly_cli.time, 'sleep', fake.sleep)
+    monkeypatch.setattr(poly_cli, '_http_recent_requests', {})
+    return fake
+
+
+def send(monkeypatch, outcomes, **kwargs):
+    session = FakeSession(outcomes)
+    monkeypatch.setattr(poly_cli, 'get_http_session', lambda host: session)
+    return session, poly_cli._send_with_retries('GET', URL, **kwargs)
+
+
+def test_server_errors_and_resets_are_retried_with_jittered_backoff(monkeypatch, clock):
+    session, response = send(monkeypatch, [
+        make_response(502), requests.exceptions.ConnectionError('reset'), make_response(503), make_response(200)])
+
+    assert response.status_code == 200
+    assert len(session.calls) == 4
+    assert session.calls[0]['timeout'] == poly_cli.HTTP_TIMEOUTS['api.stlouisfed.org']
+    assert len(clock.sleeps) == 3
+    for attempt, delay in enumerate(clock.sleeps):
+        assert 0 <= delay <= min(poly_cli.HTTP_BACKOFF_MAX, poly_cli.HTTP_BACKOFF_BASE * 2 ** attempt)
+
+
+def test_retries_are_bounded(monkeypatch, clock):
+    session, response = send(monkeypatch, [make_response(500)] * 4)
+    assert response.status_code == 500 and len(session.calls) == poly_cli.HTTP_MAX_RETRIES + 1
+
+    with pytest.raises(requests.exceptions.ConnectionError):
+        send(monkeypatch, [requests.exceptions.ConnectionError('reset')] * 4)
+    session, response = send(monkeypatch, [make_response(503), make_response(200)], retries=0)
+    assert response.status_code == 503 and len(session.calls) == 1
+
+
+@pytest.mark.parametrize('status', [400, 401, 404, 422])
+def test_client_errors_are_not_retried(monkeypatch, clock, status):
+    session, response = send(monkeypatch, [make_response(status), make_response(200)])
+    assert response.status_code == status
+    assert len(session.calls) == 1 and clock.sleeps == []
+
+
+def test_rate_limited_responses_honor_retry_after(monkeypatch, clock):
+    retry_date = email.utils.format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+    session, response = send(monkeypatch, [
+        make_response(429, {'Retry-After': '7'}),
+        make_response(503, {'Retry-After': retry_date}),
+        make_response(429),
+        make_response(200)])
+
+    assert response.status_code == 200 and len(session.calls) == 4
+    assert clock.sleeps[0] == 7
+    assert 28 <= clock.sleeps[1] <= 30
+    assert clock.sleeps[2] <= poly_cli.HTTP_BACKOFF_BASE * 4  # No header: ordinary backoff
+
+
+def test_long_retry_after_is_returned_instead_of_waited(monkeypatch, clock):
+    session, response = send(monkeypatch, [make_response(429, {'Retry-After': '3600'}), make_response(200)])
+    assert response.status_code == 429
+    assert len(session.calls) == 1 and clock.sleeps == []
+
+
+def test_requests_wait_for_the_host_rate_limit(monkeypatch, clock):
+    monkeypatch.setitem(poly_cli.HTTP_RATE_LIMITS, 'api.stlouisfed.org', (3, 60))
+    for _ in range(3):
+        poly_cli._wait_for_rate_limit('api.stlouisfed.org')
+    assert clock.sleeps == []
+
+    clock.now += 10
+    poly_cli._wait_for_rate_limit('api.stlouisfed.org')
+    assert clock.sleeps == [50]  # Until the oldest request leaves the 60 second window
+    poly_cli._wait_for_rate_limit('api.weather.gov')  # Hosts without a limit never wait
+    assert clock.sleeps == [50]
@@ -0,0 +1,44 @@
+import pytest
+
+import poly_cli
+
+SCOREBOARD = {
+    'events': [
+        {'name': 'A at B', 'status': {'type': {'state': 'post'}}, 'odds': [{'spread': -3.5}]},
+        {'name': 'C at D', 'status': {'type': {'state': 'in'}}},
+    ],
+    'season': {'year': 2026, 'type': 2},
+}
+
+
+def select(path):
+    return list(poly_cli.select_json_path(SCOREBOARD, poly_cli.parse_json_path(path)))
+
+
+def test_parse_json_path_steps():
+    assert poly_cli.parse_json_path('events[*].status.type') == ['events', '*', 'status', 'type']
+    assert poly_cli.parse_json_path('events[-1].name') == ['events', -1, 'name']
+    assert poly_cli.parse_json_path('season') == ['season']
+    assert poly_cli.parse_json_path('') == []
+
+
+@pytest.mark.parametrize('path', ['events[', 'events[x]', 'events..name'])
+def test_parse_json_path_rejects_malformed_paths(path):
+    with pytest.raises(ValueError):
+        poly_cli.parse_json_path(path)
+
+
+def test_select_keys_indexes_and_wildcards():
+    assert select('events[*].status.type.state') == [
+        ('$.events[0].status.type.state', 'post'), ('$.events[1].status.type.state', 'in')]
+    assert select('events[-1].name') == [('$.events[-1].name', 'C at D')]
+    assert select('season.*') == [('$.season.year', 2026), ('$.season.type', 2)]
+    assert select('') == [('$', SCOREBOARD)]
+
+
+def test_select_skips_nodes_without_a_match():
+    assert select('events[*].odds[0].spread') == [('$.events[0].odds[0].spread', -3.5)]
+    assert select('events[5]') == []
+    assert select('season[0]') == []
+    assert select('season.year.*') == []
+    assert select('missing') == []
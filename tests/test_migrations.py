@@ -0,0 +1,90 @@
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+import poly_cli
+
+
+def create_legacy_history(path):
+    """A history.db as written before versioned migrations: the original tables, user_version 0"""
+    conn = sqlite3.connect(path)
+    conn.execute('''CREATE TABLE searches
+                    (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                     address TEXT,
+                     matched_address TEXT,
+                     lat REAL,
+                     lon REAL,
+                     timestamp DATETIME)''')
+    conn.execute('''CREATE TABLE news_sites
+                    (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                     url TEXT UNIQUE,
+                     timestamp DATETIME)''')
+    matched = '1600 PENNSYLVANIA AVE NW, WASHINGTON, DC, 20500'
+    conn.executemany('INSERT INTO searches (address, matched_address, lat, lon, timestamp) VALUES (?, ?, ?, ?, ?)', [
+        ('1600 Pennsylvania Ave NW, Washington DC', matched, 38.8977, -77.0365, '2026-01-02T10:00:00'),
+        ('1600 pennsylvania avenue washington dc', matched, 38.8977, -77.0365, '2026-03-04T10:00:00'),
+        ('350 Fifth Ave, New York NY', '350 5TH AVE, NEW YORK, NY, 10118', 40.7484, -73.9857, '2026-02-01T09:00:00'),
+    ])
+    conn.execute("INSERT INTO news_sites (url, timestamp) VALUES ('wsj.com', '2026-01-01T00:00:00')")
+    conn.commit()
+    conn.close()
+
+
+def user_version():
+    with poly_cli.history_db() as conn:
+        return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def table_names():
+    with poly_cli.history_db() as conn:
+        return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+
+def test_new_database_gets_every_migration():
+    assert user_version() == len(poly_cli.HISTORY_MIGRATIONS) == 5
+    assert {'searches', 'observations', 'saved_locations', 'sf_contacts', 'news_seen', 'quake_events'} <= table_names()
+
+
+def test_legacy_database_is_migrated_in_place():
+    create_legacy_history(poly_cli.HISTORY_DB_PATH)
+
+    assert user_version() == 5
+    assert {'saved_locations', 'geocode_index', 'sf_contacts', 'news_seen_bands', 'quake_sync_state'} <= table_names()
+    saved = {row[1]: row for row in poly_cli.get_saved_addresses()}
+    white_house = saved['1600 PENNSYLVANIA AVE NW, WASHINGTON, DC, 20500']
+    assert white_house[0] == '1600 pennsylvania avenue washington dc'  # Address of the latest search
+    assert white_house[4] == datetime(2026, 3, 4, 10, 0)
+    with poly_cli.history_db() as conn:
+        assert conn.execute('SELECT use_count FROM saved_locations WHERE matched_address = ?',
+                            (white_house[1],)).fetchone()[0] == 2
+    # Existing data is kept and the geocode index is built from it
+    assert poly_cli.get_saved_news_sites() == ['wsj.com']
+    assert poly_cli.lookup_geocode_index('350 Fifth Ave, New York NY')['lat'] == 40.7484
+
+
+def test_partially_migrated_database_resumes_at_its_version():
+    conn = sqlite3.connect(poly_cli.HISTORY_DB_PATH)
+    poly_cli._migrate_base_schema(conn.cursor())
+    conn.execute('PRAGMA user_version = 1')
+    conn.commit()
+    conn.close()
+
+    assert user_version() == 5
+    poly_cli.close_history_db()
+    assert user_version() == 5  # Reopening an up-to-date database applies nothing
+
+
+def test_failed_migration_is_rolled_back(monkeypatch):
+    def broken(c):
+        c.execute('CREATE TABLE half_done (id INTEGER)')
+        raise sqlite3.OperationalError('disk I/O error')
+
+    monkeypatch.setattr(poly_cli, 'HISTORY_MIGRATIONS', poly_cli.HISTORY_MIGRATIONS + [broken])
+    with pytest.raises(sqlite3.OperationalError):
+        user_version()
+
+    conn = sqlite3.connect(poly_cli.HISTORY_DB_PATH)
+    assert conn.execute('PRAGMA user_version').fetchone()[0] == 5
+    assert conn.execute("SELECT COUNT(*) FROM sqlite_master WHERE name = 'half_done'").fetchone()[0] == 0
+    conn.close()
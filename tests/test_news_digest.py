@@ -0,0 +1,130 @@
+from datetime import datetime, timedelta, timezone
+
+import poly_cli
+
+FED_DESCRIPTION = ('Federal Reserve officials held interest rates steady on Wednesday and signaled '
+                   'two cuts later this year as inflation cools toward their target')
+
+
+def article(title, description, hour, publisher='Reuters', url=None):
+    return {
+        'title': f"{title} - {publisher}",
+        'description': description,
+        'publisher': publisher,
+        'published': datetime(2026, 10, 16, hour, tzinfo=timezone.utc),
+        'url': url or f"https://example.com/{hour}",
+        'source': 'example.com',
+    }
+
+
+def digest_articles():
+    return [
+        article('Fed holds rates steady, signals two cuts', FED_DESCRIPTION, 9),
+        article('Fed keeps rates steady and signals two cuts', FED_DESCRIPTION + ' in 2026', 11, publisher='AP'),
+        article('Storm makes landfall on Gulf Coast',
+                'A hurricane came ashore near Mobile with sustained winds of 110 miles per hour', 10),
+    ]
+
+
+def test_article_tokens_drop_stop_words_and_publisher():
+    tokens = poly_cli.article_tokens(article('The Fed and the markets', 'Reuters reports a rally', 9))
+    assert tokens == {'fed', 'markets', 'reports', 'rally'}
+
+
+def test_near_duplicates_share_a_band_key():
+    first, second, other = (poly_cli.article_tokens(item) for item in digest_articles())
+    assert poly_cli.jaccard(first, second) >= poly_cli.NEWS_DUPLICATE_SIMILARITY
+    assert set(poly_cli.minhash_band_keys(first)) & set(poly_cli.minhash_band_keys(second))
+    assert len(poly_cli.minhash_band_keys(other)) == poly_cli.NEWS_MINHASH_BANDS
+    assert poly_cli.minhash_band_keys(first) == poly_cli.minhash_band_keys(set(first))  # Order-independent
+
+
+def test_cluster_articles_groups_stories_newest_first():
+    stories = poly_cli.cluster_articles(digest_articles())
+    assert [[item['published'].hour for item in story] for story in stories] == [[11, 9], [10]]
+
+
+def test_cluster_articles_matches_pairwise_comparison():
+    articles = digest_articles() + [
+        article(f"Team {i} wins championship game", f"Team {i} beat its rival in overtime on Sunday night", i)
+        for i in range(12, 20)]
+    stories = poly_cli.cluster_articles(articles)
+    clustered = {frozenset(item['url'] for item in story) for story in stories}
+
+    # Brute force: connected components of the pairs at or above the similarity threshold
+    groups = {item['url']: {item['url']} for item in articles}
+    for i, a in enumerate(articles):
+        for b in articles[i + 1:]:
+            if poly_cli.jaccard(a['tokens'], b['tokens']) >= poly_cli.NEWS_DUPLICATE_SIMILARITY:
+                merged = groups[a['url']] | groups[b['url']]
+                for url in merged:
+                    groups[url] = merged
+    assert clustered == {frozenset(group) for group in groups.values()}
+
+
+def test_shown_stories_are_suppressed_in_later_digests():
+    stories = poly_cli.cluster_articles(digest_articles()[1:])
+    new, seen = poly_cli.split_seen_stories(stories)
+    assert len(new) == 2 and seen == []
+    poly_cli.record_shown_stories(new[:1])  # Only the Fed story was shown
+
+    # A rewrite of the shown story from another outlet is suppressed; the other story is still new
+    later = poly_cli.cluster_articles(digest_articles()[:1] + digest_articles()[2:])
+    new, seen = poly_cli.split_seen_stories(later)
+    assert [story[0]['title'] for story in seen] == ['Fed holds rates steady, signals two cuts - Reuters']
+    assert [story[0]['title'] for story in new] == ['Storm makes landfall on Gulf Coast - Reuters']
+
+
+def test_news_digest_records_what_it_shows(monkeypatch):
+    monkeypatch.setattr(poly_cli, 'news_digest_sites', lambda: ['example.com'])
+    monkeypatch.setattr(poly_cli, 'fetch_news_digest', lambda sites: (digest_articles(), {}))
+
+    stories, suppressed, errors = poly_cli.news_digest_stories()
+    assert (len(stories), suppressed, errors) == (2, 0, {})
+    stories, suppressed, _ = poly_cli.news_digest_stories()
+    assert (stories, suppressed) == ([], 2)
+    stories, suppressed, _ = poly_cli.news_digest_stories(include_seen=True)
+    assert (len(stories), suppressed) == (2, 0)
+
+
+def test_prune_seen_news_forgets_old_articles():
+    stories = poly_cli.cluster_articles(digest_articles())
+    poly_cli.record_shown_stories(stories)
+    with poly_cli.history_db() as conn:
+        conn.execute('UPDATE news_seen SET first_seen = ?', (datetime.now() - timedelta(days=15),))
+
+    assert poly_cli.prune_seen_news() == 3
+    with poly_cli.history_db() as conn:
+        assert conn.execute('SELECT COUNT(*) FROM news_seen_bands').fetchone()[0] == 0
+    assert poly_cli.split_seen_stories(poly_cli.cluster_articles(digest_articles()))[1] == []
+
+
+def test_site_articles_are_cached_in_cache_db(monkeypatch):
+    fetches = []
+
+    def fake_fetch_news(domain, max_results=5):
+        fetches.append(domain)
+        return [article('Fed holds rates steady', FED_DESCRIPTION, 9)]
+
+    monkeypatch.setattr(poly_cli, 'fetch_news', fake_fetch_news)
+    first = poly_cli.fetch_news_cached('reuters.com')
+    monkeypatch.setattr(poly_cli, '_cache_conn', None)  # A later run reopens cache.db
+    second = poly_cli.fetch_news_cached('reuters.com')
+
+    assert fetches == ['reuters.com']
+    assert second == first
+    assert second[0]['published'] == datetime(2026, 10, 16, 9, tzinfo=timezone.utc)
+
+    with poly_cli._cache_lock:
+        conn = poly_cli._get_cache_conn()
+        conn.execute('UPDATE responses SET expires = 0')
+        conn.commit()
+    poly_cli.fetch_news_cached('reuters.com')
+    poly_cli.fetch_news_cached('reuters.com', max_results=10)
+    assert fetches == ['reuters.com'] * 3
+
+
+def test_gnews_publisher():
+    assert poly_cli._gnews_publisher({'publisher': {'title': 'Reuters', 'href': 'https://www.reuters.com'}}) == 'Reuters'
+    assert poly_cli._gnews_publisher({'publisher': 'Reuters'}) is None
+    assert poly_cli._gnews_publisher({}) is None
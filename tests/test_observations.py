@@ -0,0 +1,65 @@
+from datetime import datetime
+
+import poly_cli
+
+
+def test_store_observations_upserts_and_orders_newest_first():
+    poly_cli.store_observations('fred', 'UNRATE', [('2024-01-01', 3.7), ('2024-02-01', 3.9)])
+    poly_cli.store_observations('fred', 'UNRATE', [('2024-02-01', 3.8), ('2024-03-01', None)])
+    poly_cli.store_observations('bls', 'UNRATE', [('2025-01-01', 1.0)])
+
+    assert poly_cli.get_stored_observations('fred', 'UNRATE') == [
+        ('2024-03-01', None), ('2024-02-01', 3.8), ('2024-01-01', 3.7)]
+    assert poly_cli.get_stored_observations('fred', 'UNRATE', limit=1) == [('2024-03-01', None)]
+    assert poly_cli.get_last_stored_date('fred', 'UNRATE') == '2024-03-01'
+    assert poly_cli.get_last_stored_date('fred', 'CPIAUCSL') is None
+
+
+def test_parse_observation_value_treats_placeholders_as_missing():
+    assert poly_cli.parse_observation_value('4.25') == 4.25
+    assert poly_cli.parse_observation_value('.') is None
+    assert poly_cli.parse_observation_value('-') is None
+
+
+def test_refresh_fred_series_starts_at_newest_stored_date(monkeypatch):
+    requests_made = []
+    responses = [
+        {'observations': [{'date': '2024-01-01', 'value': '3.7'}, {'date': '2024-02-01', 'value': '.'}]},
+        {'observations': [{'date': '2024-02-01', 'value': '3.9'}, {'date': '2024-03-01', 'value': '3.8'}]},
+    ]
+
+    def fake_get_fred_data(series_id, api_key, observation_start=None):
+        requests_made.append(observation_start)
+        return responses[len(requests_made) - 1]
+
+    monkeypatch.setattr(poly_cli, 'get_fred_data', fake_get_fred_data)
+    poly_cli.refresh_fred_series('UNRATE', 'key')
+    poly_cli.refresh_fred_series('UNRATE', 'key')
+
+    assert requests_made == [None, '2024-02-01']
+    # The boundary observation is fetched again and its revised value replaces the stored one
+    assert poly_cli.get_stored_observations('fred', 'UNRATE') == [
+        ('2024-03-01', 3.8), ('2024-02-01', 3.9), ('2024-01-01', 3.7)]
+
+
+def test_refresh_bls_series_requests_only_missing_years(monkeypatch):
+    current_year = datetime.now().year
+    poly_cli.store_observations('bls', 'LNS14000000', [(f'{current_year - 1}-11-01', 4.1)])
+    calls = []
+
+    def fake_get_bls_data(series_ids, start_year=None, end_year=None):
+        calls.append((sorted(series_ids), start_year, end_year))
+        return {series_id: [{'year': str(current_year - 1), 'period': 'M12', 'value': '4.2'},
+                            {'year': str(current_year - 1), 'period': 'M13', 'value': '4.0'}]
+                for series_id in series_ids}
+
+    monkeypatch.setattr(poly_cli, 'get_bls_data', fake_get_bls_data)
+    poly_cli.refresh_bls_series(['LNS14000000', 'CUUR0000SA0', 'CES0000000001'])
+
+    assert sorted(calls) == sorted([
+        (['LNS14000000'], current_year - 1, current_year),
+        (['CES0000000001', 'CUUR0000SA0'], current_year - poly_cli.BLS_HISTORY_YEARS + 1, current_year),
+    ])
+    # Annual averages (M13) are not stored
+    assert poly_cli.get_stored_observations('bls', 'LNS14000000') == [
+        (f'{current_year - 1}-12-01', 4.2), (f'{current_year - 1}-11-01', 4.1)]
@@ -0,0 +1,130 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import poly_cli
+
+NOW = datetime.now(timezone.utc)
+
+
+def feature(event_id, hours_ago, magnitude, updated_minutes_ago, place='10 km SW of Somewhere, Alaska', status='reviewed'):
+    return {
+        'id': event_id,
+        'properties': {
+            'time': poly_cli._epoch_ms(NOW - timedelta(hours=hours_ago)),
+            'updated': poly_cli._epoch_ms(NOW - timedelta(minutes=updated_minutes_ago)),
+            'mag': magnitude,
+            'place': place,
+            'status': status,
+            'url': f"https://earthquake.usgs.gov/earthquakes/eventpage/{event_id}",
+        },
+        'geometry': {'coordinates': [-150.0, 61.0, 35.2]},
+    }
+
+
+@pytest.fixture
+def usgs(monkeypatch):
+    """Answer USGS queries from a list of feature lists and record the query parameters"""
+    calls = []
+    pages = []
+
+    def fake_query(**params):
+        calls.append(params)
+        return poly_cli.USGS_EVENT_QUERY_URL, {'features': pages.pop(0)}
+
+    monkeypatch.setattr(poly_cli, 'query_usgs_events', fake_query)
+    return calls, pages
+
+
+def stored_ids(**kwargs):
+    return [event['id'] for event in poly_cli.stored_quakes(**kwargs)]
+
+
+def test_first_refresh_loads_the_full_range(usgs):
+    calls, pages = usgs
+    pages.append([feature('ak1', 30, 5.4, 60), feature('us2', 3, 6.1, 30, place='Fiji region')])
+
+    assert poly_cli.refresh_quake_store(5.0, 2) == ['ak1', 'us2']
+    assert 'updatedafter' not in calls[0]
+    assert calls[0]['minmagnitude'] == '5'
+    assert stored_ids() == ['us2', 'ak1']
+    event = poly_cli.stored_quakes(place='Fiji')[0]
+    assert (event['magnitude'], event['lat'], event['lon'], event['depth_km']) == (6.1, 61.0, -150.0, 35.2)
+
+
+def test_later_refresh_merges_updates_and_deletions(usgs):
+    calls, pages = usgs
+    pages.append([feature('ak1', 30, 5.4, 60), feature('us2', 3, 6.1, 30), feature('us3', 2, 5.0, 20)])
+    poly_cli.refresh_quake_store(5.0, 2)
+    last_updated = poly_cli._epoch_ms(NOW - timedelta(minutes=20))
+
+    pages.append([
+        feature('us2', 3, 6.1, 30),  # Same revision again (overlap window): not reported as changed
+        feature('ak1', 30, 5.6, 5),  # Revised magnitude
+        {'id': 'us3', 'properties': {'status': 'deleted', 'updated': poly_cli._epoch_ms(NOW - timedelta(minutes=2)),
+                                     'time': 0, 'mag': None, 'place': None}, 'geometry': None},
+        feature('us4', 1, 5.2, 1),
+    ])
+    assert poly_cli.refresh_quake_store(5.0, 2) == ['ak1', 'us4']
+
+    updated_after = datetime.fromtimestamp(last_updated / 1000, timezone.utc) - poly_cli.QUAKE_UPDATE_OVERLAP
+    assert calls[1]['updatedafter'] == poly_cli._usgs_time(updated_after)
+    assert calls[1]['includedeleted'] == 'true'
+    assert stored_ids() == ['us4', 'us2', 'ak1']
+    assert poly_cli.stored_quakes(ids=['ak1'])[0]['magnitude'] == 5.6
+
+    # The next refresh asks for updates after the newest revision seen, the deletion
+    pages.append([])
+    poly_cli.refresh_quake_store(5.0, 1)
+    expected = datetime.fromtimestamp(poly_cli._epoch_ms(NOW - timedelta(minutes=1)) / 1000, timezone.utc)
+    assert calls[2]['updatedafter'] == poly_cli._usgs_time(expected - poly_cli.QUAKE_UPDATE_OVERLAP)
+
+
+def test_full_reload_covers_only_the_requested_window(usgs):
+    calls, pages = usgs
+    pages.append([feature('ak1', 40, 5.4, 60), feature('us2', 3, 6.1, 30)])
+    poly_cli.refresh_quake_store(5.0, 2)
+
+    # A lower magnitude over a shorter window reloads just that window
+    pages.append([feature('ak5', 10, 4.6, 50), feature('us2', 3, 6.1, 30)])
+    assert poly_cli.refresh_quake_store(4.5, 1) == ['ak5', 'us2']
+    assert 'updatedafter' not in calls[1]
+    assert calls[1]['minmagnitude'] == '4.5'
+    assert calls[1]['starttime'] > calls[0]['starttime']
+    magnitude, covered_from, _ = poly_cli.quake_store_status()
+    assert magnitude == 4.5
+    assert abs(covered_from - (datetime.now(timezone.utc) - timedelta(days=1))) < timedelta(minutes=1)
+    assert stored_ids(min_magnitude=4.5, days=7) == ['us2', 'ak5']
+
+    # A longer window starts from its own start time, not the first load's
+    pages.append([feature('old', 100, 5.1, 90)])
+    poly_cli.refresh_quake_store(4.5, 5)
+    assert 'updatedafter' not in calls[2]
+    assert calls[2]['starttime'] == poly_cli._usgs_time(poly_cli.quake_store_status()[1])
+    assert stored_ids(min_magnitude=4.5, days=7) == ['old']
+
+
+def test_incremental_refresh_drops_events_before_the_window(usgs):
+    calls, pages = usgs
+    pages.append([feature('ak1', 40, 5.4, 60), feature('us2', 3, 6.1, 30)])
+    poly_cli.refresh_quake_store(5.0, 2)
+
+    pages.append([])
+    assert poly_cli.refresh_quake_store(5.0, 1) == []
+    assert 'updatedafter' in calls[1]
+    assert stored_ids(days=7) == ['us2']
+
+
+def test_stored_quakes_filters():
+    with poly_cli.history_db() as conn:
+        poly_cli._store_quake_features(conn, [
+            feature('a', 1, 5.5, 10, place='Near Coast of Peru'),
+            feature('b', 2, 4.8, 10, place='Southern Alaska'),
+            feature('c', 80, 6.0, 10, place='Tonga'),
+        ])
+
+    assert stored_ids() == ['a']
+    assert stored_ids(min_magnitude=4.5) == ['a', 'b']
+    assert stored_ids(min_magnitude=4.5, days=4) == ['a', 'b', 'c']
+    assert stored_ids(min_magnitude=4.5, place='alaska') == ['b']
+    assert stored_ids(min_magnitude=4.5, days=4, ids=['c']) == ['c']
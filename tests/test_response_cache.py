@@ -0,0 +1,155 @@
+import zlib
+from datetime import datetime, timezone
+
+import pytest
+import requests
+
+import poly_cli
+
+URL = 'https://api.weather.gov/gridpoints/LWX/96,70/forecast'
+
+
+def make_response(status=200, body=b'', headers=None):
+    response = requests.models.Response()
+    response.status_code = status
+    response.headers.update(headers or {})
+    response._content = body
+    response.url = URL
+    return response
+
+
+class FakeSession:
+    """Answer requests from a queue of responses and record the headers sent"""
+
+    def __init__(self):
+        self.responses = []
+        self.sent = []
+
+    def request(self, method, url, **kwargs):
+        self.sent.append(dict(kwargs.get('headers') or {}))
+        return self.responses.pop(0)
+
+
+@pytest.fixture
+def session(monkeypatch):
+    fake = FakeSession()
+    monkeypatch.setattr(poly_cli, 'get_http_session', lambda host: fake)
+    return fake
+
+
+def expire_all():
+    with poly_cli._cache_lock:
+        conn = poly_cli._get_cache_conn()
+        conn.execute('UPDATE responses SET expires = 0')
+        conn.commit()
+
+
+def test_fresh_entries_are_served_without_a_request(session):
+    session.responses.append(make_response(body=b'{"periods": []}', headers={'Content-Type': 'application/geo+json'}))
+    first = poly_cli.http_get(URL, cache='nws_forecast')
+    second = poly_cli.http_get(URL, cache='nws_forecast')
+
+    assert len(session.sent) == 1
+    assert second.json() == first.json() == {'periods': []}
+    assert second.headers['Content-Type'] == 'application/geo+json'
+    # Cached responses behave like network ones
+    assert b''.join(second.iter_content(4)) == b'{"periods": []}'
+    with second:
+        pass
+    second.close()
+
+
+def test_stale_entries_are_revalidated(session):
+    body = b'{"forecast": "sunny"}'
+    session.responses.append(make_response(body=body, headers={'ETag': '"abc"', 'Last-Modified': 'Fri, 16 Oct 2026 10:00:00 GMT'}))
+    poly_cli.http_get(URL, cache='nws_forecast')
+    expire_all()
+
+    session.responses.append(make_response(status=304))
+    revalidated = poly_cli.http_get(URL, cache='nws_forecast')
+    assert session.sent[1] == {'If-None-Match': '"abc"', 'If-Modified-Since': 'Fri, 16 Oct 2026 10:00:00 GMT'}
+    assert revalidated.status_code == 200 and revalidated.content == body
+
+    # The 304 renewed the entry's freshness
+    poly_cli.http_get(URL, cache='nws_forecast')
+    assert len(session.sent) == 2
+
+
+def test_changed_and_error_responses(session):
+    session.responses.append(make_response(body=b'old', headers={'ETag': '"v1"'}))
+    poly_cli.http_get(URL, cache='nws_forecast')
+    expire_all()
+
+    session.responses.append(make_response(body=b'new', headers={'ETag': '"v2"'}))
+    assert poly_cli.http_get(URL, cache='nws_forecast').content == b'new'
+    expire_all()
+
+    session.responses.append(make_response(status=503, body=b'busy'))
+    assert poly_cli.http_get(URL, cache='nws_forecast', retries=0).status_code == 503
+    session.responses.append(make_response(status=304))
+    assert poly_cli.http_get(URL, cache='nws_forecast').content == b'new'  # The 503 replaced nothing
+    assert session.sent[-1] == {'If-None-Match': '"v2"'}
+
+
+def test_bodies_are_stored_compressed(session):
+    body = b'{"value": 1}' * 1000
+    session.responses.append(make_response(body=body))
+    poly_cli.http_get(URL, cache='noaa_tides')
+
+    with poly_cli._cache_lock:
+        stored, size = poly_cli._get_cache_conn().execute('SELECT body, size FROM responses').fetchone()
+    assert size == len(stored) < len(body) // 10
+    assert zlib.decompress(stored) == body
+    assert poly_cli.http_get(URL, cache='noaa_tides').content == body
+
+
+def test_least_recently_used_entries_are_evicted(session, monkeypatch):
+    monkeypatch.setattr(poly_cli, 'CACHE_MAX_BYTES', 3 * len(zlib.compress(bytes(range(60)))))  # Room for three
+    for name in ('a', 'b', 'c'):
+        session.responses.append(make_response(body=bytes(range(60))))
+        poly_cli.http_get(f"{URL}?{name}", cache='nws_forecast')
+    with poly_cli._cache_lock:
+        conn = poly_cli._get_cache_conn()
+        for last_access, name in enumerate(('b', 'a', 'c')):  # 'b' is the least recently used
+            key = poly_cli._cache_key('GET', f"{URL}?{name}", {})
+            conn.execute('UPDATE responses SET last_access = ? WHERE key = ?', (last_access, key))
+        conn.commit()
+
+    session.responses.append(make_response(body=bytes(range(60))))
+    poly_cli.http_get(f"{URL}?d", cache='nws_forecast')
+    poly_cli.http_get(f"{URL}?a", cache='nws_forecast')
+    assert len(session.sent) == 4  # 'a' survived
+    session.responses.append(make_response(body=b'b'))
+    poly_cli.http_get(f"{URL}?b", cache='nws_forecast')
+    assert len(session.sent) == 5  # 'b' was evicted
+
+
+def test_cache_key_ignores_headers_but_not_parameters():
+    key = poly_cli._cache_key('POST', URL, {'json': {'a': 1, 'b': 2}, 'headers': {'Authorization': 'x'}})
+    assert key == poly_cli._cache_key('POST', URL, {'json': {'b': 2, 'a': 1}})
+    assert key != poly_cli._cache_key('POST', URL, {'json': {'a': 1, 'b': 3}})
+    assert key != poly_cli._cache_key('GET', URL, {'json': {'a': 1, 'b': 2}})
+
+
+def test_policies():
+    assert set(poly_cli.CACHE_POLICIES) == {'nws_forecast', 'noaa_tides', 'bls', 'gnews'}
+    fetched = datetime(2026, 10, 17, 15, 45)
+    assert poly_cli.CACHE_POLICIES['nws_forecast'](fetched) == datetime(2026, 10, 17, 15, 55)
+    assert poly_cli.CACHE_POLICIES['gnews'](fetched) == datetime(2026, 10, 17, 15, 55)
+    assert poly_cli.CACHE_POLICIES['noaa_tides'](fetched) == datetime(2026, 10, 18)
+
+
+@pytest.mark.parametrize('now_utc, release_utc', [
+    (datetime(2026, 10, 16, 12, 0), datetime(2026, 10, 16, 12, 30)),  # Friday 8:00 EDT: same morning
+    (datetime(2026, 10, 16, 14, 0), datetime(2026, 10, 19, 12, 30)),  # Friday 10:00 EDT: Monday
+    (datetime(2026, 10, 31, 14, 0), datetime(2026, 11, 2, 13, 30)),   # Across the end of DST: 8:30 EST
+    (datetime(2026, 3, 6, 14, 0), datetime(2026, 3, 9, 12, 30)),      # Across the start of DST: 8:30 EDT
+])
+def test_bls_entries_expire_at_the_next_release(monkeypatch, now_utc, release_utc):
+    class FrozenDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return now_utc.replace(tzinfo=timezone.utc).astimezone(tz) if tz else now_utc
+
+    monkeypatch.setattr(poly_cli, 'datetime', FrozenDatetime)
+    assert poly_cli.CACHE_POLICIES['bls'](now_utc) == release_utc
@@ -0,0 +1,88 @@
+import argparse
+
+import pytest
+from simple_salesforce import SalesforceExpiredSession
+
+import poly_cli
+
+
+class PagedSalesforce:
+    """Serve a contact query as pages of `page_size` records and count the query_more calls"""
+
+    def __init__(self, total, page_size, session_id='live', expire_after=None):
+        self.records = [{'attributes': {'type': 'Contact'}, 'LastName': f"Contact {i}"} for i in range(total)]
+        self.page_size = page_size
+        self.session_id = session_id
+        self.expire_after = expire_after
+        self.more_calls = 0
+
+    def page(self, start):
+        records = self.records[start:start + self.page_size]
+        done = start + self.page_size >= len(self.records)
+        page = {'totalSize': len(self.records), 'done': done, 'records': records}
+        if not done:
+            page['nextRecordsUrl'] = f"/services/data/v59.0/query/01g-{start + self.page_size}"
+        return page
+
+    def query(self, soql):
+        return self.page(0)
+
+    def query_more(self, url, identifier_is_url=False):
+        if self.expire_after is not None and self.more_calls >= self.expire_after:
+            raise SalesforceExpiredSession(url, 401, 'query', b'')
+        self.more_calls += 1
+        return self.page(int(url.rsplit('-', 1)[1]))
+
+
+@pytest.fixture
+def connect(monkeypatch):
+    def install(sf):
+        monkeypatch.setattr(poly_cli, 'get_salesforce_credentials', lambda use_saved_session=True: sf)
+        return sf
+    return install
+
+
+def test_limit_stops_paging_at_the_cutoff(connect):
+    sf = connect(PagedSalesforce(total=10, page_size=3))
+    result = poly_cli.job_salesforce_contacts('acme', limit=5)
+
+    assert result['total'] == 10
+    assert [record['LastName'] for record in result['records']] == [f"Contact {i}" for i in range(5)]
+    assert 'attributes' not in result['records'][0]
+    assert sf.more_calls == 1  # Pages 1-2 hold the first five; the rest are never requested
+
+
+def test_no_limit_pages_through_every_record(connect):
+    sf = connect(PagedSalesforce(total=10, page_size=3))
+    assert len(poly_cli.job_salesforce_contacts('acme')['records']) == 10
+    assert sf.more_calls == 3
+
+
+def test_expired_session_continues_the_query_cursor(connect, monkeypatch):
+    sf = connect(PagedSalesforce(total=7, page_size=3, expire_after=1))
+    fresh = PagedSalesforce(total=7, page_size=3, session_id='fresh')
+    monkeypatch.setattr(poly_cli, 'refresh_salesforce_session', lambda expired: fresh)
+
+    assert len(poly_cli.job_salesforce_contacts('acme')['records']) == 7
+    assert (sf.more_calls, fresh.more_calls) == (1, 1)
+
+
+@pytest.mark.parametrize('limit', [0, -3, '0'])
+def test_limits_below_one_are_rejected(connect, limit):
+    sf = connect(PagedSalesforce(total=10, page_size=3))
+    with pytest.raises(argparse.ArgumentTypeError):
+        poly_cli.job_salesforce_contacts('acme', limit=limit)
+    assert sf.more_calls == 0
+
+
+def test_interactive_menu_requires_a_positive_limit_or_all(connect, monkeypatch, capsys):
+    connect(PagedSalesforce(total=4, page_size=3))
+    monkeypatch.setattr(poly_cli, 'contact_mirror_status', lambda: (0, None))
+    queries = []
+    monkeypatch.setattr(poly_cli, 'query_salesforce_contacts', lambda filter_value, limit: queries.append(limit))
+    answers = iter(['1', 'acme', '0', '1', 'acme', '', '1', 'acme', '2', '1', 'acme', 'ALL', '5'])
+    monkeypatch.setattr(poly_cli, 'safe_input', lambda prompt='': next(answers))
+
+    poly_cli.salesforce_menu()
+    assert queries == [2, None]
+    assert capsys.readouterr().out.count("Please enter a whole number of at least 1, or 'all'.") == 2
@@ -0,0 +1,100 @@
+import pytest
+
+import poly_cli
+
+
+class FakeSalesforce:
+    base_url = 'https://example.my.salesforce.com/services/data/v59.0/'
+
+    def __init__(self, session_id):
+        self.session_id = session_id
+        self.headers = {'Authorization': f"Bearer {session_id}"}
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, body=None, content=b'', headers=None):
+        self.status_code = status_code
+        self.body = body
+        self.content = content
+        self.text = content.decode()
+        self.headers = headers or {}
+
+    def json(self):
+        return self.body
+
+    def iter_content(self, size):
+        yield self.content
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class FakeBulkApi:
+    """Serve Bulk API 2.0 query endpoints; `expire` ends the session once the job exists, `fail` maps a step to an error"""
+
+    def __init__(self, expire=False, fail=None):
+        self.expire = expire
+        self.expired = set()
+        self.fail = fail or {}
+        self.requests = []
+
+    def __call__(self, method, url, headers=None, **kwargs):
+        session = headers['Authorization'].split()[-1]
+        step = 'create' if method == 'POST' else 'abort' if method == 'PATCH' else \
+            'download' if url.endswith('/results') else 'status'
+        self.requests.append((method, step, session))
+        if session in self.expired:
+            return FakeResponse(401)
+        if step in self.fail:
+            raise self.fail[step]
+        if step == 'create':
+            if self.expire:
+                self.expired.add(session)
+            return FakeResponse(body={'id': '750JOB'})
+        if step == 'status':
+            return FakeResponse(body={'state': 'JobComplete'})
+        if step == 'download':
+            return FakeResponse(content=b'Id,Email\n003A,a@example.com\n', headers={'Sforce-NumberOfRecords': '1'})
+        return FakeResponse(body={'state': 'Aborted'})
+
+
+@pytest.fixture
+def bulk_api(monkeypatch):
+    def install(**kwargs):
+        api = FakeBulkApi(**kwargs)
+        monkeypatch.setattr(poly_cli, 'http_request', api)
+        monkeypatch.setattr(poly_cli, 'refresh_salesforce_session', lambda expired: FakeSalesforce('fresh'))
+        return api
+    return install
+
+
+def test_expired_session_continues_the_same_job(bulk_api, tmp_path):
+    api = bulk_api(expire=True)
+    path = tmp_path / 'contacts.csv'
+    sf = FakeSalesforce('stale')
+
+    assert poly_cli.export_salesforce_contacts(sf, str(path)) == 1
+
+    assert [step for _, step, _ in api.requests].count('create') == 1
+    assert api.requests[-2:] == [('GET', 'status', 'fresh'), ('GET', 'download', 'fresh')]
+    assert path.read_bytes() == b'Id,Email\n003A,a@example.com\n'
+    assert not (tmp_path / 'contacts.csv.part').exists()
+
+
+@pytest.mark.parametrize('step, error', [
+    ('status', KeyboardInterrupt()),
+    ('download', ConnectionError('connection reset')),
+])
+def test_failed_export_aborts_the_job(bulk_api, tmp_path, step, error):
+    api = bulk_api(fail={step: error})
+    path = tmp_path / 'contacts.csv'
+
+    with pytest.raises(type(error)):
+        poly_cli.export_salesforce_contacts(FakeSalesforce('live'), str(path))
+
+    assert api.requests[-1] == ('PATCH', 'abort', 'live')
+    assert [step for _, step, _ in api.requests].count('create') == 1
+    assert list(tmp_path.iterdir()) == []
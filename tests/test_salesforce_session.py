@@ -0,0 +1,83 @@
+import json
+import os
+import stat
+
+import pytest
+import simple_salesforce
+from simple_salesforce import SalesforceExpiredSession
+
+import poly_cli
+
+
+class FakeSalesforce:
+    """Stands in for simple_salesforce.Salesforce; password logins get a new session id each time"""
+    logins = 0
+
+    def __init__(self, username=None, password=None, security_token=None, session_id=None, instance_url=None):
+        if session_id is None:
+            FakeSalesforce.logins += 1
+            session_id = f"session-{FakeSalesforce.logins}"
+            instance_url = 'https://example.my.salesforce.com'
+        self.session_id = session_id
+        self.sf_instance = instance_url.split('://', 1)[1]
+
+
+@pytest.fixture
+def salesforce(monkeypatch):
+    FakeSalesforce.logins = 0
+    monkeypatch.setattr(simple_salesforce, 'Salesforce', FakeSalesforce)
+    monkeypatch.setattr(poly_cli, 'sf_instance', None)
+    monkeypatch.setattr(poly_cli, 'HEADLESS', True)
+    monkeypatch.setenv('SALESFORCE_USERNAME', 'ops@example.com')
+    monkeypatch.setenv('SALESFORCE_PASSWORD', 'password')
+    monkeypatch.setenv('SALESFORCE_SECURITY_TOKEN', 'token')
+    return FakeSalesforce
+
+
+def saved_session():
+    with open(poly_cli.SF_SESSION_PATH, encoding='utf-8') as session_file:
+        return json.load(session_file)
+
+
+def test_login_saves_an_owner_only_session_that_later_runs_reuse(salesforce, monkeypatch):
+    sf = poly_cli.get_salesforce_credentials()
+    assert salesforce.logins == 1
+    assert stat.S_IMODE(os.stat(poly_cli.SF_SESSION_PATH).st_mode) == 0o600
+    assert saved_session()['username'] == 'ops@example.com'
+    assert saved_session()['session_id'] == sf.session_id == 'session-1'
+    assert saved_session()['instance_url'] == 'https://example.my.salesforce.com'
+
+    monkeypatch.setattr(poly_cli, 'sf_instance', None)  # A later run
+    reused = poly_cli.get_salesforce_credentials()
+    assert salesforce.logins == 1
+    assert reused.session_id == 'session-1'
+
+
+def test_expired_saved_session_logs_in_once_and_replaces_the_file(salesforce, monkeypatch):
+    poly_cli.get_salesforce_credentials()
+    monkeypatch.setattr(poly_cli, 'sf_instance', None)
+    sessions_used = []
+
+    def operation(sf, value):
+        sessions_used.append(sf.session_id)
+        if sf.session_id == 'session-1':
+            raise SalesforceExpiredSession('url', 401, 'query', b'')
+        return value
+
+    assert poly_cli.call_salesforce(operation, 'ok') == 'ok'
+    assert sessions_used == ['session-1', 'session-2']
+    assert saved_session()['session_id'] == 'session-2'
+    assert stat.S_IMODE(os.stat(poly_cli.SF_SESSION_PATH).st_mode) == 0o600
+
+
+def test_unsafe_or_foreign_session_files_are_not_used(salesforce):
+    with open(poly_cli.SF_SESSION_PATH, 'w', encoding='utf-8') as session_file:
+        json.dump({'username': 'ops@example.com', 'session_id': 'leaked',
+                   'instance_url': 'https://example.my.salesforce.com'}, session_file)
+    os.chmod(poly_cli.SF_SESSION_PATH, 0o644)
+    assert poly_cli.load_salesforce_session('ops@example.com') is None
+    assert not os.path.exists(poly_cli.SF_SESSION_PATH)  # Deleted rather than used
+
+    poly_cli.get_salesforce_credentials()
+    assert poly_cli.load_salesforce_session('someone.else@example.com') is None
+    assert poly_cli.load_salesforce_session('ops@example.com') == ('session-1', 'https://example.my.salesforce.com')
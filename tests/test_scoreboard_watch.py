@@ -0,0 +1,27 @@
+from datetime import datetime, timedelta, timezone
+
+import poly_cli
+
+
+NOW = datetime(2025, 1, 5, 18, 0, tzinfo=timezone.utc)
+
+
+def game(state, start=None):
+    return {'state': state, 'start': start}
+
+
+def kickoff_in(seconds):
+    return (NOW + timedelta(seconds=seconds)).strftime('%Y-%m-%dT%H:%MZ')
+
+
+def test_next_poll_interval_follows_game_state():
+    assert poly_cli.next_poll_interval([game('in'), game('pre', kickoff_in(3600))], NOW) == poly_cli.WATCH_LIVE_INTERVAL
+    assert poly_cli.next_poll_interval([game('post'), game('post')], NOW) is None
+    assert poly_cli.next_poll_interval([], NOW) is None
+
+    # Poll shortly before the earliest kickoff, clamped to the min/max intervals
+    assert poly_cli.next_poll_interval([game('pre', kickoff_in(600)), game('pre', kickoff_in(7200))], NOW) \
+        == 600 - poly_cli.WATCH_KICKOFF_LEAD
+    assert poly_cli.next_poll_interval([game('pre', kickoff_in(7200))], NOW) == poly_cli.WATCH_PRE_MAX_INTERVAL
+    assert poly_cli.next_poll_interval([game('pre', kickoff_in(-300))], NOW) == poly_cli.WATCH_PRE_MIN_INTERVAL
+    assert poly_cli.next_poll_interval([game('pre', None)], NOW) == poly_cli.WATCH_PRE_MAX_INTERVAL
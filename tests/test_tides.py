@@ -0,0 +1,62 @@
+import random
+
+import numpy as np
+
+import poly_cli
+
+
+def brute_force_nearest(points, target, k):
+    distances = [(i, sum((p - t) ** 2 for p, t in zip(point, target))) for i, point in enumerate(points)]
+    return sorted(distances, key=lambda item: item[1])[:k]
+
+
+def random_stations(count, seed):
+    rng = random.Random(seed)
+    lat = np.array([rng.uniform(-80, 80) for _ in range(count)])
+    lon = np.array([rng.uniform(-180, 180) for _ in range(count)])
+    return lat, lon
+
+
+def test_kdtree_nearest_matches_brute_force():
+    lat, lon = random_stations(500, seed=1)
+    points = poly_cli._unit_sphere_points(lat, lon)
+    tree_points = points[poly_cli._kdtree_order(points)].tolist()
+
+    rng = random.Random(2)
+    for _ in range(200):
+        target = poly_cli._unit_sphere_points(np.array([rng.uniform(-90, 90)]),
+                                              np.array([rng.uniform(-180, 180)]))[0].tolist()
+        for k in (1, 5):
+            found = poly_cli._kdtree_nearest(tree_points, target, k)
+            expected = brute_force_nearest(tree_points, target, k)
+            assert [dist2 for _, dist2 in found] == [dist2 for _, dist2 in expected]
+            assert {index for index, _ in found} == {index for index, _ in expected}
+
+
+def test_kdtree_handles_fewer_points_than_k():
+    points = poly_cli._unit_sphere_points(np.array([10.0, 20.0]), np.array([30.0, 40.0]))
+    tree_points = points[poly_cli._kdtree_order(points)].tolist()
+    assert len(poly_cli._kdtree_nearest(tree_points, tree_points[0], 5)) == 2
+    assert poly_cli._kdtree_nearest([], [1.0, 0.0, 0.0], 1) == []
+
+
+def test_nearest_tide_stations_from_downloaded_catalog(monkeypatch):
+    stations = [
+        {'id': '8518750', 'name': 'The Battery', 'state': 'NY', 'lat': '40.7006', 'lng': '-74.0142'},
+        {'id': '8443970', 'name': 'Boston', 'state': 'MA', 'lat': '42.3548', 'lng': '-71.0534'},
+        {'id': '9414290', 'name': 'San Francisco', 'state': 'CA', 'lat': '37.8063', 'lng': '-122.4659'},
+    ]
+
+    class Response:
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return {'stations': stations}
+
+    monkeypatch.setattr(poly_cli, 'http_get', lambda url, **kwargs: Response())
+    nearest = poly_cli.nearest_tide_stations(40.75, -73.99, k=2)
+    assert [station_id for station_id, _ in nearest] == ['8518750', '8443970']
+    assert nearest[0][1] < 10
+    assert poly_cli.get_nearest_station({'lat': 37.8, 'lon': -122.4}) == '9414290'
+    assert poly_cli.get_nearest_station({'lat': 0.0, 'lon': 0.0}) is None